@@ -4,15 +4,34 @@ This file defines the base class for all agents.
 import json
 import logging
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from typing import Any, Dict
 
 from google.genai import types
 
 from ..config import settings
+from ..core.agent_scheduler import get_agent_scheduler, get_model_name, is_rate_limit_error
 
 if not settings.AGENT_DEBUG_MODE:
     logging.getLogger("google_adk.google.adk.models.google_llm").setLevel(logging.WARNING)
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def ephemeral_session(session_service, app_name: str, user_id: str, state: dict):
+    """
+    Session for a single agent call. It is deleted together with its event history when the call is over,
+    otherwise every call would stay in the InMemorySessionService forever.
+    """
+    session = await session_service.create_session(app_name=app_name, user_id=user_id, state=state)
+    try:
+        yield session
+    finally:
+        try:
+            await session_service.delete_session(app_name=app_name, user_id=user_id, session_id=session.id)
+        except Exception as e:
+            logger.warning("Failed to delete session %s: %s", session.id, e)
 
 
 class StandardAgent(ABC):
@@ -39,44 +58,42 @@ class StandardAgent(ABC):
         
         for attempt in range(max_retries + 1):  # +1 for the initial attempt
             try:
-                if debug:
-                    print(f"[Debug] Running agent with state: {json.dumps(state, indent=2)}")
-
-                # Create session
-                session = await self.session_service.create_session(
-                    app_name=self.app_name,
-                    user_id=user_id,
-                    state=state
-                )
-                session_id = session.id
-
-                # We iterate through events to find the final answer
-                async for event in self.runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+                async with get_agent_scheduler().slot(model=get_model_name(self), user_id=user_id), \
+                        ephemeral_session(self.session_service, self.app_name, user_id, state) as session:
                     if debug:
-                        print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
-
-                    # is_final_response() marks the concluding message for the turn
-                    if event.is_final_response():
-                        if event.content and event.content.parts:
-                            # Assuming text response in the first part
-                            return {
-                                "status": "success",
-                                "explanation": event.content.parts[0].text  # TODO rename to output/content
-                            }
-                        elif event.actions and event.actions.escalate:  # Handle potential errors/escalations
-                            error_msg = f"Agent escalated: {event.error_message or 'No specific message.'}"
-                            if attempt >= max_retries:
-                                return {"status": "error", "message": error_msg}
-                            last_error = error_msg
-                            break  # Break out of event loop to trigger retry
+                        print(f"[Debug] Running agent with state: {json.dumps(state, indent=2)}")
+
+                    session_id = session.id
+
+                    # We iterate through events to find the final answer
+                    async for event in self.runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+                        if debug:
+                            print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
+
+                        # is_final_response() marks the concluding message for the turn
+                        if event.is_final_response():
+                            if event.content and event.content.parts:
+                                # Assuming text response in the first part
+                                return {
+                                    "status": "success",
+                                    "explanation": event.content.parts[0].text  # TODO rename to output/content
+                                }
+                            elif event.actions and event.actions.escalate:  # Handle potential errors/escalations
+                                error_msg = f"Agent escalated: {event.error_message or 'No specific message.'}"
+                                if attempt >= max_retries:
+                                    return {"status": "error", "message": error_msg}
+                                last_error = error_msg
+                                break  # Break out of event loop to trigger retry
                 
-                # If we get here, no final response was received
-                error_msg = "Agent did not give a final response. Unknown error occurred."
-                if attempt >= max_retries:
-                    return {"status": "error", "message": error_msg}
-                last_error = error_msg
+                    # If we get here, no final response was received
+                    error_msg = "Agent did not give a final response. Unknown error occurred."
+                    if attempt >= max_retries:
+                        return {"status": "error", "message": error_msg}
+                    last_error = error_msg
                 
             except Exception as e:
+                if is_rate_limit_error(e):
+                    get_agent_scheduler().report_rate_limited(get_model_name(self))
                 if attempt >= max_retries:
                     raise  # Re-raise the exception if we've exhausted our retries
                 last_error = str(e)
@@ -119,55 +136,54 @@ class StructuredAgent(ABC):
         
         for attempt in range(max_retries + 1):  # +1 for the initial attempt
             try:
-                session = await self.session_service.create_session(
-                    app_name=self.app_name,
-                    user_id=user_id,
-                    state=state
-                )
-                session_id = session.id
-
-                async for event in self.runner.run_async(
-                        user_id=user_id,
-                        session_id=session_id,
-                        new_message=content
-                ):
-                    if debug:
-                        print(f"[Event] Author: {event.author}, Type: {type(event).__name__}, "
-                              f"Final: {event.is_final_response()}")
-
-                    if event.is_final_response():
-                        if event.content and event.content.parts:
-                            # Get the text from the Part object
-                            json_text = event.content.parts[0].text
-
-                            # Try parsing the json response into a dictionary
-                            try:
-                                dict_response = json.loads(json_text)
-                                dict_response['status'] = 'success'
-                                return dict_response
-                            except json.JSONDecodeError as e:
-                                error_msg = f"Error parsing JSON response: {e}"
+                async with get_agent_scheduler().slot(model=get_model_name(self), user_id=user_id), \
+                        ephemeral_session(self.session_service, self.app_name, user_id, state) as session:
+                    session_id = session.id
+
+                    async for event in self.runner.run_async(
+                            user_id=user_id,
+                            session_id=session_id,
+                            new_message=content
+                    ):
+                        if debug:
+                            print(f"[Event] Author: {event.author}, Type: {type(event).__name__}, "
+                                  f"Final: {event.is_final_response()}")
+
+                        if event.is_final_response():
+                            if event.content and event.content.parts:
+                                # Get the text from the Part object
+                                json_text = event.content.parts[0].text
+
+                                # Try parsing the json response into a dictionary
+                                try:
+                                    dict_response = json.loads(json_text)
+                                    dict_response['status'] = 'success'
+                                    return dict_response
+                                except json.JSONDecodeError as e:
+                                    error_msg = f"Error parsing JSON response: {e}"
+                                    if attempt >= max_retries:
+                                        if debug:
+                                            print(error_msg)
+                                        raise
+                                    last_error = error_msg
+                                    break  # Break out of event loop to trigger retry
+                                
+                            elif event.actions and event.actions.escalate:  # Handle potential errors/escalations
+                                error_msg = f"Agent escalated: {event.error_message or 'No specific message.'}"
                                 if attempt >= max_retries:
-                                    if debug:
-                                        print(error_msg)
-                                    raise
+                                    return {"status": "error", "message": error_msg}
                                 last_error = error_msg
                                 break  # Break out of event loop to trigger retry
-                                
-                        elif event.actions and event.actions.escalate:  # Handle potential errors/escalations
-                            error_msg = f"Agent escalated: {event.error_message or 'No specific message.'}"
-                            if attempt >= max_retries:
-                                return {"status": "error", "message": error_msg}
-                            last_error = error_msg
-                            break  # Break out of event loop to trigger retry
                 
-                # If we get here, no final response was received
-                error_msg = "Agent did not give a final response. Unknown error occurred."
-                if attempt >= max_retries:
-                    return {"status": "error", "message": error_msg}
-                last_error = error_msg
+                    # If we get here, no final response was received
+                    error_msg = "Agent did not give a final response. Unknown error occurred."
+                    if attempt >= max_retries:
+                        return {"status": "error", "message": error_msg}
+                    last_error = error_msg
                 
             except Exception as e:
+                if is_rate_limit_error(e):
+                    get_agent_scheduler().report_rate_limited(get_model_name(self))
                 if attempt >= max_retries:
                     raise  # Re-raise the exception if we've exhausted our retries
                 last_error = str(e)
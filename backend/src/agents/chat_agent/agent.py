@@ -3,6 +3,7 @@ This is a small question-answer agent that functions like a standard gemini api
 It is used for small requests like generating a course description.
 It also handles session creation itself, which sets it apart from the other agents.
 """
+import asyncio
 import copy
 import json
 import os
@@ -16,14 +17,46 @@ from google.adk.runners import Runner
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
 from google.genai import types
 
-from ..agent import StructuredAgent
-from ..utils import load_instruction_from_file
+from .chapter_sections import make_sections_callback
+from .context_window import ChatContextManager, make_context_callback
+from ..agent import StandardAgent, StructuredAgent
+from ...config import settings
+from ...core.agent_scheduler import PRIORITY_INTERACTIVE, get_agent_scheduler, get_model_name, is_rate_limit_error
+from ..utils import create_text_query, load_instruction_from_file
 
-from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import DatabaseSessionService, InMemorySessionService
 from google.adk.runners import RunConfig
 from google.adk.agents.run_config import StreamingMode
 
 
+class ChatSummaryAgent(StandardAgent):
+    """Folds older chat turns into the running summary of a chat session (see context_window.py)."""
+
+    def __init__(self, app_name: str, session_service):
+        self.app_name = app_name
+        self.session_service = session_service
+        self.runner = Runner(
+            agent=LlmAgent(
+                name="chat_summary_agent",
+                model="gemini-2.5-flash",
+                description="Agent for summarizing the earlier part of a chat",
+                instruction="You keep a short running summary of a tutoring chat between a student and a tutor. "
+                            "Merge the new part of the conversation into the existing summary. Keep what the "
+                            "student asked, what was explained and what the student struggled with. "
+                            f"Answer with the summary only, at most {settings.CHAT_SUMMARY_MAX_CHARS} characters.",
+            ),
+            app_name=self.app_name,
+            session_service=self.session_service,
+        )
+
+    async def summarize(self, previous: str, transcript: str) -> str:
+        prompt = f"Existing summary:\n{previous or '(none)'}\n\nNew part of the conversation:\n{transcript}"
+        response = await self.run(user_id="chat_summary", state={}, content=create_text_query(prompt))
+        if response.get("status") != "success":
+            raise RuntimeError(response.get("message", "Chat summary failed"))
+        return response.get("explanation", "")
+
+
 class ChatAgent:
     app_name: str
     session_service: DatabaseSessionService 
@@ -36,6 +69,8 @@ class ChatAgent:
             model="gemini-2.5-flash",
             description="Agent for creating a small chat for a course",
             instruction=load_instruction_from_file("chat_agent/instructions.txt"),
+            # Bounded history plus the running summary of the older turns, then the relevant chapter sections
+            before_model_callback=[make_context_callback(settings.CHAT_MAX_TURNS), make_sections_callback()],
         )
         self.app_name = app_name
         self.session_service = session_service
@@ -46,8 +81,28 @@ class ChatAgent:
             session_service=self.session_service,
         )
 
+        # Summaries are single calls, their sessions are in memory and deleted right away
+        self.summary_agent = ChatSummaryAgent(app_name, InMemorySessionService())
+        self.context = ChatContextManager(
+            session_service=self.session_service,
+            app_name=self.app_name,
+            keep_turns=settings.CHAT_CONTEXT_TURNS,
+            max_turns=settings.CHAT_MAX_TURNS,
+            summarize=self.summary_agent.summarize,
+            summary_max_chars=settings.CHAT_SUMMARY_MAX_CHARS,
+        )
+        # Keep references to the running compactions, otherwise the tasks could be garbage collected
+        self._compactions = set()
+
+    def _schedule_compaction(self, user_id: str, session_id: str):
+        """Compact the session in the background, it waits until the current turn released the session"""
+        task = asyncio.create_task(self.context.compact(user_id, session_id))
+        self._compactions.add(task)
+        task.add_done_callback(self._compactions.discard)
+
 
-    async def run(self, user_id: str, chapter_id, state: dict, content: types.Content, debug: bool = False, max_retries: int = 1, retry_delay: float = 2.0):
+    async def run(self, user_id: str, chapter_id, state: dict, content: types.Content, debug: bool = False, max_retries: int = 1, retry_delay: float = 2.0,
+                  state_delta: Optional[dict] = None):
         """Run the chat agent with retry logic and streaming support.
         
         Args:
@@ -58,6 +113,7 @@ class ChatAgent:
             debug: Whether to enable debug logging
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retries in seconds
+            state_delta: State changes applied with the message, temp: keys only last for this turn
             
         Yields:
             tuple: (text: str, is_final: bool) - The text content and whether it's the final response
@@ -65,55 +121,69 @@ class ChatAgent:
         last_error = None
         for attempt in range(1, max_retries + 1):
             try:
-                # Get or create a session for this user and chapter
-                session = await self.session_service.get_session(
-                    app_name=self.app_name,
-                    user_id=user_id,
-                    session_id=str(chapter_id)
-                )
-                
-                if not session:
-                    session = await self.session_service.create_session(
+                # Chat is interactive and is served before batch generation
+                async with self.context.lock(user_id, str(chapter_id)), \
+                        get_agent_scheduler().slot(model=get_model_name(self), user_id=user_id,
+                                                   priority=PRIORITY_INTERACTIVE):
+                    # Get or create a session for this user and chapter
+                    session = await self.session_service.get_session(
                         app_name=self.app_name,
                         user_id=user_id,
-                        session_id=str(chapter_id),
-                        state=state or {}
+                        session_id=str(chapter_id)
                     )
                 
-                # We iterate through events and yield them as they come in
-                async for event in self.runner.run_async(
-                    user_id=user_id,
-                    session_id=session.id,
-                    new_message=content,
-                    run_config=RunConfig(streaming_mode=StreamingMode.SSE)
-                ):
-                    if debug:
-                        print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
-
-                    # Check for text content in the event
-                    if event.content and event.content.parts:
-                        # Yield each text part
-                        for part in event.content.parts:
-                            if hasattr(part, 'text') and part.text:
-                                yield part.text, event.is_final_response()
+                    if not session:
+                        session = await self.session_service.create_session(
+                            app_name=self.app_name,
+                            user_id=user_id,
+                            session_id=str(chapter_id),
+                            state=state or {}
+                        )
+                    else:
+                        if session.state.get("chapter_content"):
+                            # Sessions from before the section retrieval stored the whole chapter, drop it once
+                            state_delta = {**(state_delta or {}), "chapter_content": None, **(state or {})}
+                        if attempt == 1 and self.context.needs_compaction(session):
+                            # Runs once this turn is over, the next message loads the compacted session
+                            self._schedule_compaction(user_id, str(chapter_id))
+                
+                    # We iterate through events and yield them as they come in
+                    async for event in self.runner.run_async(
+                        user_id=user_id,
+                        session_id=session.id,
+                        new_message=content,
+                        state_delta=state_delta,
+                        run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+                    ):
+                        if debug:
+                            print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
+
+                        # Check for text content in the event
+                        if event.content and event.content.parts:
+                            # Yield each text part
+                            for part in event.content.parts:
+                                if hasattr(part, 'text') and part.text:
+                                    yield part.text, event.is_final_response()
                     
-                    # Handle final response or errors
-                    if event.is_final_response():
-                        if event.actions and event.actions.escalate:
-                            error_msg = f"Agent escalated: {event.error_message or 'No specific message.'}"
-                            if attempt >= max_retries:
-                                raise Exception(error_msg)
-                            last_error = error_msg
-                            break
-                        return  # Successfully completed
+                        # Handle final response or errors
+                        if event.is_final_response():
+                            if event.actions and event.actions.escalate:
+                                error_msg = f"Agent escalated: {event.error_message or 'No specific message.'}"
+                                if attempt >= max_retries:
+                                    raise Exception(error_msg)
+                                last_error = error_msg
+                                break
+                            return  # Successfully completed
                 
-                # If we get here, no final response was received
-                error_msg = "Agent did not give a final response. Unknown error occurred."
-                if attempt >= max_retries:
-                    raise Exception(error_msg)
-                last_error = error_msg
+                    # If we get here, no final response was received
+                    error_msg = "Agent did not give a final response. Unknown error occurred."
+                    if attempt >= max_retries:
+                        raise Exception(error_msg)
+                    last_error = error_msg
                 
             except Exception as e:
+                if is_rate_limit_error(e):
+                    get_agent_scheduler().report_rate_limited(get_model_name(self))
                 if attempt >= max_retries:
                     # Yield the error as a final message
                     yield f"Error: {str(e)}", True
@@ -0,0 +1,210 @@
+"""
+Retrieval of the chapter sections that are relevant to a chat message.
+The chat used to put the whole chapter (the React source of the chapter page) into the session state and the
+instructions, so every turn sent all of it to the model. Now the readable text of the chapter is split into sections
+along its headings, the sections are embedded once per chapter version (content hash) and every turn only gets the
+top-k sections for the student's message, passed as temp: state (not persisted) and added to the instructions.
+The session state only keeps the outline of the chapter.
+"""
+import html
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+
+logger = logging.getLogger(__name__)
+
+OUTLINE_STATE_KEY = "chapter_outline"
+# temp: state lives for one invocation and is not written to the session store
+SECTIONS_STATE_KEY = "temp:chapter_sections"
+
+_ATTRIBUTE_REGEX = re.compile(r"""\b(?:className|style|key|id|href|src)=(?:"[^"]*"|'[^']*'|\{\{.*?\}\}|\{[^{}]*\})""", re.S)
+_HEADING_REGEX = re.compile(r"<h([1-4])\b[^>]*>(.*?)</h\1>", re.S)
+_TEXT_NODE_REGEX = re.compile(r">([^<>{}]*[A-Za-z]{2}[^<>{}]*)<")
+_STRING_REGEX = re.compile(r"""(["'`])((?:\\.|(?!\1)[^\\\n])*)\1""")
+_TAG_REGEX = re.compile(r"<[^<>]*>|\{[^{}]*\}")
+_WORD_REGEX = re.compile(r"\w+")
+
+
+@dataclass
+class ChapterSection:
+    title: str
+    text: str
+    position: int
+
+
+def _clean(text: str) -> str:
+    return " ".join(html.unescape(_TAG_REGEX.sub(" ", text)).split())
+
+
+def _is_prose(text: str) -> bool:
+    # String literals of the component are prose (descriptions, quiz texts) or code (class names, ids, formats)
+    words = text.split()
+    return len(words) >= 3 and sum(word.strip(".,:;!?()").isalpha() for word in words) / len(words) > 0.6
+
+
+def extract_sections(content: str, max_chars: int = 1500) -> List[ChapterSection]:
+    """
+    Readable text of a chapter component in document order, split at its headings (h1 to h4).
+    Sections longer than max_chars are continued in a new section with the same title.
+    Content without any markup is split into paragraphs.
+    """
+    source = _ATTRIBUTE_REGEX.sub(" ", content)
+    pieces = []  # (start, is_heading, text)
+    headings = [(m.start(), m.end(), _clean(m.group(2))) for m in _HEADING_REGEX.finditer(source)]
+    pieces.extend((start, True, text) for start, _, text in headings if text)
+
+    covered = [(start, end) for start, end, _ in headings]
+
+    def is_covered(position: int) -> bool:
+        return any(start <= position < end for start, end in covered)
+
+    for match in _TEXT_NODE_REGEX.finditer(source):
+        text = " ".join(html.unescape(match.group(1)).split())
+        if text and not is_covered(match.start(1)):
+            pieces.append((match.start(1), False, text))
+            covered.append(match.span(1))
+    # Quotes inside of text nodes ("Let's") are not string literals
+    for match in _STRING_REGEX.finditer(source):
+        text = " ".join(match.group(2).split())
+        if _is_prose(text) and not is_covered(match.start()):
+            pieces.append((match.start(), False, text))
+
+    if not pieces:
+        pieces = [(i, False, paragraph.strip()) for i, paragraph in enumerate(content.split("\n\n")) if paragraph.strip()]
+    pieces.sort(key=lambda piece: piece[0])
+
+    sections: List[ChapterSection] = []
+    title, texts, size = "", [], 0
+
+    def flush():
+        nonlocal texts, size
+        if texts:
+            sections.append(ChapterSection(title, " ".join(texts), len(sections)))
+        texts, size = [], 0
+
+    for _, is_heading, text in pieces:
+        if is_heading:
+            flush()
+            title = text
+            continue
+        for start in range(0, len(text), max_chars):
+            part = text[start:start + max_chars]
+            if size + len(part) > max_chars:
+                flush()
+            texts.append(part)
+            size += len(part) + 1
+    flush()
+    return sections
+
+
+def format_sections(sections: List[ChapterSection]) -> str:
+    return "\n\n".join(f"### {section.title}\n{section.text}" if section.title else section.text
+                       for section in sections)
+
+
+def outline(sections: List[ChapterSection]) -> str:
+    titles = []
+    for section in sections:
+        if section.title and section.title not in titles:
+            titles.append(section.title)
+    return "\n".join(f"- {title}" for title in titles)
+
+
+class _IndexedChapter:
+    def __init__(self, sections: List[ChapterSection], embeddings: Optional[np.ndarray]):
+        self.sections = sections
+        self.embeddings = embeddings
+        self.chars = sum(len(section.text) for section in sections)
+
+
+class ChapterSectionIndex:
+    def __init__(self, encode: Optional[Callable[[List[str]], np.ndarray]] = None, max_chapters: int = 256,
+                 section_chars: int = 1500, full_chapter_chars: int = 4000):
+        """
+        :param encode: texts -> embedding matrix (VectorService.encode), ranks by word overlap if None or failing
+        :param max_chapters: number of indexed chapter versions kept
+        :param section_chars: maximum size of a section
+        :param full_chapter_chars: chapters with less text than this are passed whole, without retrieval
+        """
+        self.encode = encode
+        self.max_chapters = max_chapters
+        self.section_chars = section_chars
+        self.full_chapter_chars = full_chapter_chars
+        self._chapters: "OrderedDict[str, _IndexedChapter]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        if self.encode is None or not texts:
+            return None
+        try:
+            embeddings = np.asarray(self.encode(texts), dtype=np.float32)
+        except Exception as e:
+            logger.warning("Embedding chapter sections failed, ranking by word overlap: %s", e)
+            return None
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def get(self, content_hash: str, load_content: Callable[[], Optional[str]]) -> Optional[_IndexedChapter]:
+        """Sections of a chapter version, load_content is only called if the version is not indexed yet"""
+        with self._lock:
+            chapter = self._chapters.get(content_hash)
+            if chapter is not None:
+                self._chapters.move_to_end(content_hash)
+                return chapter
+
+        content = load_content()
+        if content is None:
+            return None
+        sections = extract_sections(content, self.section_chars)
+        chapter = _IndexedChapter(sections, None)
+        if chapter.chars > self.full_chapter_chars:
+            chapter.embeddings = self._embed([f"{section.title}\n{section.text}" for section in sections])
+        with self._lock:
+            self._chapters[content_hash] = chapter
+            self._chapters.move_to_end(content_hash)
+            while len(self._chapters) > self.max_chapters:
+                self._chapters.popitem(last=False)
+        return chapter
+
+    def search(self, chapter: _IndexedChapter, query: str, top_k: int = 4) -> List[ChapterSection]:
+        """The top_k sections for query in chapter order, all sections of a short chapter"""
+        if chapter.chars <= self.full_chapter_chars or len(chapter.sections) <= top_k:
+            return chapter.sections
+
+        scores = None
+        if chapter.embeddings is not None:
+            query_embedding = self._embed([query])
+            if query_embedding is not None:
+                scores = chapter.embeddings @ query_embedding[0]
+        if scores is None:
+            query_words = set(_WORD_REGEX.findall(query.lower()))
+            scores = np.array([
+                len(query_words & set(_WORD_REGEX.findall(f"{section.title} {section.text}".lower())))
+                for section in chapter.sections
+            ], dtype=np.float32)
+
+        best = sorted(np.argsort(-scores, kind="stable")[:top_k])
+        return [chapter.sections[i] for i in best]
+
+
+def make_sections_callback():
+    """before_model_callback that adds the outline and the retrieved sections of the chapter to the instructions"""
+    def add_chapter_sections(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        parts = []
+        chapter_outline = callback_context.state.get(OUTLINE_STATE_KEY)
+        if chapter_outline:
+            parts.append(f"Outline of the current chapter:\n{chapter_outline}")
+        sections = callback_context.state.get(SECTIONS_STATE_KEY)
+        if sections:
+            parts.append(f"Sections of the current chapter relevant to the student's message:\n{sections}")
+        if parts:
+            llm_request.append_instructions(parts)
+        return None
+    return add_chapter_sections
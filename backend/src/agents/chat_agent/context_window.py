@@ -0,0 +1,189 @@
+"""
+Bounded context window of the chat sessions.
+A chat session lives per (user, chapter) in the DatabaseSessionService and adk replays its whole event history
+into every model call, so long chats got slower and more expensive with every message. Two measures bound it:
+ - Compaction: once a session holds more than max_turns turns, the older turns are folded into a running summary
+   stored in the session state, and their event rows are deleted, only the last keep_turns turns stay. This caps the
+   stored event rows and what the runner loads per message.
+ - The model request is trimmed to the last max_turns turns and the summary is added to the instructions
+   (before_model_callback), so the prompt stays bounded even while a compaction is pending.
+"""
+import asyncio
+import logging
+import weakref
+from typing import Awaitable, Callable, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+from google.genai import types
+from sqlalchemy import JSON, column, delete, select, table, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_STATE_KEY = "chat_summary"
+
+# Summarizer: (previous summary, transcript of the turns to fold in) -> new summary
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+# The columns of the DatabaseSessionService tables that a compaction touches
+_SESSIONS = table("sessions", column("app_name"), column("user_id"), column("id"),
+                  column("state", JSON().with_variant(JSONB(), "postgresql")))
+_EVENTS = table("events", column("app_name"), column("user_id"), column("session_id"), column("id"))
+
+
+def _text(content: Optional[types.Content]) -> str:
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if getattr(part, "text", None))
+
+
+def _is_user_message(content: Optional[types.Content]) -> bool:
+    return bool(content and content.role == "user" and _text(content))
+
+
+def split_turns(events: list) -> List[list]:
+    """Group session events into turns, a turn starts with a user message"""
+    turns: List[list] = []
+    for event in events:
+        if _is_user_message(event.content) or not turns:
+            turns.append([])
+        turns[-1].append(event)
+    return turns
+
+
+def trim_contents(contents: List[types.Content], max_turns: int) -> List[types.Content]:
+    """Keep the contents from the start of the max_turns-th last user message on"""
+    starts = [i for i, content in enumerate(contents) if _is_user_message(content)]
+    if len(starts) <= max_turns:
+        return contents
+    return contents[starts[-max_turns]:]
+
+
+def format_transcript(turns: List[list], max_message_chars: int = 600) -> str:
+    lines = []
+    for turn in turns:
+        for event in turn:
+            text = _text(event.content).strip()
+            if text:
+                speaker = "Student" if event.author == "user" else "Tutor"
+                lines.append(f"{speaker}: {text[:max_message_chars]}")
+    return "\n".join(lines)
+
+
+def fallback_summary(previous: str, transcript: str, max_chars: int) -> str:
+    """Summary without an LLM: the student's questions of the folded turns, newest kept if it gets too long"""
+    questions = [line[len("Student: "):].split("\n")[0][:200]
+                 for line in transcript.splitlines() if line.startswith("Student: ")]
+    summary = "\n".join(filter(None, [previous, *(f"- Student asked: {q}" for q in questions)]))
+    return summary[-max_chars:]
+
+
+def make_context_callback(max_turns: int):
+    """before_model_callback that bounds the history sent to the model and adds the running summary"""
+    def limit_chat_context(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        llm_request.contents = trim_contents(llm_request.contents, max_turns)
+        summary = callback_context.state.get(SUMMARY_STATE_KEY)
+        if summary:
+            llm_request.append_instructions([f"Summary of the earlier conversation with the student:\n{summary}"])
+        return None
+    return limit_chat_context
+
+
+class ChatContextManager:
+    def __init__(self, session_service, app_name: str, keep_turns: int, max_turns: int,
+                 summarize: Summarizer, summary_max_chars: int = 2000):
+        """
+        :param keep_turns: turns kept verbatim after a compaction
+        :param max_turns: a session with more turns than this is compacted
+        :param summarize: folds a transcript into the previous summary, falls back to fallback_summary on errors
+        Only sessions of a DatabaseSessionService are compacted, the request trimming bounds the prompt for others.
+        """
+        self.session_service = session_service
+        engine = getattr(session_service, "db_engine", None)
+        self._engine: Optional[AsyncEngine] = engine if isinstance(engine, AsyncEngine) else None
+        self.app_name = app_name
+        self.keep_turns = keep_turns
+        self.max_turns = max(max_turns, keep_turns)
+        self.summarize = summarize
+        self.summary_max_chars = summary_max_chars
+        self.compactions = 0
+        self._locks: "weakref.WeakValueDictionary[tuple, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, user_id: str, session_id: str) -> asyncio.Lock:
+        """Per session lock, a chat turn and a compaction of the same session never overlap"""
+        key = (user_id, session_id)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    def needs_compaction(self, session) -> bool:
+        # +1 for the turn that is being answered
+        return session is not None and len(split_turns(session.events)) + 1 > self.max_turns
+
+    async def compact(self, user_id: str, session_id: str) -> bool:
+        """
+        Fold the older turns of a session into its summary, returns False if there was nothing to do.
+        The summary is written without holding the session lock, chat turns arriving meanwhile are kept.
+        """
+        if self._engine is None:
+            return False
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            return False
+        turns = split_turns(session.events)
+        if len(turns) <= self.max_turns:
+            return False
+        folded = len(turns) - self.keep_turns
+
+        previous = session.state.get(SUMMARY_STATE_KEY, "")
+        transcript = format_transcript(turns[:folded])
+        try:
+            summary = (await self.summarize(previous, transcript)).strip()
+        except Exception as e:
+            logger.warning("Chat summary failed, using the fallback summary: %s", e)
+            summary = ""
+        if not summary:
+            summary = fallback_summary(previous, transcript, self.summary_max_chars)
+
+        event_ids = [event.id for turn in turns[:folded] for event in turn]
+        async with self.lock(user_id, session_id):
+            if not await self._fold_events(user_id, session_id, event_ids, summary[:self.summary_max_chars]):
+                # Deleted, or compacted by another worker in the meantime
+                return False
+
+        self.compactions += 1
+        logger.info("Compacted chat session %s of user %s: folded %d turns, kept %d",
+                    session_id, user_id, folded, len(turns) - folded)
+        return True
+
+    async def _fold_events(self, user_id: str, session_id: str, event_ids: List[str], summary: str) -> bool:
+        """
+        Delete the event rows of the folded turns and store the summary in one transaction, the session is never
+        without its history. The delete is the claim: if another worker folded (some of) the same events first,
+        fewer rows are deleted and nothing is changed. The update time of the session stays, so turns running on
+        other workers append to it as before.
+        """
+        session_filter = (_SESSIONS.c.app_name == self.app_name, _SESSIONS.c.user_id == user_id,
+                          _SESSIONS.c.id == session_id)
+        async with self._engine.connect() as conn:
+            async with conn.begin() as transaction:
+                deleted = await conn.execute(delete(_EVENTS).where(
+                    _EVENTS.c.app_name == self.app_name, _EVENTS.c.user_id == user_id,
+                    _EVENTS.c.session_id == session_id, _EVENTS.c.id.in_(event_ids),
+                ))
+                state = (await conn.execute(
+                    select(_SESSIONS.c.state).where(*session_filter).with_for_update()
+                )).scalar_one_or_none()
+                if deleted.rowcount != len(event_ids) or state is None:
+                    await transaction.rollback()
+                    return False
+                await conn.execute(update(_SESSIONS).where(*session_filter).values(
+                    state={**state, SUMMARY_STATE_KEY: summary}
+                ))
+        return True
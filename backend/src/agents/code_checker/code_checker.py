@@ -1,6 +1,7 @@
 """
 In this file we have some utility functions for checking and correcting the react code generated by the explainer agent
 """
+import asyncio
 import re
 import subprocess
 import json
@@ -8,6 +9,11 @@ import tempfile
 import os
 import shutil
 
+from .eslint_pool import ESLintWorkerError, get_eslint_pool
+from .validation_cache import get_validation_cache
+from .react_extractor import STRIPPABLE_HEADERS, extract_react_component
+from ...config import settings
+
 plugin_imports = """
 import * as Recharts from 'recharts';
 import React from "react";
@@ -27,103 +33,10 @@ def find_react_code_in_response(text: str) -> str:
     Handles nested components, complex JSX, and various React patterns.
 
     Returns the first complete React component found, or None if no valid component is detected.
+    See react_extractor.py, the response is scanned once in linear time.
     """
-
-    def is_jsx_element(s):
-        """Check if string contains JSX elements"""
-        jsx_patterns = [
-            r'<[A-Z][a-zA-Z0-9]*[^>]*>',  # Component tags like <MyComponent>
-            r'<[a-z]+[^>]*>',  # HTML tags like <div>, <span>
-            r'<[^>]+\s*/>',  # Self-closing tags like <img />
-            r'{\s*[^}]*\s*}',  # JSX expressions like {variable}
-        ]
-        return any(re.search(pattern, s) for pattern in jsx_patterns)
-
-    def extract_balanced_braces(text, start_pos):
-        """Extract content within balanced braces starting from start_pos"""
-        if start_pos >= len(text) or text[start_pos] != '{':
-            return None, start_pos
-
-        brace_count = 0
-        i = start_pos
-
-        while i < len(text):
-            char = text[i]
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    return text[start_pos:i + 1], i + 1
-            i += 1
-
-        return None, start_pos  # Unmatched braces
-
-    def extract_function_body(text, start_pos):
-        """Extract complete function body including parameters and body"""
-        # Find the opening brace of the function
-        brace_pos = text.find('{', start_pos)
-        if brace_pos == -1:
-            return None
-
-        # Extract the balanced content
-        body, end_pos = extract_balanced_braces(text, brace_pos)
-        if body is None:
-            return None
-
-        # Include everything from start_pos to end_pos
-        return text[start_pos:end_pos]
-
-    # Patterns to identify React components
-    react_patterns = [
-        # Arrow functions: () => {}, (props) => {}, ({prop1, prop2}) => {}
-        (r'(\([^)]*\)\s*=>\s*\{)', r'\([^)]*\)\s*=>\s*\{'),
-
-        # Function declarations: function ComponentName() {}, function() {}
-        (r'(function\s+[A-Z][a-zA-Z0-9]*\s*\([^)]*\)\s*\{)', r'function\s+[A-Z][a-zA-Z0-9]*\s*\([^)]*\)\s*\{'),
-        (r'(function\s*\([^)]*\)\s*\{)', r'function\s*\([^)]*\)\s*\{'),
-
-        # Const/let/var assignments: const Component = () => {}, const Component = function() {}
-        (r'(const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)',
-         r'const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
-        (r'(const\s+[A-Z][a-zA-Z0-9]*\s*=\s*function\s*\([^)]*\)\s*\{)',
-         r'const\s+[A-Z][a-zA-Z0-9]*\s*=\s*function\s*\([^)]*\)\s*\{'),
-        (r'(let\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)', r'let\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
-        (r'(var\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)', r'var\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
-
-        # Export statements: export default () => {}, export const Component = () => {}
-        (r'(export\s+default\s+\([^)]*\)\s*=>\s*\{)', r'export\s+default\s+\([^)]*\)\s*=>\s*\{'),
-        (r'(export\s+const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)',
-         r'export\s+const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
-    ]
-
-    # Look for direct JSX without function wrapper
-    jsx_direct_pattern = r'(<[A-Z][a-zA-Z0-9]*[^>]*>.*?</[A-Z][a-zA-Z0-9]*>|<[a-z]+[^>]*>.*?</[a-z]+>|<[^>]+\s*/>)'
-
-    candidates = []
-
-    # First, try to find function-based components
-    for full_pattern, match_pattern in react_patterns:
-        for match in re.finditer(match_pattern, text, re.DOTALL | re.IGNORECASE):
-            start_pos = match.start()
-
-            # Extract the complete function
-            complete_function = extract_function_body(text, start_pos)
-            if complete_function and is_jsx_element(complete_function):
-                candidates.append((start_pos, complete_function))
-
-    # Also look for direct JSX (might be just JSX without function wrapper)
-    for match in re.finditer(jsx_direct_pattern, text, re.DOTALL):
-        jsx_content = match.group(1)
-        if is_jsx_element(jsx_content):
-            candidates.append((match.start(), jsx_content))
-
-    # Return the first (earliest in text) valid React component
-    if candidates:
-        candidates.sort(key=lambda x: x[0])  # Sort by position in text
-        return candidates[0][1]
-
-    return None
+    component = extract_react_component(text)
+    return component.code if component else None
 
 class ESLintValidator:
     """A class to validate JSX code using ESLint in a self-contained Node.js environment."""
@@ -181,6 +94,24 @@ class ESLintValidator:
         self.temp_jsx_dir = os.path.join(self.eslint_base_dir, 'temp_jsx_files')
         os.makedirs(self.temp_jsx_dir, exist_ok=True)
 
+        # Long-lived ESLint workers shared by all validators, the CLI below is only the fallback
+        self.pool = None
+        if settings.ESLINT_DAEMON_WORKERS > 0:
+            self.pool = get_eslint_pool(
+                self.eslint_base_dir,
+                size=settings.ESLINT_DAEMON_WORKERS,
+                request_timeout=settings.ESLINT_DAEMON_TIMEOUT,
+            )
+
+        # Results of finished ESLint runs, shared by all validators with the same config
+        self.cache = None
+        if settings.JSX_VALIDATION_CACHE_SIZE > 0:
+            self.cache = get_validation_cache(
+                self.config_file_path,
+                max_entries=settings.JSX_VALIDATION_CACHE_SIZE,
+                db_path=settings.JSX_VALIDATION_CACHE_PATH or None,
+            )
+
     def validate_jsx(self, jsx_code: str):
         """
         Validates JSX using NamedTemporaryFile in a specific directory.
@@ -200,6 +131,36 @@ class ESLintValidator:
         
         code_with_imports = plugin_imports + "\n" + cleaned_code
 
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(code_with_imports)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if self.pool is not None:
+            try:
+                result = self._parse_eslint_results(self.pool.lint(code_with_imports))
+                if cache_key:
+                    self.cache.put(cache_key, result)
+                return result
+            except ESLintWorkerError as e:
+                print(f"WARNING: ESLint worker pool failed, falling back to the ESLint CLI: {e}")
+
+        return self._validate_with_cli(code_with_imports, cache_key)
+
+    async def validate_jsx_async(self, jsx_code: str):
+        """
+        validate_jsx for async callers: the pool round trip (or the ESLint CLI) blocks, so it runs in a thread.
+        The event loop keeps serving other requests and concurrent calls lint on several pool workers in parallel.
+        """
+        return await asyncio.to_thread(self.validate_jsx, jsx_code)
+
+    def _validate_with_cli(self, code_with_imports: str, cache_key: str = None):
+        """
+        Validates the code by spawning the ESLint CLI on a temporary file.
+        Only results of a finished ESLint run are stored under cache_key, never process or parse failures.
+        """
         # Create temporary file in our designated directory
         with tempfile.NamedTemporaryFile(
                 mode='w',
@@ -233,7 +194,13 @@ class ESLintValidator:
             )
 
             if lint_process.stdout:
-                return self._parse_eslint_output(lint_process.stdout)
+                try:
+                    result = self._parse_eslint_results(json.loads(lint_process.stdout))
+                except (json.JSONDecodeError, IndexError):
+                    return self._parse_eslint_output(lint_process.stdout)
+                if cache_key and self.cache is not None:
+                    self.cache.put(cache_key, result)
+                return result
 
             return {
                 'valid': False,
@@ -251,32 +218,32 @@ class ESLintValidator:
                 pass
 
     def _parse_eslint_output(self, eslint_json_output):
-        # This parsing logic remains the same
         try:
-            data = json.loads(eslint_json_output)
-            if not data:
-                return {'valid': True, 'errors': [], 'warnings': []}
-
-            file_report = data[0]
-            if "fatal" in file_report and file_report["fatal"]:
-                return {'valid': False, 'errors': [file_report.get('message', 'Fatal ESLint error')]}
-
-            messages = file_report.get('messages', [])
-            errors = [msg for msg in messages if msg.get('severity') == 2]
-            warnings = [msg for msg in messages if msg.get('severity') == 1]
-
-            return {
-                'valid': len(errors) == 0,
-                'errors': errors,
-                'warnings': warnings
-            }
+            return self._parse_eslint_results(json.loads(eslint_json_output))
         except (json.JSONDecodeError, IndexError):
             return {
                 'valid': False,
                 'errors': [{'message': f"Failed to parse ESLint output: {eslint_json_output}"}]
             }
 
-import re
+    def _parse_eslint_results(self, data):
+        """Turns the ESLint results (CLI json format or the worker pool) into the validation result"""
+        if not data:
+            return {'valid': True, 'errors': [], 'warnings': []}
+
+        file_report = data[0]
+        if "fatal" in file_report and file_report["fatal"]:
+            return {'valid': False, 'errors': [file_report.get('message', 'Fatal ESLint error')]}
+
+        messages = file_report.get('messages', [])
+        errors = [msg for msg in messages if msg.get('severity') == 2]
+        warnings = [msg for msg in messages if msg.get('severity') == 1]
+
+        return {
+            'valid': len(errors) == 0,
+            'errors': errors,
+            'warnings': warnings
+        }
 
 
 def clean_up_response(code_string):
@@ -284,33 +251,15 @@ def clean_up_response(code_string):
     Comprehensive function header removal
     Handles arrow functions, regular functions, and function expressions
     """
-    code_string = find_react_code_in_response(code_string)
-
-    # Clean up any extra whitespace
-    code_string = code_string.strip()
-
-    patterns = [
-        # Arrow functions: () => {, (props) => {, ({prop1, prop2}) => {
-        r'^\s*\([^)]*\)\s*=>\s*\{',
-
-        # Regular functions: function() {, function name() {
-        r'^\s*function\s*[a-zA-Z_$][a-zA-Z0-9_$]*\s*\([^)]*\)\s*\{',
-        r'^\s*function\s*\([^)]*\)\s*\{',
-
-        # Function expressions: const name = () => {, const name = function() {
-        r'^\s*const\s+[a-zA-Z_$][a-zA-Z0-9_$]*\s*=\s*\([^)]*\)\s*=>\s*\{',
-        r'^\s*const\s+[a-zA-Z_$][a-zA-Z0-9_$]*\s*=\s*function\s*\([^)]*\)\s*\{',
-
-        # Let/var variations
-        r'^\s*let\s+[a-zA-Z_$][a-zA-Z0-9_$]*\s*=\s*\([^)]*\)\s*=>\s*\{',
-        r'^\s*var\s+[a-zA-Z_$][a-zA-Z0-9_$]*\s*=\s*\([^)]*\)\s*=>\s*\{',
-    ]
+    component = extract_react_component(code_string)
+    if component is None:
+        return None
 
-    for pattern in patterns:
-        if re.match(pattern, code_string):
-            return re.sub(pattern, '', code_string).strip()
+    # The extractor already knows where the header ends, exports are kept as they are
+    if component.kind in STRIPPABLE_HEADERS:
+        return component.body.strip()
 
-    return code_string.strip()
+    return component.code.strip()
 
 #--- TEST CASES ---
 def code_test():
@@ -0,0 +1,68 @@
+/**
+ * Long-lived ESLint worker used by ESLintValidator (code_checker.py).
+ * ESLint and the config are loaded once, then the worker lints code received over stdin.
+ *
+ * Protocol: one JSON object per line in both directions.
+ *   request:  {"id": 1, "code": "..."}     response: {"id": 1, "results": [...]}   (same shape as --format json)
+ *   request:  {"id": 2, "ping": true}      response: {"id": 2, "pong": true}
+ *   on failure:                            response: {"id": 1, "error": "..."}
+ *
+ * Usage: node eslint_daemon.mjs <eslint base dir containing node_modules and eslint.config.js>
+ */
+import { createRequire } from "node:module";
+import path from "node:path";
+import readline from "node:readline";
+
+const baseDir = path.resolve(process.argv[2] || process.cwd());
+// Resolve eslint from the base dir, the script itself may live somewhere without node_modules
+const require = createRequire(path.join(baseDir, "package.json"));
+const { ESLint } = require("eslint");
+
+const eslint = new ESLint({
+  cwd: baseDir,
+  overrideConfigFile: path.join(baseDir, "eslint.config.js"),
+});
+// The config matches **/*.{js,jsx}, so every snippet is linted as a virtual jsx file in the base dir
+const virtualFilePath = path.join(baseDir, "temp_jsx_files", "snippet.jsx");
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+async function handle(line) {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (e) {
+    send({ id: null, error: `Invalid request: ${e.message}` });
+    return;
+  }
+
+  if (request.ping) {
+    send({ id: request.id, pong: true });
+    return;
+  }
+
+  try {
+    const results = await eslint.lintText(request.code || "", { filePath: virtualFilePath });
+    // Same as the --quiet flag of the CLI: only report errors
+    send({ id: request.id, results: ESLint.getErrorResults(results) });
+  } catch (e) {
+    send({ id: request.id, error: String((e && e.message) || e) });
+  }
+}
+
+// Requests are handled one at a time, the Python side sends at most one request per worker
+let queue = Promise.resolve();
+const input = readline.createInterface({ input: process.stdin });
+input.on("line", (line) => {
+  if (line.trim()) {
+    queue = queue.then(() => handle(line));
+  }
+});
+// The parent closed stdin (shutdown or crash), exit after the pending requests
+input.on("close", () => {
+  queue.then(() => process.exit(0));
+});
+
+send({ id: null, ready: true });
@@ -0,0 +1,241 @@
+"""
+Pool of long-lived ESLint worker processes (eslint_daemon.mjs).
+Spawning the ESLint CLI costs a Node start and a config load per validation, which happens hundreds of times
+per course (explainer retries, every tester question). The workers load ESLint once and lint code sent over
+stdin. The pool limits the number of concurrent validations, restarts crashed or hanging workers and
+recycles workers after a number of requests.
+"""
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DAEMON_SCRIPT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "eslint_daemon.mjs")
+
+
+class ESLintWorkerError(Exception):
+    """Raised when a worker crashed, timed out or answered with garbage"""
+
+
+class _ESLintWorker:
+    def __init__(self, base_dir: str, startup_timeout: float):
+        env = os.environ.copy()
+        env.setdefault("HOME", "/home/app")
+        self.process = subprocess.Popen(
+            [shutil.which("node") or "node", DAEMON_SCRIPT, base_dir],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=base_dir,
+            env=env,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.requests = 0
+        self.last_used = time.monotonic()
+        self._next_id = 0
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        # A reader thread turns the blocking pipe into a queue, so reads can time out
+        threading.Thread(target=self._read_stdout, daemon=True, name="eslint-worker-reader").start()
+
+        ready = self._read_message(startup_timeout)
+        if not ready.get("ready"):
+            self.kill()
+            raise ESLintWorkerError(f"ESLint worker did not start: {ready}")
+
+    def _read_stdout(self) -> None:
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)  # EOF, the process exited
+
+    def _read_message(self, timeout: float) -> Dict[str, Any]:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            raise ESLintWorkerError(f"ESLint worker did not answer within {timeout}s")
+        if line is None:
+            raise ESLintWorkerError("ESLint worker closed its output (crashed or exited)")
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            raise ESLintWorkerError(f"Invalid answer from ESLint worker: {line[:200]}")
+
+    def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self._next_id += 1
+        payload = {"id": self._next_id, **payload}
+        try:
+            self.process.stdin.write(json.dumps(payload) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise ESLintWorkerError(f"ESLint worker is gone: {e}")
+
+        message = self._read_message(timeout)
+        if message.get("id") != payload["id"]:
+            raise ESLintWorkerError(f"ESLint worker answered request {message.get('id')}, expected {payload['id']}")
+        self.requests += 1
+        self.last_used = time.monotonic()
+        return message
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self) -> None:
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class ESLintWorkerPool:
+    def __init__(self, base_dir: str, size: int = 2, request_timeout: float = 30.0, startup_timeout: float = 30.0,
+                 max_requests_per_worker: int = 500, health_check_interval: float = 60.0):
+        """
+        :param base_dir: directory with package.json, eslint.config.js and node_modules
+        :param size: number of workers, which is also the number of concurrent validations
+        :param request_timeout: seconds before a hanging worker is killed and replaced
+        :param startup_timeout: seconds a new worker may take to load ESLint
+        :param max_requests_per_worker: workers are recycled after this many validations
+        :param health_check_interval: idle workers are pinged before use after this many seconds
+        """
+        self.base_dir = base_dir
+        self.size = size
+        self.request_timeout = request_timeout
+        self.startup_timeout = startup_timeout
+        self.max_requests_per_worker = max_requests_per_worker
+        self.health_check_interval = health_check_interval
+
+        # Idle workers, None stands for a slot whose worker still has to be started
+        self._idle: "queue.LifoQueue[Optional[_ESLintWorker]]" = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+        self._closed = False
+
+        self.restarts = 0
+        self.validations = 0
+        self.failures = 0
+
+    def lint(self, code: str, wait_timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Lint code and return the ESLint results (same shape as `eslint --quiet --format json`).
+        Blocks while all workers are busy. Raises ESLintWorkerError if no worker could lint the code.
+        """
+        if self._closed:
+            raise ESLintWorkerError("ESLint worker pool is shut down")
+        try:
+            worker = self._idle.get(timeout=wait_timeout)
+        except queue.Empty:
+            raise ESLintWorkerError("No ESLint worker available")
+
+        try:
+            # A reused worker may have died in the meantime, so it gets one retry with a fresh worker.
+            # A fresh worker that fails is not retried, the code itself probably crashes or hangs ESLint.
+            for attempt in range(2):
+                reused = worker is not None
+                try:
+                    worker = self._ensure_healthy(worker)
+                    response = worker.request({"code": code}, self.request_timeout)
+                    break
+                except ESLintWorkerError as e:
+                    self.failures += 1
+                    logger.warning("ESLint worker failed (attempt %d): %s", attempt + 1, e)
+                    if worker is not None:
+                        worker.kill()
+                        self.restarts += 1
+                    worker = None
+                    if attempt == 1 or not reused:
+                        raise
+
+            if "error" in response:
+                raise ESLintWorkerError(response["error"])
+            self.validations += 1
+
+            if worker.requests >= self.max_requests_per_worker:
+                worker.kill()
+                worker = None
+            return response.get("results", [])
+        finally:
+            if self._closed and worker is not None:
+                worker.kill()
+                worker = None
+            self._idle.put(worker)
+
+    def _ensure_healthy(self, worker: Optional[_ESLintWorker]) -> _ESLintWorker:
+        """Start a worker for an empty slot, replace dead workers and ping workers that were idle for long"""
+        if worker is not None and worker.is_alive():
+            if time.monotonic() - worker.last_used < self.health_check_interval:
+                return worker
+            try:
+                if worker.request({"ping": True}, min(self.request_timeout, 5.0)).get("pong"):
+                    return worker
+            except ESLintWorkerError as e:
+                logger.warning("ESLint worker failed its health check: %s", e)
+            worker.kill()
+
+        if worker is not None:
+            self.restarts += 1
+        return _ESLintWorker(self.base_dir, self.startup_timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "validations": self.validations,
+            "failures": self.failures,
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self) -> None:
+        """Stop all idle workers. Busy workers are stopped when they are returned."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.kill()
+
+
+_pools: Dict[str, ESLintWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_eslint_pool(base_dir: str, **kwargs) -> Optional[ESLintWorkerPool]:
+    """
+    Shared pool per ESLint setup directory, all validators of the process use the same workers.
+    Returns None if node is not installed.
+    """
+    if shutil.which("node") is None:
+        return None
+    with _pools_lock:
+        pool = _pools.get(base_dir)
+        if pool is None:
+            pool = ESLintWorkerPool(base_dir, **kwargs)
+            _pools[base_dir] = pool
+        return pool
+
+
+def get_eslint_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Stats of all worker pools, keyed by ESLint setup directory"""
+    with _pools_lock:
+        return {base_dir: pool.stats() for base_dir, pool in _pools.items()}
+
+
+def shutdown_eslint_pools() -> None:
+    """Stop all ESLint workers, called on application shutdown"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
@@ -0,0 +1,295 @@
+"""
+Linear-time extraction of the React component from an LLM response.
+The component headers (arrow functions, function declarations, const/let/var assignments, exports) are found
+with one combined regex pass. The braces are then matched in a single left-to-right scan that understands
+strings, template literals, comments and JSX (so an apostrophe in JSX text or a brace inside a string does not
+throw off the brace depth). If the scan cannot close a header, a plain brace count is used as fallback.
+Plain JSX without a function wrapper is found from the positions of the tags, without a backtracking regex.
+"""
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Parameter lists are bounded, which keeps the header search linear on responses with unbalanced parentheses
+_PARAMS = r"\([^)]{0,2000}\)"
+_NAME = r"[A-Za-z][A-Za-z0-9]*"
+
+# Header kinds, in the order they are preferred when several start at the same position.
+# The lookahead rejects positions that cannot start any header before the alternation is tried.
+_HEADER_REGEX = re.compile(
+    r"(?=[efclv(])(?:" + "|".join([
+        rf"(?P<export_default>export\s+default\s+{_PARAMS}\s*=>\s*\{{)",
+        rf"(?P<export_const>export\s+const\s+{_NAME}\s*=\s*{_PARAMS}\s*=>\s*\{{)",
+        rf"(?P<const_arrow>const\s+{_NAME}\s*=\s*{_PARAMS}\s*=>\s*\{{)",
+        rf"(?P<const_function>const\s+{_NAME}\s*=\s*function\s*{_PARAMS}\s*\{{)",
+        rf"(?P<let_arrow>let\s+{_NAME}\s*=\s*{_PARAMS}\s*=>\s*\{{)",
+        rf"(?P<var_arrow>var\s+{_NAME}\s*=\s*{_PARAMS}\s*=>\s*\{{)",
+        rf"(?P<function_named>function\s+{_NAME}\s*{_PARAMS}\s*\{{)",
+        rf"(?P<function_anonymous>function\s*{_PARAMS}\s*\{{)",
+        rf"(?P<arrow>{_PARAMS}\s*=>\s*\{{)",
+    ]) + ")",
+    re.IGNORECASE
+)
+
+# Header kinds that clean_up_response strips, exports are kept as they are
+STRIPPABLE_HEADERS = {
+    "const_arrow", "const_function", "let_arrow", "var_arrow", "function_named", "function_anonymous", "arrow",
+}
+
+# Closing tags of plain JSX without a function wrapper, components (uppercase) and HTML elements (lowercase)
+_COMPONENT_CLOSE_REGEX = re.compile(r"</[A-Z][a-zA-Z0-9]*>")
+_ELEMENT_CLOSE_REGEX = re.compile(r"</[a-z]+>")
+
+# Characters that matter in each scanner mode, everything in between is skipped with one regex search
+_JS_SPECIAL = re.compile(r"[{}'\"`/<]")
+_TEMPLATE_SPECIAL = re.compile(r"[`\\$]")
+_JSX_TAG_SPECIAL = re.compile(r"[{}'\">/]")
+_JSX_TEXT_SPECIAL = re.compile(r"[{}<]")
+
+# A "<" in JavaScript starts JSX if it follows one of these characters (or "return"), otherwise it is less-than
+_JSX_PRECEDING = set("([{}=,:?&|!;>") | {""}
+
+# Scanner modes
+_JS, _TEMPLATE, _JSX_TAG, _JSX_CLOSING_TAG, _JSX_TEXT = range(5)
+
+
+@dataclass(frozen=True)
+class ReactComponent:
+    """The extracted component: code is text[start:end], the header (e.g. "() => {") is text[start:body_start]"""
+    code: str
+    start: int
+    end: int
+    body_start: int
+    kind: str
+
+    @property
+    def header(self) -> str:
+        return self.code[:self.body_start - self.start]
+
+    @property
+    def body(self) -> str:
+        """Everything after the header, including the final closing brace"""
+        return self.code[self.body_start - self.start:]
+
+
+def _previous_significant(text: str, pos: int) -> str:
+    """Last non-whitespace character before pos, or "return" if the previous word is the return keyword"""
+    i = pos - 1
+    while i >= 0 and text[i].isspace():
+        i -= 1
+    if i < 0:
+        return ""
+    if text[i] == "n" and text[max(0, i - 5):i + 1] == "return" and (i < 6 or not text[i - 6].isalnum()):
+        return ">"  # JSX may follow return
+    return text[i]
+
+
+def _match_braces_lexically(text: str, start: int, stop_at: Optional[int] = None) -> Dict[int, int]:
+    """
+    Single scan from start that pairs every JavaScript "{" with its "}".
+    Braces inside strings, template literals, comments and JSX text do not count.
+    If stop_at is given, the scan ends as soon as the brace at that position is closed.
+    """
+    matches: Dict[int, int] = {}
+    # Stack of (mode, open brace position or -1). The bottom entry is plain JavaScript.
+    stack = [(_JS, -1)]
+    n = len(text)
+    i = start
+
+    while i < n:
+        mode = stack[-1][0]
+
+        if mode == _JS:
+            found = _JS_SPECIAL.search(text, i)
+            if not found:
+                break
+            i = found.start()
+            char = text[i]
+            if char == "{":
+                stack.append((_JS, i))
+            elif char == "}":
+                if len(stack) > 1:
+                    _, open_pos = stack.pop()
+                    if open_pos >= 0:
+                        matches[open_pos] = i
+                        if open_pos == stop_at:
+                            break
+            elif char in "'\"":
+                # String literal, it cannot span lines
+                j = i + 1
+                while j < n and text[j] != char and text[j] != "\n":
+                    j += 2 if text[j] == "\\" else 1
+                i = j
+            elif char == "`":
+                stack.append((_TEMPLATE, -1))
+            elif char == "/":
+                following = text[i + 1:i + 2]
+                if following == "/":
+                    newline = text.find("\n", i)
+                    i = n if newline == -1 else newline
+                    continue
+                if following == "*":
+                    close = text.find("*/", i + 2)
+                    i = n if close == -1 else close + 2
+                    continue
+            elif char == "<":
+                following = text[i + 1:i + 2]
+                if (following.isalpha() or following == ">") and _previous_significant(text, i) in _JSX_PRECEDING:
+                    stack.append((_JSX_TAG, -1))
+            i += 1
+
+        elif mode == _TEMPLATE:
+            found = _TEMPLATE_SPECIAL.search(text, i)
+            if not found:
+                break
+            i = found.start()
+            char = text[i]
+            if char == "\\":
+                i += 2
+                continue
+            if char == "`":
+                stack.pop()
+            elif text[i + 1:i + 2] == "{":
+                # ${ ... } is JavaScript until the matching brace
+                stack.append((_JS, i + 1))
+                i += 1
+            i += 1
+
+        elif mode in (_JSX_TAG, _JSX_CLOSING_TAG):
+            found = _JSX_TAG_SPECIAL.search(text, i)
+            if not found:
+                break
+            i = found.start()
+            char = text[i]
+            if char == "{":
+                stack.append((_JS, i))
+            elif char == "}":
+                # Stray brace in a tag, tolerated
+                pass
+            elif char in "'\"":
+                close = text.find(char, i + 1)
+                i = n if close == -1 else close
+            elif char == "/" and text[i + 1:i + 2] == ">":
+                # Self-closing tag, the element is complete
+                stack.pop()
+                i += 1
+            elif char == ">":
+                stack.pop()
+                if mode == _JSX_TAG:
+                    stack.append((_JSX_TEXT, -1))
+                elif stack[-1][0] == _JSX_TEXT:
+                    # Closing tag, leave the children of the element
+                    stack.pop()
+            i += 1
+
+        else:  # _JSX_TEXT
+            found = _JSX_TEXT_SPECIAL.search(text, i)
+            if not found:
+                break
+            i = found.start()
+            char = text[i]
+            if char == "{":
+                stack.append((_JS, i))
+            elif char == "<":
+                if text[i + 1:i + 2] == "/":
+                    stack.append((_JSX_CLOSING_TAG, -1))
+                    i += 1
+                else:
+                    stack.append((_JSX_TAG, -1))
+            # "}" in JSX text is invalid JSX, it is treated as text
+            i += 1
+
+    return matches
+
+
+def _match_braces_plain(text: str, start: int) -> Dict[int, int]:
+    """Single scan that pairs braces without any knowledge of strings or JSX (the old behaviour)"""
+    matches: Dict[int, int] = {}
+    stack = []
+    for found in re.finditer(r"[{}]", text[start:]):
+        pos = found.start() + start
+        if found.group() == "{":
+            stack.append(pos)
+        elif stack:
+            matches[stack.pop()] = pos
+    return matches
+
+
+def _first_close_after(closes: List[Tuple[int, int]], pos: int) -> Optional[Tuple[int, int]]:
+    """First (start, end) of closes (sorted by start) that starts at or after pos"""
+    idx = bisect_left(closes, (pos, -1))
+    return closes[idx] if idx < len(closes) else None
+
+
+def _find_plain_jsx(text: str, endpos: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) of the first plain JSX element that ends before endpos: an opening tag up to the next closing tag
+    of the same kind (component or HTML element), or a self-closing tag. Every "<" is looked at once and the
+    closing tags are found with one pass each, so the search is linear even if tags are never closed
+    (a lazy ".*?" regex backtracked quadratically on such responses).
+    """
+    closes = {
+        True: [found.span() for found in _COMPONENT_CLOSE_REGEX.finditer(text, 0, endpos)],
+        False: [found.span() for found in _ELEMENT_CLOSE_REGEX.finditer(text, 0, endpos)],
+    }
+    pos = text.find("<", 0, endpos)
+    while pos != -1:
+        tag_end = text.find(">", pos + 1, endpos)
+        if tag_end == -1:
+            # No later "<" can complete a tag either
+            return None
+        following = text[pos + 1]
+        if following.isascii() and following.isalpha():
+            close = _first_close_after(closes[following.isupper()], tag_end + 1)
+            if close is not None:
+                return pos, close[1]
+        if tag_end >= pos + 3 and text[tag_end - 1] == "/":
+            # Self-closing tag, e.g. <Latex math="x" />
+            return pos, tag_end + 1
+        pos = text.find("<", pos + 1, endpos)
+    return None
+
+
+@lru_cache(maxsize=64)
+def extract_react_component(text: str) -> Optional[ReactComponent]:
+    """
+    Return the first React component in text, or None.
+    Function components win over plain JSX unless the JSX starts earlier in the text.
+    Results are cached, validation and clean up usually look at the same response.
+    """
+    component = None
+    first_start = None
+    lexical = plain = None
+    # Headers are found lazily, usually the first one closes and the rest of the text is never searched
+    for header in _HEADER_REGEX.finditer(text):
+        open_pos = header.end() - 1
+        if first_start is None:
+            first_start = header.start()
+            close_pos = _match_braces_lexically(text, first_start, stop_at=open_pos).get(open_pos)
+        else:
+            if lexical is None:
+                lexical = _match_braces_lexically(text, first_start)
+            close_pos = lexical.get(open_pos)
+        if close_pos is None:
+            if plain is None:
+                plain = _match_braces_plain(text, first_start)
+            close_pos = plain.get(open_pos)
+        if close_pos is not None:
+            component = ReactComponent(
+                code=text[header.start():close_pos + 1],
+                start=header.start(),
+                end=close_pos + 1,
+                body_start=header.end(),
+                kind=header.lastgroup,
+            )
+            break
+
+    # Plain JSX only counts if it starts before the function component
+    jsx = _find_plain_jsx(text, component.start if component else len(text))
+    if jsx and (component is None or jsx[0] < component.start):
+        start, end = jsx
+        return ReactComponent(code=text[start:end], start=start, end=end, body_start=start, kind="jsx")
+
+    return component
@@ -0,0 +1,139 @@
+"""
+Cache for JSX validation results.
+Explainer retries often produce the same component again and the tester re-validates unchanged question code,
+so identical code is linted many times. Results are keyed by the sha256 of the linted source
+(plugin_imports + cleaned code), kept in an in-memory LRU and optionally in a small SQLite file that can be
+shared by several workers. The ESLint config is part of the key, so a changed config never serves stale results.
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class JSXValidationCache:
+    def __init__(self, max_entries: int = 2048, db_path: Optional[str] = None, namespace: str = ""):
+        """
+        :param max_entries: number of results kept in the in-memory LRU
+        :param db_path: path to the SQLite store shared across workers. If None, the cache is memory only
+        :param namespace: prefix of every key, e.g. a hash of the ESLint config
+        """
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.logger = logging.getLogger(__name__)
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if db_path:
+            try:
+                directory = os.path.dirname(db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jsx_validations (code_hash TEXT PRIMARY KEY, result TEXT NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self.logger.warning("JSX validation cache disk store unavailable (%s), using memory only: %s", db_path, e)
+                self._conn = None
+
+    def make_key(self, code_with_imports: str) -> str:
+        return hashlib.sha256((self.namespace + code_with_imports).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result, None on a miss"""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+            elif self._conn is not None:
+                result = self._load_from_disk(key)
+                if result is not None:
+                    self._remember(key, result)
+
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, copy.deepcopy(result))
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO jsx_validations (code_hash, result) VALUES (?, ?)",
+                        (key, json.dumps(result))
+                    )
+                    self._conn.commit()
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    self.logger.warning("Failed to persist JSX validation result: %s", e)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters, every hit is an ESLint run that was saved"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        """Insert into the LRU, caller must hold the lock"""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Fetch a result from SQLite, caller must hold the lock"""
+        try:
+            row = self._conn.execute("SELECT result FROM jsx_validations WHERE code_hash = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning("JSX validation cache lookup failed: %s", e)
+            return None
+        return json.loads(row[0]) if row else None
+
+
+def file_fingerprint(path: str) -> str:
+    """Short hash of a file's content, used to namespace the cache by ESLint config"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return ""
+
+
+_caches: Dict[str, JSXValidationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_validation_cache(config_file_path: str, max_entries: int, db_path: Optional[str] = None) -> JSXValidationCache:
+    """Shared cache per ESLint config, all validators of the process use the same entries"""
+    with _caches_lock:
+        cache = _caches.get(config_file_path)
+        if cache is None:
+            cache = JSXValidationCache(max_entries=max_entries, db_path=db_path,
+                                       namespace=file_fingerprint(config_file_path))
+            _caches[config_file_path] = cache
+        return cache
+
+
+def get_validation_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Stats of all validation caches, keyed by ESLint config path"""
+    with _caches_lock:
+        return {path: cache.stats() for path, cache in _caches.items()}
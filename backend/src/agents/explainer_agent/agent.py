@@ -88,7 +88,7 @@ class ExplainerAgent(StandardAgent):
         validation_check = {"errors": []}
         for _ in range(self.iterations):
             output = (await self.explainer.run(user_id=user_id, state=state, content=content))['explanation']
-            validation_check = self.eslint.validate_jsx(output)
+            validation_check = await self.eslint.validate_jsx_async(output)
             if validation_check['valid']:
                 print("Code Validation Passed")
                 return {
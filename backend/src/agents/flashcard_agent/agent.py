@@ -111,7 +111,9 @@ class FlashcardAgent(StandardAgent):
                     pdf_data["total_text"], 
                     config.difficulty.value,
                     calculated_questions,
-                    progress_callback
+                    progress_callback,
+                    pages=[page["text"] for page in pdf_data["pages"]],
+                    toc=pdf_data["toc"]
                 )
                 
                 # Step 4: Package
@@ -125,10 +127,7 @@ class FlashcardAgent(StandardAgent):
             
             else:  # LEARNING type
                 # Extract images for chapters
-                image_paths = []
-                for chapter in chapters:
-                    chapter_images = self.pdf_parser.extract_images_for_learning(pdf_path, chapter["pages"])
-                    image_paths.extend(chapter_images)
+                image_paths = await self.pdf_parser.extract_images_for_learning(pdf_path, chapters)
                 
                 # Step 3: Generate learning cards
                 if progress_callback:
@@ -0,0 +1,186 @@
+"""
+Text preparation for testing flashcards.
+Slides repeat their header and footer on every page, and fixed size windows over the whole text cut through
+sections and overlap each other, both ended up as near-duplicate questions. This module
+ - strips lines that repeat on many pages (frequency index over normalized lines),
+ - chunks along page and TOC boundaries,
+ - budgets the questions by the information density of every chunk,
+ - and removes near-duplicate questions after generation (MinHash over character shingles, LSH for candidates).
+"""
+import hashlib
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+_DIGITS_REGEX = re.compile(r"\d+")
+_WORD_REGEX = re.compile(r"\w+")
+
+# MinHash parameters: 64 hashes in 16 bands of 4, pairs above ~0.5 similarity likely become candidates
+_NUM_HASHES = 64
+_BANDS = 16
+# (a * h + b) mod p with 32 bit shingle hashes and a, b < p stays below 2^63, vectorized in uint64
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240501)
+_HASH_A = _rng.integers(1, _PRIME, size=(_NUM_HASHES, 1), dtype=np.uint64)
+_HASH_B = _rng.integers(0, _PRIME, size=(_NUM_HASHES, 1), dtype=np.uint64)
+
+
+@dataclass
+class TextChunk:
+    text: str
+    start_page: int  # 1-indexed, inclusive
+    end_page: int
+
+
+def _normalize_line(line: str) -> str:
+    # Page numbers and dates differ between pages, "Page 3 of 20" and "Page 4 of 20" are the same line
+    return _DIGITS_REGEX.sub("#", " ".join(line.lower().split()))
+
+
+def strip_boilerplate(pages: Sequence[str], min_share: float = 0.5, min_pages: int = 3) -> List[str]:
+    """
+    Remove lines that occur on at least min_share of the pages (and on min_pages pages), like slide headers,
+    footers and page numbers. Documents with fewer pages than min_pages are returned unchanged.
+    """
+    if len(pages) < min_pages:
+        return list(pages)
+
+    # Count every normalized line once per page
+    frequency: Counter = Counter()
+    for page in pages:
+        frequency.update({_normalize_line(line) for line in page.splitlines() if line.strip()})
+
+    threshold = max(min_pages, int(min_share * len(pages)))
+    boilerplate = {line for line, count in frequency.items() if count >= threshold}
+
+    return [
+        "\n".join(line for line in page.splitlines() if line.strip() and _normalize_line(line) not in boilerplate)
+        for page in pages
+    ]
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """Split a text longer than max_chars at sentence or line ends, without overlap"""
+    parts = []
+    start = 0
+    while start < len(text):
+        end = start + max_chars
+        if end < len(text):
+            window = text[start:end]
+            break_point = max(window.rfind("."), window.rfind("\n"))
+            if break_point > max_chars // 2:  # Only if break point is reasonable
+                end = start + break_point + 1
+        part = text[start:end].strip()
+        if part:
+            parts.append(part)
+        start = end
+    return parts
+
+
+def chunk_pages(pages: Sequence[str], toc: Optional[Sequence[Sequence]] = None, max_chars: int = 8000) -> List[TextChunk]:
+    """
+    Group whole pages into chunks of at most max_chars. A chunk ends before a page that starts a TOC section
+    (level 1 or 2) once it holds a quarter of max_chars, pages longer than max_chars are split on their own.
+    """
+    section_starts: Set[int] = {int(entry[2]) for entry in (toc or []) if entry[0] <= 2}
+    chunks: List[TextChunk] = []
+    texts: List[str] = []
+    size = 0
+    start_page = 1
+
+    def flush(end_page: int):
+        nonlocal texts, size
+        if texts:
+            chunks.append(TextChunk("\n".join(texts), start_page, end_page))
+        texts, size = [], 0
+
+    for page_num, text in enumerate(pages, start=1):
+        text = text.strip()
+        if not text:
+            continue
+        if len(text) > max_chars:
+            flush(page_num - 1)
+            chunks.extend(TextChunk(part, page_num, page_num) for part in split_text(text, max_chars))
+            continue
+        new_section = page_num in section_starts and size >= max_chars // 4
+        if texts and (size + len(text) > max_chars or new_section):
+            flush(page_num - 1)
+        if not texts:
+            start_page = page_num
+        texts.append(text)
+        size += len(text) + 1
+    flush(len(pages))
+    return chunks
+
+
+def information_density(text: str) -> int:
+    """Number of distinct content words (4+ letters), a cheap proxy for how much there is to ask about"""
+    return len({word for word in _WORD_REGEX.findall(text.lower()) if len(word) >= 4 and not word.isdigit()})
+
+
+def budget_questions(chunks: Sequence[TextChunk], num_questions: int) -> List[int]:
+    """
+    Distribute num_questions over the chunks in proportion to their information density (largest remainder).
+    Chunks can get 0 questions if there are more chunks than questions.
+    """
+    densities = [information_density(chunk.text) for chunk in chunks]
+    total = sum(densities)
+    if not chunks or num_questions <= 0:
+        return [0] * len(chunks)
+    if total == 0:
+        densities = [1] * len(chunks)
+        total = len(chunks)
+
+    shares = [num_questions * density / total for density in densities]
+    budget = [int(share) for share in shares]
+    by_remainder = sorted(range(len(chunks)), key=lambda i: shares[i] - budget[i], reverse=True)
+    for i in by_remainder[:num_questions - sum(budget)]:
+        budget[i] += 1
+    return budget
+
+
+def _shingles(text: str, size: int = 5) -> Set[str]:
+    # Character shingles of the normalized words, questions are short and word shingles react to every article
+    normalized = " ".join(_WORD_REGEX.findall(text.lower()))
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), "big") for shingle in _shingles(text)),
+        dtype=np.uint64
+    )
+    if hashes.size == 0:
+        return np.zeros(_NUM_HASHES, dtype=np.uint64)
+    return ((_HASH_A * hashes + _HASH_B) % _PRIME).min(axis=1)
+
+
+def near_duplicate_indices(texts: Sequence[str], threshold: float = 0.85) -> Set[int]:
+    """
+    Indices of texts that are near duplicates (estimated Jaccard similarity of their shingles at least
+    threshold) of an earlier text. The first text of every group is kept.
+    """
+    signatures = [minhash_signature(text) for text in texts]
+    rows = _NUM_HASHES // _BANDS
+    buckets: Dict[tuple, List[int]] = defaultdict(list)
+    duplicates: Set[int] = set()
+
+    for index, signature in enumerate(signatures):
+        candidates: Set[int] = set()
+        for band in range(_BANDS):
+            key = (band, signature[band * rows:(band + 1) * rows].tobytes())
+            candidates.update(buckets[key])
+            buckets[key].append(index)
+        for other in candidates:
+            if other in duplicates:
+                continue
+            agreement = np.count_nonzero(signature == signatures[other]) / _NUM_HASHES
+            if agreement >= threshold:
+                duplicates.add(index)
+                break
+    return duplicates
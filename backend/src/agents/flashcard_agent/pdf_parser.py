@@ -1,9 +1,11 @@
-import uuid
+import asyncio
+import json
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
-import fitz  # PyMuPDF
-from pdf2image import convert_from_path
+from ...config import settings
+from ...core.executors import run_in_parse_pool
+from ...services.data_processors.pdf_processor import parse_pdf_document, render_pdf_pages
 
 
 class PDFParser:
@@ -14,60 +16,88 @@ class PDFParser:
         self.output_dir.mkdir(exist_ok=True)
     
     def extract_text_and_metadata(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract text content and metadata from PDF."""
-        doc = fitz.open(pdf_path)
-        
+        """
+        Extract text content and metadata from PDF.
+        The parsed document is stored in a sidecar file next to the PDF, so analyze and generate
+        do not parse the same upload twice.
+        """
+        parsed = self._load_parsed_document(pdf_path)
+
         # Extract basic metadata
         metadata = {
-            "title": doc.metadata.get("title", "Unknown"),
-            "author": doc.metadata.get("author", "Unknown"),
-            "page_count": len(doc)
+            "title": parsed["metadata"].get("title", "Unknown"),
+            "author": parsed["metadata"].get("author", "Unknown"),
+            "page_count": parsed["page_count"]
         }
-        
-        # Extract text content by page
-        pages = []
-        toc = doc.get_toc()  # Table of contents
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
-            pages.append({
+
+        # Text content by page
+        pages = [
+            {
                 "page_num": page_num + 1,
                 "text": text,
                 "char_count": len(text)
-            })
-
-        doc.close()
+            }
+            for page_num, text in enumerate(parsed["pages"])
+        ]
 
         return {
             "metadata": metadata,
             "pages": pages,
-            "toc": toc,
+            "toc": parsed["toc"],  # Table of contents
             "total_text": " ".join([p["text"] for p in pages])
         }
 
-    def extract_images_for_learning(self, pdf_path: str, chapter_pages: List[int]) -> List[str]:
-        """Convert specific PDF pages to images for learning flashcards."""
+    @staticmethod
+    def _load_parsed_document(pdf_path: str) -> Dict[str, Any]:
+        """Return the parsed PDF from its sidecar file, parsing and writing the sidecar on first use."""
+        sidecar_path = Path(f"{pdf_path}.parsed.json")
+        if sidecar_path.exists() and sidecar_path.stat().st_mtime >= Path(pdf_path).stat().st_mtime:
+            try:
+                with open(sidecar_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Could not read parsed sidecar {sidecar_path}, parsing again: {e}")
+
+        parsed = parse_pdf_document(pdf_path)
         try:
-            # Convert specified pages to images
-            images = convert_from_path(
-                pdf_path,
-                first_page=min(chapter_pages),
-                last_page=max(chapter_pages),
-                dpi=150
-            )
-
-            image_paths = []
-            for i, img in enumerate(images):
-                img_path = self.output_dir / f"chapter_{uuid.uuid4().hex[:8]}.png"
-                img.save(img_path, "PNG")
-                image_paths.append(str(img_path))
-
-            return image_paths
+            with open(sidecar_path, "w", encoding="utf-8") as f:
+                json.dump(parsed, f)
+        except OSError as e:
+            print(f"Could not write parsed sidecar {sidecar_path}: {e}")
+        return parsed
+
+    async def extract_images_for_learning(self, pdf_path: str, chapters: List[Dict[str, Any]]) -> List[str]:
+        """
+        Render the pages of the chapters to images for learning flashcards.
+        Every page is rendered once, even if chapters overlap, in batches spread over the parse process pool.
+        The images are stored next to the PDF (like the parsed sidecar), so a retry does not render them again.
+        """
+        page_indices = sorted({page for chapter in chapters for page in chapter["pages"]})
+        if not page_indices:
+            return []
+
+        image_format = settings.FLASHCARD_IMAGE_FORMAT
+        output_dir = f"{pdf_path}.pages_{settings.FLASHCARD_IMAGE_DPI}_{image_format}"
+
+        # Contiguous batches, one per pool process, each process opens the PDF once
+        batch_count = min(settings.PDF_PARSE_WORKERS, len(page_indices))
+        batch_size = -(-len(page_indices) // batch_count)
+        batches = [page_indices[i:i + batch_size] for i in range(0, len(page_indices), batch_size)]
+
+        try:
+            results = await asyncio.gather(*[
+                run_in_parse_pool(
+                    render_pdf_pages, pdf_path, batch, output_dir, settings.FLASHCARD_IMAGE_DPI, image_format
+                )
+                for batch in batches
+            ])
         except Exception as e:
             print(f"Error converting PDF pages to images: {e}")
             return []
-    
+
+        rendered = {page: path for result in results for page, path in result.items()}
+        return [rendered[page] for page in page_indices if page in rendered]
+
     def identify_chapters(self, pdf_data: Dict[str, Any], chapter_mode: str, slides_per_chapter: Optional[int] = None) -> List[Dict[str, Any]]:
         """Identify chapter boundaries in the PDF."""
         if chapter_mode == "manual" and slides_per_chapter:
@@ -7,10 +7,16 @@ from typing import List, Optional
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
 
+from .chunking import budget_questions, chunk_pages, near_duplicate_indices, strip_boilerplate
 from .instructions_txt import instructions
 from .schema import MultipleChoiceQuestion, TaskStatus
 from ..agent import StandardAgent
 from ..utils import create_text_query
+from ...config import settings
+from ...core.adaptive_limiter import AdaptiveLimiter, LatencyHistogram, is_overload_error
+
+# Retries of a chunk whose call was rejected with 429/5xx, each after the limiter backed off
+CHUNK_OVERLOAD_RETRIES = 2
 
 
 class TestingFlashcardAgent(StandardAgent):
@@ -36,10 +42,21 @@ class TestingFlashcardAgent(StandardAgent):
             session_service=self.session_service,
         )
 
-    async def generate_questions(self, text_content: str, difficulty: str, num_questions: int = 20, progress_callback=None) -> List[MultipleChoiceQuestion]:
-        """Generate multiple choice questions from text content."""
+    async def generate_questions(self, text_content: str, difficulty: str, num_questions: int = 20, progress_callback=None,
+                                 pages: Optional[List[str]] = None, toc: Optional[list] = None) -> List[MultipleChoiceQuestion]:
+        """
+        Generate multiple choice questions from text content.
+        If the text of the single pages is given, repeated headers and footers are removed first and large
+        documents are chunked along the page and TOC boundaries.
+        """
+        if pages is not None:
+            pages = strip_boilerplate(pages)
+            text_content = "\n".join(page for page in pages if page)
+        else:
+            pages = [text_content]
+
         if len(text_content) > 50000:  # Large text, use chunking
-            return await self._generate_questions_from_chunks(text_content, difficulty, num_questions, progress_callback)
+            return await self._generate_questions_from_chunks(pages, toc, difficulty, num_questions, progress_callback)
         
         # For smaller texts, process directly
         prompt = f"""
@@ -101,35 +118,38 @@ class TestingFlashcardAgent(StandardAgent):
                 )
                 questions.append(question)
             
-            return questions[:num_questions]  # Ensure we don't exceed requested number
+            return self._remove_near_duplicates(questions)[:num_questions]  # Ensure we don't exceed requested number
             
         except Exception as e:
             print(f"Error generating questions: {e}")
             return []
 
-    async def _generate_questions_from_chunks(self, text_content: str, difficulty: str, num_questions: int, progress_callback=None) -> List[MultipleChoiceQuestion]:
-        """Generate questions from large text by processing it in chunks with parallel processing."""
-        # Split text into chunks
-        chunks = self._split_text_into_chunks(text_content, chunk_size=8000, overlap=500)
-        
-        # Calculate questions per chunk
-        questions_per_chunk = max(1, num_questions // len(chunks))
-        
-        # Use semaphore to limit concurrent requests
-        semaphore = asyncio.Semaphore(3)  # Max 3 concurrent requests
+    async def _generate_questions_from_chunks(self, pages: List[str], toc: Optional[list], difficulty: str, num_questions: int, progress_callback=None) -> List[MultipleChoiceQuestion]:
+        """
+        Generate questions from large text by processing it in chunks in parallel.
+        The questions are budgeted by the information density of the chunks, near-duplicates are removed.
+        The number of chunks in flight adapts (AIMD): it grows while calls succeed and is cut on 429/5xx.
+        """
+        # Split text into chunks along pages and sections, chunks without a budget are skipped
+        chunks = chunk_pages(pages, toc, max_chars=8000)
+        budget = budget_questions(chunks, num_questions)
+        chunks = [(chunk, questions) for chunk, questions in zip(chunks, budget) if questions > 0]
+
+        limiter = AdaptiveLimiter(
+            initial=settings.FLASHCARD_CHUNK_CONCURRENCY,
+            max_limit=settings.FLASHCARD_CHUNK_MAX_CONCURRENCY,
+        )
+        latency = LatencyHistogram()
+        progress = {"completed": 0, "questions": 0}
         
         start_time = time.time()
         
         # Process chunks in parallel
         tasks = []
-        for i, chunk in enumerate(chunks):
-            chunk_questions = questions_per_chunk
-            if i == len(chunks) - 1:  # Last chunk gets remaining questions
-                chunk_questions = num_questions - (questions_per_chunk * (len(chunks) - 1))
-            
+        for i, (chunk, chunk_questions) in enumerate(chunks):
             task = self._process_chunk_parallel(
-                chunk, difficulty, chunk_questions, i, len(chunks), 
-                semaphore, progress_callback, start_time
+                chunk.text, difficulty, chunk_questions, i, len(chunks),
+                limiter, latency, progress, progress_callback, start_time
             )
             tasks.append(task)
         
@@ -144,20 +164,25 @@ class TestingFlashcardAgent(StandardAgent):
             else:
                 print(f"Error in chunk processing: {result}")
         
-        # Shuffle and limit to requested number
+        # Drop near-duplicates, then shuffle and limit to requested number
+        all_questions = self._remove_near_duplicates(all_questions)
         random.shuffle(all_questions)
-        return all_questions
+        return all_questions[:num_questions]
+
+    @staticmethod
+    def _remove_near_duplicates(questions: List[MultipleChoiceQuestion]) -> List[MultipleChoiceQuestion]:
+        """Keep the first of every group of near-identical questions"""
+        duplicates = near_duplicate_indices([question.question for question in questions])
+        if duplicates:
+            print(f"Removed {len(duplicates)} near-duplicate questions")
+        return [question for i, question in enumerate(questions) if i not in duplicates]
 
     async def _process_chunk_parallel(self, chunk: str, difficulty: str, chunk_questions: int, 
-                                    chunk_index: int, total_chunks: int, semaphore: asyncio.Semaphore, 
+                                    chunk_index: int, total_chunks: int, limiter: AdaptiveLimiter,
+                                    latency: LatencyHistogram, progress: dict,
                                     progress_callback=None, start_time=None) -> List[MultipleChoiceQuestion]:
-        """Process a single chunk in parallel with rate limiting."""
-        async with semaphore:
-            try:
-                # Add small delay to avoid overwhelming the API
-                await asyncio.sleep(0.5 * chunk_index)
-                
-                prompt = f"""
+        """Process a single chunk, an overloaded call is retried after the limiter backed off."""
+        prompt = f"""
                 Generate {chunk_questions} multiple choice questions from the following text content.
                 Difficulty level: {difficulty}
                 
@@ -188,78 +213,67 @@ class TestingFlashcardAgent(StandardAgent):
                 ]
                 """
 
-                response = await self.run(
-                    user_id="system",
-                    state={},
-                    content=create_text_query(prompt)
-                )
-                
-                if response.get("status") != "success":
-                    print(f"Error in agent response: {response}")
-                    return []
-                
-                response_text = response.get("explanation", "")
-                questions_data = self._parse_questions_response(response_text)
-                
-                questions = []
-                for q_data in questions_data:
-                    # Add credit note to explanation
-                    explanation = q_data.get("explanation", "")
-                    if explanation:
-                        explanation += "\n\n---\n*Created with Nexora-AI* - [nexora-ai.de](https://nexora-ai.de)"
-                    else:
-                        explanation = "---\n*Created with Nexora-AI* - [nexora-ai.de](https://nexora-ai.de)"
-                    
-                    question = MultipleChoiceQuestion(
-                        question=q_data["question"],
-                        options=q_data["options"],
-                        correct_answer=q_data["correct_answer"],
-                        explanation=explanation
+        questions = []
+        for attempt in range(CHUNK_OVERLOAD_RETRIES + 1):
+            async with limiter.slot() as started_at:
+                try:
+                    response = await self.run(
+                        user_id="system",
+                        state={},
+                        content=create_text_query(prompt)
                     )
-                    questions.append(question)
-                
-                # Update progress
-                if progress_callback and start_time:
-                    elapsed = time.time() - start_time
-                    progress = 40 + int((chunk_index + 1) / total_chunks * 45)  # 40-85% range
-                    progress_callback(TaskStatus.GENERATING, progress, {
-                        "activity": f"Generated {len(questions)} questions from chunk {chunk_index + 1}/{total_chunks}",
-                        "chunk_progress": f"{chunk_index + 1}/{total_chunks}",
-                        "elapsed_time": f"{elapsed:.1f}s"
-                    })
-                
-                return questions
-                
-            except Exception as e:
-                print(f"Error processing chunk {chunk_index}: {e}")
-                return []
+                except Exception as e:
+                    if is_overload_error(e):
+                        limiter.on_overload(started_at)
+                        if attempt < CHUNK_OVERLOAD_RETRIES:
+                            continue
+                    print(f"Error processing chunk {chunk_index}: {e}")
+                    break
+                limiter.on_success()
+                latency.observe(time.monotonic() - started_at)
 
-    def _split_text_into_chunks(self, text: str, chunk_size: int, overlap: int) -> List[str]:
-        """Split text into overlapping chunks."""
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            
-            # Try to break at sentence boundary
-            if end < len(text):
-                last_period = chunk.rfind('.')
-                last_newline = chunk.rfind('\n')
-                break_point = max(last_period, last_newline)
-                
-                if break_point > start + chunk_size // 2:  # Only if break point is reasonable
-                    chunk = text[start:start + break_point + 1]
-                    end = start + break_point + 1
-            
-            chunks.append(chunk.strip())
-            start = end - overlap
-            
-            if start >= len(text):
+            if response.get("status") != "success":
+                print(f"Error in agent response: {response}")
                 break
-        
-        return chunks
+
+            response_text = response.get("explanation", "")
+            questions_data = self._parse_questions_response(response_text)
+
+            for q_data in questions_data:
+                # Add credit note to explanation
+                explanation = q_data.get("explanation", "")
+                if explanation:
+                    explanation += "\n\n---\n*Created with Nexora-AI* - [nexora-ai.de](https://nexora-ai.de)"
+                else:
+                    explanation = "---\n*Created with Nexora-AI* - [nexora-ai.de](https://nexora-ai.de)"
+
+                question = MultipleChoiceQuestion(
+                    question=q_data["question"],
+                    options=q_data["options"],
+                    correct_answer=q_data["correct_answer"],
+                    explanation=explanation
+                )
+                questions.append(question)
+            break
+
+        # Update progress, chunks finish out of order so count them
+        progress["completed"] += 1
+        progress["questions"] += len(questions)
+        if progress_callback and start_time:
+            elapsed = time.time() - start_time
+            percentage = 40 + int(progress["completed"] / total_chunks * 45)  # 40-85% range
+            progress_callback(TaskStatus.GENERATING, percentage, {
+                "activity": f"Generated {len(questions)} questions from chunk {chunk_index + 1}/{total_chunks}",
+                "chunk_progress": f"{progress['completed']}/{total_chunks}",
+                "elapsed_time": f"{elapsed:.1f}s",
+                "chunks_total": total_chunks,
+                "chunks_completed": progress["completed"],
+                "questions_generated": progress["questions"],
+                "chunk_latency": latency.to_dict(),
+                "concurrency": limiter.stats()
+            })
+
+        return questions
 
     def _parse_questions_response(self, response) -> List[dict]:
         """Parse the AI response to extract questions data."""
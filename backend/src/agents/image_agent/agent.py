@@ -11,36 +11,18 @@ from typing import Dict, Any
 
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
 from google.adk.sessions import InMemorySessionService
 
 from ..callbacks import get_url_from_response
 from ..utils import create_text_query, load_instruction_from_file
 from ..agent import StandardAgent, StructuredAgent
+from .toolset import get_unsplash_toolset
 
 
 class ImageAgent(StandardAgent):
     def __init__(self, app_name: str, session_service):
-        # Have to do this outside of the image agent as image_agent sometimes will be used as a subagent
-        path_to_mcp_server = os.path.join(os.path.dirname(__file__), "../tools/unsplash_mcp_server.py")
-
-        # Determine the path to fastmcp executable
-        # Assumes fastmcp is installed in the same directory as the python interpreter (Scripts/bin)
-        fastmcp_executable = os.path.join(os.path.dirname(sys.executable), "fastmcp")
-
-        # Define toolset for unsplash mcp server
-        unsplash_mcp_toolset = MCPToolset(
-            connection_params=StdioServerParameters(
-                command=fastmcp_executable,
-                args=[
-                    "run",
-                    path_to_mcp_server
-                ],
-                env={
-                    **os.environ
-                }
-            )
-        )
+        # The MCP server process is shared by all image agents, see toolset.py
+        unsplash_mcp_toolset = get_unsplash_toolset()
 
         # Create the image agent
         image_agent = LlmAgent(
@@ -0,0 +1,112 @@
+"""
+Deterministic image search, the fast path of the ImageAgent.
+A search keyword is extracted from the caption and summary without an LLM and the Unsplash search is called
+directly (same pooled client as the MCP server, and the same search cache, see tools/unsplash_search.py).
+The ImageAgent is only needed when the search returns nothing.
+"""
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from ..tools.unsplash_search import get_search_client
+
+logger = logging.getLogger(__name__)
+
+# Words that never make a good search keyword (course content is mostly English or German)
+_STOPWORDS = frozenset("""
+a an and are as at be by can chapter course do does for from how in into introduction is it its of on or
+overview part that the their this to using what when which why with you your basics basic advanced example
+examples learn learning understanding fundamentals summary topic topics lesson lessons
+der die das den dem des ein eine einer eines einem einen und oder mit von zu zur zum im in ist sind auf aus
+bei für über unter wie was warum wenn einführung grundlagen kapitel kurs teil überblick beispiel beispiele
+""".split())
+
+_WORD_REGEX = re.compile(r"[^\W\d_][\w\-]+")
+
+
+def extract_keywords(caption: str, summary: str = "", max_keywords: int = 3) -> List[str]:
+    """
+    Pick the search keywords for an image: words of the caption first (in their order), then the most frequent
+    words of the summary. Stopwords, numbers and one-letter words are skipped.
+    """
+    def words(text: str) -> Iterable[str]:
+        for word in _WORD_REGEX.findall(text or ""):
+            word = word.lower().strip("-")
+            if len(word) > 2 and word not in _STOPWORDS:
+                yield word
+
+    keywords: List[str] = []
+    for word in words(caption):
+        if word not in keywords:
+            keywords.append(word)
+        if len(keywords) == max_keywords:
+            return keywords
+
+    for word, _ in Counter(words(summary)).most_common():
+        if word not in keywords:
+            keywords.append(word)
+        if len(keywords) == max_keywords:
+            break
+    return keywords
+
+
+def _photo_url(photo: Dict) -> Optional[str]:
+    urls = photo.get("urls") or {}
+    return urls.get("regular") or next(iter(urls.values()), None)
+
+
+class ImageSearchStats:
+    """Process-wide counters, every fast path hit is an ImageAgent (LLM) call that was saved"""
+
+    def __init__(self):
+        self.fast_path_hits = 0
+        self.llm_fallbacks = 0
+        self.search_errors = 0
+
+    def stats(self) -> Dict[str, float]:
+        total = self.fast_path_hits + self.llm_fallbacks
+        return {
+            "llm_calls_saved": self.fast_path_hits,
+            "llm_fallbacks": self.llm_fallbacks,
+            "search_errors": self.search_errors,
+            "fast_path_rate": self.fast_path_hits / total if total else 0.0,
+        }
+
+
+_stats = ImageSearchStats()
+
+
+def get_image_search_stats() -> ImageSearchStats:
+    return _stats
+
+
+async def find_image_url(caption: str, summary: str = "") -> Optional[str]:
+    """
+    Search an image for the caption/summary without an LLM.
+    Tries all keywords first, then the caption keywords alone. Returns None if nothing was found or the search
+    failed, the caller then falls back to the ImageAgent.
+    """
+    queries = []
+    for keywords in (extract_keywords(caption, summary), extract_keywords(caption, max_keywords=2)):
+        query = " ".join(keywords)
+        if query and query not in queries:
+            queries.append(query)
+
+    try:
+        for query in queries:
+            # The parameters of the MCP tool's default search, so both share the cache entries
+            results = await get_search_client().search(
+                {"query": query, "page": 1, "per_page": 10, "order_by": "relevant"}
+            )
+            for photo in results:
+                url = _photo_url(photo)
+                if url:
+                    _stats.fast_path_hits += 1
+                    return url
+    except Exception as e:
+        _stats.search_errors += 1
+        logger.warning("Image fast path failed for %r: %s", caption, e)
+
+    _stats.llm_fallbacks += 1
+    return None
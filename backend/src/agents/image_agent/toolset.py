@@ -0,0 +1,86 @@
+"""
+Shared Unsplash MCP toolset.
+All ImageAgent instances use the same toolset, so the `fastmcp run unsplash_mcp_server.py` process is started
+once and kept alive instead of once per agent. A periodic health check lists the tools of the server and
+restarts the process if it died or hangs.
+"""
+import asyncio
+import logging
+import os
+import sys
+from typing import Dict, Optional
+
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
+
+logger = logging.getLogger(__name__)
+
+_toolset: Optional[MCPToolset] = None
+_restarts = 0
+_failed_checks = 0
+
+
+def get_unsplash_toolset() -> MCPToolset:
+    """The toolset shared by all image agents, the server process is spawned on first use"""
+    global _toolset
+    if _toolset is None:
+        path_to_mcp_server = os.path.join(os.path.dirname(__file__), "../tools/unsplash_mcp_server.py")
+
+        # Determine the path to fastmcp executable
+        # Assumes fastmcp is installed in the same directory as the python interpreter (Scripts/bin)
+        fastmcp_executable = os.path.join(os.path.dirname(sys.executable), "fastmcp")
+
+        _toolset = MCPToolset(
+            connection_params=StdioServerParameters(
+                command=fastmcp_executable,
+                args=[
+                    "run",
+                    path_to_mcp_server
+                ],
+                env={
+                    **os.environ
+                }
+            )
+        )
+    return _toolset
+
+
+async def check_unsplash_toolset(timeout: float = 20.0) -> bool:
+    """
+    Health check of the server process. Does nothing before the toolset is used for the first time.
+    If the server does not list its tools in time, its session is closed and the next call starts a new process.
+    """
+    global _restarts, _failed_checks
+    if _toolset is None:
+        return True
+    try:
+        await asyncio.wait_for(_toolset.get_tools(), timeout=timeout)
+        return True
+    except Exception as e:
+        _failed_checks += 1
+        logger.warning("Unsplash MCP server failed its health check, restarting it: %s", e)
+
+    try:
+        await _toolset.close()
+    except Exception as e:
+        logger.warning("Error while closing the Unsplash MCP session: %s", e)
+    _restarts += 1
+    return False
+
+
+async def close_unsplash_toolset() -> None:
+    """Stop the server process, called on application shutdown"""
+    global _toolset
+    if _toolset is not None:
+        try:
+            await _toolset.close()
+        except Exception as e:
+            logger.warning("Error while closing the Unsplash MCP session: %s", e)
+        _toolset = None
+
+
+def get_unsplash_toolset_stats() -> Dict[str, int]:
+    return {
+        "started": int(_toolset is not None),
+        "failed_checks": _failed_checks,
+        "restarts": _restarts,
+    }
@@ -102,7 +102,7 @@ class TesterAgent(StandardAgent):
         """
         code = question['question']
         for i in range(self.iterations):
-            validation_check = self.eslint.validate_jsx(code)
+            validation_check = await self.eslint.validate_jsx_async(code)
             if validation_check['valid']:
                 question['question'] = clean_up_response(code)
                 # Successfully validated and cleaned, return the result.
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 # !/usr/bin/env python3
 
-import os
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Any, List, Dict
 
 import httpx
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
+try:
+    from .unsplash_search import get_search_client
+except ImportError:
+    # `fastmcp run` loads this file as a script with its directory on sys.path
+    from unsplash_search import get_search_client
+
 # Load environment variables
 load_dotenv()
 
@@ -25,6 +30,21 @@ class UnsplashPhoto:
     height: int
 
 
+async def _search(params: Dict[str, Any]) -> List[UnsplashPhoto]:
+    """Runs the search with the shared pooled client, results are cached by query, filters and page"""
+    results = await get_search_client().search(params)
+    return [
+        UnsplashPhoto(
+            id=photo["id"],
+            description=photo.get("description") or "No description available",  # Handle None
+            urls=photo["urls"],
+            width=photo["width"],
+            height=photo["height"]
+        )
+        for photo in results
+    ]
+
+
 @mcp.tool()
 async def search_photos(
         query: str,
@@ -44,10 +64,6 @@ async def search_photos(
     Returns:
         List[UnsplashPhoto]: List of search results containing photo objects
     """
-    access_key = os.getenv("UNSPLASH_ACCESS_KEY")
-    if not access_key:
-        raise ValueError("Missing UNSPLASH_ACCESS_KEY environment variable")
-
     # Validate and constrain parameters
     page = max(1, int(page))
     per_page = max(1, min(int(per_page), 30))
@@ -59,31 +75,8 @@ async def search_photos(
         "order_by": order_by,
     }
 
-    headers = {
-        "Accept-Version": "v1",
-        "Authorization": f"Client-ID {access_key}"
-    }
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.unsplash.com/search/photos",
-                params=params,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return [
-                UnsplashPhoto(
-                    id=photo["id"],
-                    description=photo.get("description") or "No description available",  # Handle None
-                    urls=photo["urls"],
-                    width=photo["width"],
-                    height=photo["height"]
-                )
-                for photo in data["results"]
-            ]
+        return await _search(params)
     except httpx.HTTPStatusError as e:
         print(f"HTTP error: {e.response.status_code} - {e.response.text}")
         raise
@@ -112,10 +105,6 @@ async def search_photos_with_color(
     Returns:
         List[UnsplashPhoto]: List of search results
     """
-    access_key = os.getenv("UNSPLASH_ACCESS_KEY")
-    if not access_key:
-        raise ValueError("Missing UNSPLASH_ACCESS_KEY environment variable")
-
     page = max(1, int(page))
     per_page = max(1, min(int(per_page), 30))
 
@@ -126,31 +115,8 @@ async def search_photos_with_color(
         "color": color,
     }
 
-    headers = {
-        "Accept-Version": "v1",
-        "Authorization": f"Client-ID {access_key}"
-    }
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.unsplash.com/search/photos",
-                params=params,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return [
-                UnsplashPhoto(
-                    id=photo["id"],
-                    description=photo.get("description") or "No description available",
-                    urls=photo["urls"],
-                    width=photo["width"],
-                    height=photo["height"]
-                )
-                for photo in data["results"]
-            ]
+        return await _search(params)
     except Exception as e:
         print(f"Request error: {str(e)}")
         raise
@@ -175,10 +141,6 @@ async def search_photos_with_orientation(
     Returns:
         List[UnsplashPhoto]: List of search results
     """
-    access_key = os.getenv("UNSPLASH_ACCESS_KEY")
-    if not access_key:
-        raise ValueError("Missing UNSPLASH_ACCESS_KEY environment variable")
-
     page = max(1, int(page))
     per_page = max(1, min(int(per_page), 30))
 
@@ -189,31 +151,8 @@ async def search_photos_with_orientation(
         "orientation": orientation,
     }
 
-    headers = {
-        "Accept-Version": "v1",
-        "Authorization": f"Client-ID {access_key}"
-    }
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.unsplash.com/search/photos",
-                params=params,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return [
-                UnsplashPhoto(
-                    id=photo["id"],
-                    description=photo.get("description") or "No description available",
-                    urls=photo["urls"],
-                    width=photo["width"],
-                    height=photo["height"]
-                )
-                for photo in data["results"]
-            ]
+        return await _search(params)
     except Exception as e:
         print(f"Request error: {str(e)}")
         raise
@@ -0,0 +1,192 @@
+"""
+HTTP side of the Unsplash MCP server.
+All searches share one pooled httpx.AsyncClient (keep-alive, so the TLS handshake is paid once per connection
+instead of once per search) and results are kept in a small TTL cache, chapters of one course usually ask for
+the same or similar keywords. The cache is backed by a SQLite file (UNSPLASH_SEARCH_CACHE_PATH) that the backend's
+image fast path (image_agent/keyword_search.py) and the MCP server process share, so a search done by one of them
+is a hit for the other. The module only depends on httpx, so it can be tested without fastmcp.
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_API_URL = "https://api.unsplash.com"
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 512, clock: Callable[[], float] = time.monotonic,
+                 db_path: Optional[str] = None):
+        """
+        :param ttl: seconds a search result stays valid
+        :param max_entries: least recently used results are dropped beyond this size
+        :param clock: time source, replaceable in tests
+        :param db_path: path to the SQLite backing store shared between processes. If None, the cache is memory only
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if db_path:
+            try:
+                directory = os.path.dirname(db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, results TEXT NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Search cache disk store unavailable (%s), using memory only: %s", db_path, e)
+                self._conn = None
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> Tuple:
+        """Key of a search: the query (case and whitespace insensitive) and all filters"""
+        normalized = dict(params)
+        normalized["query"] = " ".join(str(params.get("query", "")).lower().split())
+        return tuple(sorted(normalized.items()))
+
+    def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < self._clock():
+            if entry is not None:
+                del self._entries[key]
+            # Another process may have done the search
+            results = self._load_from_disk(key)
+            if results is None:
+                self.misses += 1
+                return None
+            entry = self._entries[key]
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._remember(key, results, self.ttl)
+        if self._conn is not None:
+            now = time.time()
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO searches (key, stored_at, results) VALUES (?, ?, ?)",
+                                   (json.dumps(key), now, json.dumps(results)))
+                self._conn.execute("DELETE FROM searches WHERE stored_at < ?", (now - self.ttl,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Failed to persist the search %s: %s", key, e)
+
+    def _remember(self, key: Tuple, results: List[Dict[str, Any]], ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_from_disk(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """Results of the key from the SQLite store if they are still valid, remembered in memory"""
+        if self._conn is None or self.ttl <= 0 or self.max_entries <= 0:
+            return None
+        try:
+            row = self._conn.execute("SELECT stored_at, results FROM searches WHERE key = ?",
+                                     (json.dumps(key),)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Search cache lookup failed: %s", e)
+            return None
+        # The store is shared between processes, its entries carry wall clock times
+        remaining = self.ttl - (time.time() - row[0]) if row else 0
+        if remaining <= 0:
+            return None
+        results = json.loads(row[1])
+        self._remember(key, results, remaining)
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+class UnsplashSearchClient:
+    def __init__(self, api_url: Optional[str] = None, cache: Optional[SearchCache] = None, timeout: float = 15.0):
+        """
+        :param api_url: Unsplash API base url, a local stand-in server can be used in tests
+        :param cache: search result cache, a new one with the default TTL if None
+        :param timeout: timeout of a single request in seconds
+        """
+        self.api_url = (api_url or os.getenv("UNSPLASH_API_URL") or DEFAULT_API_URL).rstrip("/")
+        self.cache = cache if cache is not None else SearchCache()
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily, the client has to live in the event loop of the server
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60.0),
+                headers={"Accept-Version": "v1"},
+            )
+        return self._client
+
+    async def search(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Search photos, params are passed to /search/photos (query, page, per_page and the filters).
+        Returns the raw photo dicts of the results.
+        """
+        key = SearchCache.make_key(params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        access_key = os.getenv("UNSPLASH_ACCESS_KEY")
+        if not access_key:
+            raise ValueError("Missing UNSPLASH_ACCESS_KEY environment variable")
+
+        response = await self._get_client().get(
+            "/search/photos",
+            params=params,
+            headers={"Authorization": f"Client-ID {access_key}"}
+        )
+        response.raise_for_status()
+        results = response.json()["results"]
+
+        self.cache.put(key, results)
+        return results
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_search_client: Optional[UnsplashSearchClient] = None
+
+
+def get_search_client() -> UnsplashSearchClient:
+    """Module-level client of the process, shared by all tools of the server process and the image fast path"""
+    global _search_client
+    if _search_client is None:
+        _search_client = UnsplashSearchClient(cache=SearchCache(
+            ttl=float(os.getenv("UNSPLASH_SEARCH_CACHE_TTL", "3600")),
+            max_entries=int(os.getenv("UNSPLASH_SEARCH_CACHE_SIZE", "512")),
+            db_path=os.getenv("UNSPLASH_SEARCH_CACHE_PATH", "./search_cache/unsplash_search.sqlite3") or None,
+        ))
+    return _search_client
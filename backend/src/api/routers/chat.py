@@ -14,7 +14,7 @@ from ...db.database import get_db_context
 from ...utils.auth import get_current_active_user
 from ..schemas.chat import ChatRequest, ChatResponse
 from ...services.chat_service import get_chat_service  # Use lazy getter
-from ...db.crud import chapters_crud
+from ...services.chapter_cache import get_chapter_cache
 
 logger = logging.getLogger(__name__)
 
@@ -90,12 +90,12 @@ async def chat_with_agent(
         HTTPException: If validation fails or an error occurs
     """
     try:
-        with get_db_context() as db:
-            chapter = chapters_crud.get_chapter_by_id(db, chapter_id)
-            if not chapter:
-                raise HTTPException(status_code=404, detail="Chapter not found")
-            if not chapter.course.is_public and chapter.course.user_id != current_user.id:
-                raise HTTPException(status_code=403, detail="You do not have access to this chapter")
+        # Cached read-through, the chat service gets the checked chapter and does not load it again
+        access = get_chapter_cache().get_access(chapter_id)
+        if not access:
+            raise HTTPException(status_code=404, detail="Chapter not found")
+        if not access.can_access(current_user.id):
+            raise HTTPException(status_code=403, detail="You do not have access to this chapter")
 
         # Validate the request
         _validate_chat_request(chat_request)
@@ -116,6 +116,7 @@ async def chat_with_agent(
                 user_id=str(current_user.id),
                 chapter_id=chapter_id,
                 request=chat_request,
+                access=access,
             ),
             media_type="text/event-stream",
             headers={
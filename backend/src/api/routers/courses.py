@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, WebSocket, WebSocketDisconnect, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 import uuid
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -8,11 +9,13 @@ from ...db.models.db_course import Chapter, Course, CourseStatus
 from ...db.models.db_user import User
 # REMOVED: AgentService import moved inside lazy getter to prevent blocking google.adk imports
 # from ...services.agent_service import AgentService
-from ...utils.auth import get_current_active_user
-from ...db.database import get_db, get_db_context, SessionLocal
-from ...db.crud import courses_crud, chapters_crud, users_crud, usage_crud
+from ...utils.auth import get_current_active_user, get_current_active_user_async
+from ...db.database import get_db, get_db_context, SessionLocal, get_async_db, get_async_db_context
+from ...db.crud import courses_crud, chapters_crud, users_crud, usage_crud, checkpoints_crud
+from ...db.crud.aio import chapters_crud as aio_chapters_crud, courses_crud as aio_courses_crud
 from ...services import course_service
-from ...services.course_service import verify_course_ownership
+from ...services.course_service import verify_course_ownership, verify_course_ownership_async
+from ...services.progress_service import get_progress_bus, format_sse
 
 #from ...services.notification_service import manager as ws_manager
 from ..schemas.course import (
@@ -33,15 +36,10 @@ router = APIRouter(
 )
 
 # Lazy AgentService singleton to prevent google.adk/litellm from loading at startup
-_agent_service = None
-
 def get_agent_service():
     """Get or create the AgentService singleton lazily"""
-    global _agent_service
-    if _agent_service is None:
-        from ...services.agent_service import AgentService
-        _agent_service = AgentService()
-    return _agent_service
+    from ...services.agent_service import get_agent_service as _get_agent_service
+    return _get_agent_service()
 
 
 
@@ -143,18 +141,130 @@ async def create_course_request(
 
 
 
+@router.post("/{course_id}/retry", response_model=CourseInfo)
+async def retry_course_creation(
+        course_id: int,
+        background_tasks: BackgroundTasks,
+        current_user: User = Depends(get_current_active_user),
+        db: Session = Depends(get_db)
+) -> CourseInfo:
+    """
+    Retry a failed course creation. Finished stages are restored from their checkpoints,
+    so only the remaining work is done again.
+    """
+    course = await verify_course_ownership(course_id, str(current_user.id), db)
+    if str(course.user_id) != str(current_user.id):
+        # Public courses of other users are readable, but cannot be retried
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found or access denied"
+        )
+
+    if str(course.status) != CourseStatus.FAILED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only failed courses can be retried"
+        )
+    if checkpoints_crud.get_checkpoint(db, course_id, "request") is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This course cannot be resumed, please create it again"
+        )
+
+    # Claim the course atomically, so concurrent retries do not resume it twice
+    if not courses_crud.claim_failed_course(db, course_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only failed courses can be retried"
+        )
+    db.refresh(course)
+    background_tasks.add_task(
+        get_agent_service().resume_course,
+        course_id=course_id,
+        task_id=str(uuid.uuid4())
+    )
+
+    return CourseInfo(
+        course_id=int(course.id),
+        total_time_hours=int(course.total_time_hours),
+        status=str(course.status),
+        title=course.title,
+        description=course.description,
+        chapter_count=course.chapter_count,
+        image_url=course.image_url,
+        completed_chapter_count=0,
+    )
+
+
+@router.get(
+    "/{course_id}/events",
+    response_model=None,
+    responses={200: {"description": "Server-Sent Events stream", "content": {"text/event-stream": {}}}},
+)
+async def stream_course_events(
+        course_id: int,
+        last_event_id: Optional[str] = None,
+        last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+        current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """
+    Stream the course creation progress as Server-Sent Events:
+    course_started, stage_started/stage_finished (documents, info, planner, chapters),
+    chapter_ready, questions_ready and finally course_finished or course_failed.
+    Reconnecting clients continue after the Last-Event-ID header (or the last_event_id query parameter).
+    """
+    with get_db_context() as db:
+        course = await verify_course_ownership(course_id, str(current_user.id), db)
+        course_status = str(course.status)
+
+    bus = get_progress_bus()
+    resume_from = last_event_id_header or last_event_id
+
+    def final_event(status: str):
+        terminal = "course_failed" if status == CourseStatus.FAILED.value else "course_finished"
+        return bus.final_event(course_id, terminal, {"status": status})
+
+    async def poll_final():
+        # The creation may run in another worker, whose events this worker never sees
+        async with get_async_db_context() as async_db:
+            course_db = await aio_courses_crud.get_course_by_id(async_db, course_id)
+        if course_db is None:
+            return final_event(CourseStatus.FAILED.value)
+        status = str(course_db.status)
+        return final_event(status) if status != CourseStatus.CREATING.value else None
+
+    async def event_stream():
+        yield "retry: 3000\n\n"
+        if course_status != CourseStatus.CREATING.value and not bus.has_history(course_id):
+            # Nothing in progress and no history (e.g. after a restart), only report the final state
+            yield format_sse(final_event(course_status))
+            return
+        async for event in bus.subscribe(course_id, resume_from, poll_final=poll_final):
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/public", response_model=List[CourseInfo])
-async def get_public_courses(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
+async def get_public_courses(db: AsyncSession = Depends(get_async_db), skip: int = 0, limit: int = 100):
     """
     Get all public courses.
     """
-    return course_service.get_public_courses(db, skip=skip, limit=limit)
+    return await aio_courses_crud.get_public_courses_infos(db, user_id="", skip=skip, limit=limit)
 
 
 @router.get("/", response_model=List[CourseInfo])
 async def get_user_courses(
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db),
         skip: int = 0,
         limit: int = 200
 ):
@@ -162,7 +272,7 @@ async def get_user_courses(
     Get all courses belonging to the current user.
     Pagination supported with skip and limit parameters.
     """
-    return course_service.get_user_courses( db, current_user.id, skip, limit)
+    return await aio_courses_crud.get_courses_infos(db, current_user.id, skip, limit)
 
 
 @router.get("/health")
@@ -173,14 +283,14 @@ async def health_check():
 @router.get("/{course_id}", response_model=CourseInfo)
 async def get_course_by_id(
         course_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific course by ID.
     Only accessible if the course belongs to the current user.
     """
-    course = await verify_course_ownership(course_id, str(current_user.id), db)
+    course = await verify_course_ownership_async(course_id, str(current_user.id), db)
     
     return CourseInfo(
         course_id=int(course.id),
@@ -191,7 +301,7 @@ async def get_course_by_id(
         description=str(course.description),
         chapter_count=int(course.chapter_count) if course.chapter_count else None,
         image_url= str(course.image_url) if course.image_url else None,
-        completed_chapter_count=course_service.get_completed_chapters_count(db, course.id),
+        completed_chapter_count=await aio_chapters_crud.get_completed_chapters_count(db, course.id),
         is_public=course.is_public,
         created_at=course.created_at,
     )
@@ -201,16 +311,16 @@ async def get_course_by_id(
 @router.get("/{course_id}/chapters", response_model=List[ChapterSchema])
 async def get_course_chapters(
         course_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all chapters for a specific course.
     Only accessible if the course belongs to the current user.
     """
-    await verify_course_ownership(course_id, str(current_user.id), db)
+    await verify_course_ownership_async(course_id, str(current_user.id), db)
 
-    chapters = chapters_crud.get_chapters_by_course_id(db, course_id)
+    chapters = await aio_chapters_crud.get_chapters_by_course_id(db, course_id)
     if not chapters:
         return []
 
@@ -224,18 +334,18 @@ async def get_course_chapters(
 async def get_chapter_by_id(
         course_id: int,
         chapter_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific chapter by ID within a course.
     Only accessible if the course belongs to the current user.
     """
     # First verify course ownership
-    course = await verify_course_ownership(course_id, str(current_user.id), db)
+    course = await verify_course_ownership_async(course_id, str(current_user.id), db)
     
     # Find the specific chapter
-    chapter = course_service.get_chapter_by_id(course_id, chapter_id, db)
+    chapter = await course_service.get_chapter_by_id_async(course_id, chapter_id, db)
     
     # Build chapter response
     return ChapterSchema(
@@ -255,23 +365,23 @@ async def get_chapter_by_id(
 async def mark_chapter_complete(
         course_id: int,
         chapter_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark a chapter as completed.
     Only accessible if the course belongs to the current user.
     """
     # First verify course ownership
-    course = await verify_course_ownership(course_id, current_user.id, db)
+    course = await verify_course_ownership_async(course_id, current_user.id, db)
     
     # Find the specific chapter
-    chapter = course_service.get_chapter_by_id(course_id, chapter_id, db)
+    chapter = await course_service.get_chapter_by_id_async(course_id, chapter_id, db)
     
     # Mark as completed
     chapter.is_completed = True
-    db.commit()
-    db.refresh(chapter)
+    await db.commit()
+    await db.refresh(chapter)
     
     return {
         "message": f"Chapter '{chapter.caption}' marked as completed",
@@ -287,13 +397,13 @@ async def update_course_details(
         course_id: int,
         title: str = None,
         description: str = None,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a course's title and description.
     """
-    course = await verify_course_ownership(course_id, str(current_user.id), db)
+    course = await verify_course_ownership_async(course_id, str(current_user.id), db)
 
     update_data = {}
     if title:
@@ -301,7 +411,7 @@ async def update_course_details(
     if description:
         update_data["description"] = description
 
-    updated_course = courses_crud.update_course(db, course_id, **update_data)
+    updated_course = await aio_courses_crud.update_course(db, course_id, **update_data)
 
     return CourseInfo(
         course_id=int(updated_course.id),
@@ -311,7 +421,7 @@ async def update_course_details(
         description=str(updated_course.description),
         chapter_count=int(updated_course.chapter_count) if updated_course.chapter_count else None,
         image_url=str(updated_course.image_url) if updated_course.image_url else None,
-        completed_chapter_count=course_service.get_completed_chapters_count(db, course_id),
+        completed_chapter_count=await aio_chapters_crud.get_completed_chapters_count(db, course_id),
         is_public=updated_course.is_public,
     )
 
@@ -320,17 +430,17 @@ async def update_course_details(
 async def update_course_public_status(
     course_id: int,
     request: UpdateCoursePublicStatusRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the public status of a course.
     """
     # Verify course ownership
-    await verify_course_ownership(course_id, str(current_user.id), db)
+    await verify_course_ownership_async(course_id, str(current_user.id), db)
 
     # Update the public status
-    updated_course = courses_crud.update_course_public_status(db, course_id, request.is_public)
+    updated_course = await aio_courses_crud.update_course_public_status(db, course_id, request.is_public)
 
     if not updated_course:
         raise HTTPException(
@@ -344,18 +454,18 @@ async def update_course_public_status(
 @router.delete("/{course_id}")
 async def delete_course(
         course_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a course and all its chapters.
     Only accessible if the course belongs to the current user.
     """
     # Verify course ownership
-    course = await verify_course_ownership(course_id, current_user.id, db)
+    course = await verify_course_ownership_async(course_id, current_user.id, db)
 
     # Delete the course (cascades to chapters)
-    success = courses_crud.delete_course(db, course_id)
+    success = await aio_courses_crud.delete_course(db, course_id)
 
     if not success:
         raise HTTPException(
@@ -380,15 +490,15 @@ async def update_chapter(
         content: str,
         time_minutes: int,
         image_url: Optional[str] = None,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update chapter information.
     Only accessible if the course belongs to the current user.
     """
     # First verify course ownership
-    _ = await verify_course_ownership(course_id, str(current_user.id), db)
+    _ = await verify_course_ownership_async(course_id, str(current_user.id), db)
     
     # Build update data
     update_data = {}
@@ -410,7 +520,7 @@ async def update_chapter(
         )
 
     # Update the chapter
-    updated_chapter = chapters_crud.update_chapter(db, chapter_id, **update_data)
+    updated_chapter = await aio_chapters_crud.update_chapter(db, chapter_id, **update_data)
 
     if not updated_chapter:
         raise HTTPException(
@@ -435,23 +545,23 @@ async def update_chapter(
 async def delete_chapter(
         course_id: int,
         chapter_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a chapter.
     Only accessible if the course belongs to the current user.
     """
     # First verify course ownership
-    course = await verify_course_ownership(course_id, current_user.id, db)
+    course = await verify_course_ownership_async(course_id, current_user.id, db)
 
     # Find the specific chapter
-    chapter = course_service.get_chapter_by_id(course_id, chapter_id, db)
+    chapter = await course_service.get_chapter_by_id_async(course_id, chapter_id, db)
 
     chapter_caption = chapter.caption
 
     # Delete the chapter
-    success = chapters_crud.delete_chapter(db, chapter_id)
+    success = await aio_chapters_crud.delete_chapter(db, chapter_id)
 
     if not success:
         raise HTTPException(
@@ -470,18 +580,18 @@ async def delete_chapter(
 async def mark_chapter_incomplete(
         course_id: int,
         chapter_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: User = Depends(get_current_active_user_async),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark a chapter as incomplete (not completed).
     Only accessible if the course belongs to the current user.
     """
     # First verify course ownership
-    course = await verify_course_ownership(course_id, current_user.id, db)
+    course = await verify_course_ownership_async(course_id, current_user.id, db)
 
     # Find the specific chapter
-    chapter = course_service.get_chapter_by_id(course_id, chapter_id, db)
+    chapter = await course_service.get_chapter_by_id_async(course_id, chapter_id, db)
 
     if not chapter:
         raise HTTPException(
@@ -490,7 +600,7 @@ async def mark_chapter_incomplete(
         )
 
     # Mark as incomplete using crud method
-    updated_chapter = chapters_crud.mark_chapter_incomplete(db, chapter_id)
+    updated_chapter = await aio_chapters_crud.mark_chapter_incomplete(db, chapter_id)
 
     if not updated_chapter:
         raise HTTPException(
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-import io
+from typing import Dict, List, Optional, Tuple, Union
+import asyncio
 
 from ...db.models.db_user import User
 from ...utils.auth import get_current_active_user
@@ -12,6 +12,10 @@ from ...api.schemas.file import (
     ImageInfo
 )
 from ...db.models.db_file import Document, Image
+from ...db.crud import documents_crud, images_crud
+from ...services.blob_store import (
+    BlobTooLargeError, S3BlobStore, StoredBlob, get_blob_store, read_file_data
+)
 
 router = APIRouter(
     prefix="/files",
@@ -82,6 +86,99 @@ async def verify_image_ownership(image_id: int, user_id: int, db: Session) -> Im
     return image
 
 
+async def store_upload(file: UploadFile, max_size: int, too_large_detail: str) -> StoredBlob:
+    """Stream an upload into the blob store, the file is never held in memory as a whole"""
+    try:
+        blob = await asyncio.to_thread(get_blob_store().put_stream, file.file, max_size)
+    except BlobTooLargeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=too_large_detail)
+    if blob.size == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Empty file not allowed"
+        )
+    return blob
+
+
+def parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) of a "bytes=start-end" Range header, end inclusive, "bytes=-n" are the last n bytes.
+    None if the range is not satisfiable, raises ValueError if the header is malformed.
+    """
+    range_type, range_spec = range_header.split('=')
+    if range_type.strip().lower() != 'bytes':
+        raise ValueError("Invalid range type")
+
+    start_end = range_spec.split(',')[0].strip().split('-')
+    if len(start_end) != 2 or not (start_end[0] or start_end[1]):
+        raise ValueError("Invalid range")
+    if not start_end[0]:
+        start = max(0, file_size - int(start_end[1]))
+        end = file_size - 1
+    else:
+        start = int(start_end[0])
+        end = min(int(start_end[1]), file_size - 1) if start_end[1] else file_size - 1
+
+    if start >= file_size or end < start:
+        return None
+    return start, end
+
+
+def serve_file(request: Request, row: Union[Document, Image], headers: Dict[str, str]) -> Response:
+    """
+    Response with the content of a document or image, Range requests get the requested bytes only.
+    Blobs of the local store are sent by FileResponse (sendfile, Range support of its own),
+    blobs of the S3 store are streamed from the bucket, rows from before the blob store are sent from memory.
+    """
+    blob = row.blob
+    store = get_blob_store()
+    if blob is not None and not isinstance(store, S3BlobStore):
+        path = store.local_path(blob.sha256)
+        if path is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File content not found")
+        return FileResponse(path, media_type=row.content_type, headers=headers)
+
+    if blob is not None:
+        file_size = blob.size
+        data = None
+    else:
+        data = read_file_data(row)
+        file_size = len(data)
+    headers = {**headers, "Accept-Ranges": "bytes"}
+
+    def body(start: int, end: int, status_code: int) -> Response:
+        if data is not None:
+            return Response(content=data[start:end + 1], status_code=status_code, headers=headers,
+                            media_type=row.content_type)
+        return StreamingResponse(store.iter_range(blob.sha256, start, end), status_code=status_code,
+                                 headers=headers, media_type=row.content_type)
+
+    range_header = request.headers.get("Range")
+    if not range_header or file_size == 0:
+        headers["Content-Length"] = str(file_size)
+        return body(0, file_size - 1, 200)
+
+    try:
+        byte_range = parse_range(range_header, file_size)
+    except (ValueError, IndexError):
+        return Response(
+            status_code=400,  # Bad Request
+            content="Invalid range header"
+        )
+    if byte_range is None:
+        return Response(
+            status_code=416,  # Range Not Satisfiable
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+
+    start, end = byte_range
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{file_size}",
+        "Content-Length": str(end - start + 1)
+    })
+    return body(start, end, 206)  # Partial Content
+
+
 # ========== DOCUMENT ENDPOINTS ==========
 
 @router.post("/documents", response_model=DocumentInfo)
@@ -98,35 +195,20 @@ async def upload_document(
             detail=f"File type not allowed. Allowed types: {list(ALLOWED_DOCUMENT_TYPES.keys())}"
         )
 
-    # Read file data
-    file_data = await file.read()
-    file_size = len(file_data)
-
-    # Validate file size
-    if file_size > MAX_DOCUMENT_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {MAX_DOCUMENT_SIZE // (1024 * 1024)} MB"
-        )
-
-    if file_size == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Empty file not allowed"
-        )
+    blob = await store_upload(
+        file, MAX_DOCUMENT_SIZE, f"File too large. Maximum size: {MAX_DOCUMENT_SIZE // (1024 * 1024)} MB"
+    )
 
-    # Create document record
-    document = Document(
+    # Create document record, the content stays in the blob store
+    document = documents_crud.create_document_from_blob(
+        db,
         user_id=current_user.id,
         filename=file.filename,
         content_type=file.content_type,
-        file_data=file_data,
+        sha256=blob.sha256,
+        size=blob.size,
     )
 
-    db.add(document)
-    db.commit()
-    db.refresh(document)
-
     return document
 
 
@@ -159,68 +241,10 @@ async def download_document(
 ):
     """Download a specific document with range request support."""
     document = await verify_document_ownership(doc_id, current_user.id, db)
-    file_data = document.file_data
-    file_size = len(file_data)
-    
+
     # Determine content disposition based on file type
     content_disposition = "inline" if document.content_type == "application/pdf" else f"attachment; filename={document.filename}"
-    
-    # Common headers
-    headers = {
-        "Content-Disposition": content_disposition,
-        "Content-Length": str(file_size),
-        "Accept-Ranges": "bytes",
-        "Content-Type": document.content_type,
-    }
-    
-    # Handle range requests
-    range_header = request.headers.get("Range")
-    if range_header:
-        try:
-            # Parse range header (e.g., "bytes=0-999")
-            range_type, range_spec = range_header.split('=')
-            if range_type.strip().lower() != 'bytes':
-                raise ValueError("Invalid range type")
-                
-            start_end = range_spec.split('-')
-            start = int(start_end[0]) if start_end[0] else 0
-            end = (int(start_end[1]) if len(start_end) > 1 and start_end[1] 
-                  else file_size - 1)
-            
-            start = max(0, start)
-            end = min(end, file_size - 1)
-            
-            if start >= file_size or end < start:
-                return Response(
-                    status_code=416,  # Range Not Satisfiable
-                    headers={"Content-Range": f"bytes */{file_size}"}
-                )
-            
-            content_length = end - start + 1
-            headers.update({
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Content-Length": str(content_length)
-            })
-            
-            return Response(
-                content=file_data[start:end+1],
-                status_code=206,  # Partial Content
-                headers=headers,
-                media_type=document.content_type
-            )
-            
-        except (ValueError, IndexError):
-            return Response(
-                status_code=400,  # Bad Request
-                content="Invalid range header"
-            )
-    
-    # Full file response
-    return Response(
-        content=file_data,
-        headers=headers,
-        media_type=document.content_type
-    )
+    return serve_file(request, document, {"Content-Disposition": content_disposition})
 
 
 @router.get("/documents/{doc_id}/info", response_model=DocumentInfo)
@@ -265,35 +289,20 @@ async def upload_image(
             detail=f"Image type not allowed. Allowed types: {list(ALLOWED_IMAGE_TYPES.keys())}"
         )
 
-    # Read file data
-    image_data = await file.read()
-    file_size = len(image_data)
-
-    # Validate file size
-    if file_size > MAX_IMAGE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Image too large. Maximum size: {MAX_IMAGE_SIZE // (1024 * 1024)} MB"
-        )
-
-    if file_size == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Empty file not allowed"
-        )
+    blob = await store_upload(
+        file, MAX_IMAGE_SIZE, f"Image too large. Maximum size: {MAX_IMAGE_SIZE // (1024 * 1024)} MB"
+    )
 
-    # Create image record
-    image = Image(
+    # Create image record, the content stays in the blob store
+    image = images_crud.create_image_from_blob(
+        db,
         user_id=current_user.id,
         filename=file.filename,
         content_type=file.content_type,
-        image_data=image_data,
+        sha256=blob.sha256,
+        size=blob.size,
     )
 
-    db.add(image)
-    db.commit()
-    db.refresh(image)
-
     return image
 
 
@@ -326,65 +335,10 @@ async def download_image(
 ):
     """Download a specific image with range request support."""
     image = await verify_image_ownership(image_id, current_user.id, db)
-    image_data = image.image_data
-    file_size = len(image_data)
-    
-    # Common headers with cache control
-    headers = {
+    return serve_file(request, image, {
         "Content-Disposition": f"inline; filename={image.filename}",
-        "Content-Length": str(file_size),
-        "Content-Type": image.content_type,
         "Cache-Control": "public, max-age=31536000",  # Cache for 1 year
-        "Accept-Ranges": "bytes"
-    }
-    
-    # Handle range requests
-    range_header = request.headers.get("Range")
-    if range_header:
-        try:
-            range_type, range_spec = range_header.split('=')
-            if range_type.strip().lower() != 'bytes':
-                raise ValueError("Invalid range type")
-                
-            start_end = range_spec.split('-')
-            start = int(start_end[0]) if start_end[0] else 0
-            end = (int(start_end[1]) if len(start_end) > 1 and start_end[1] 
-                  else file_size - 1)
-            
-            start = max(0, start)
-            end = min(end, file_size - 1)
-            
-            if start >= file_size or end < start:
-                return Response(
-                    status_code=416,  # Range Not Satisfiable
-                    headers={"Content-Range": f"bytes */{file_size}"}
-                )
-            
-            content_length = end - start + 1
-            headers.update({
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Content-Length": str(content_length)
-            })
-            
-            return Response(
-                content=image_data[start:end+1],
-                status_code=206,  # Partial Content
-                headers=headers,
-                media_type=image.content_type
-            )
-            
-        except (ValueError, IndexError):
-            return Response(
-                status_code=400,  # Bad Request
-                content="Invalid range header"
-            )
-    
-    # Full file response
-    return Response(
-        content=image_data,
-        headers=headers,
-        media_type=image.content_type
-    )
+    })
 
 
 @router.get("/images/{image_id}/info", response_model=ImageInfo)
@@ -28,7 +28,9 @@ def get_flashcard_service():
         # Import here to avoid loading google.adk at module import time
         from google.adk.sessions import InMemorySessionService
         from ...services.flashcard_service import FlashcardService
+        from ...core.session_sweeper import register_session_service
         session_service = InMemorySessionService()
+        register_session_service(session_service)
         flashcard_service = FlashcardService("nexora", session_service)
     return flashcard_service
 
@@ -51,7 +53,7 @@ async def upload_pdf(
         raise HTTPException(status_code=400, detail="File size too large (max 50MB)")
     
     try:
-        result = service.upload_document(content, file.filename)
+        result = service.upload_document(content, file.filename, current_user.id)
         return UploadResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
@@ -122,7 +124,7 @@ async def generate_flashcards(
     )
     
     try:
-        task_id = service.start_generation_task(request.document_id, config)
+        task_id = service.start_generation_task(request.document_id, config, current_user.id)
         return GenerateResponse(task_id=task_id)
         
     except Exception as e:
@@ -9,12 +9,13 @@ from ...db.models.db_course import Chapter, Course, CourseStatus
 from ...db.models.db_user import User
 # REMOVED: Unused import that was triggering google.adk/litellm loading
 # from ...services.agent_service import AgentService
-from ...utils.auth import get_current_active_user
+from ...utils.auth import get_current_active_user, get_current_admin_user
 from ...db.database import get_db, get_db_context, SessionLocal
 from ...db.crud import courses_crud, chapters_crud, users_crud
 from ...services import course_service
 from ...services.course_service import verify_course_ownership
 from ...db.crud import usage_crud
+from ...core.agent_scheduler import get_agent_scheduler
 
 
 from ..schemas.statistics import (
@@ -43,6 +44,47 @@ def get_statistics():
 
 
 
+@router.get("/agent_scheduler")
+async def get_agent_scheduler_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Queue depth, calls in flight and wait times of the agent call scheduler (admin only).
+    Runs on the event loop that owns the scheduler, a threadpool endpoint would read its queues while they change.
+    """
+    return get_agent_scheduler().stats()
+
+
+@router.get("/jsx_validation")
+def get_jsx_validation_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Hit rate of the JSX validation cache (every hit is a saved ESLint run) and ESLint worker stats (admin only).
+    """
+    from ...agents.code_checker.validation_cache import get_validation_cache_stats
+    from ...agents.code_checker.eslint_pool import get_eslint_pool_stats
+    return {
+        "cache": get_validation_cache_stats(),
+        "eslint_workers": get_eslint_pool_stats(),
+    }
+
+
+@router.get("/image_search")
+def get_image_search_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    ImageAgent (LLM) calls saved by the deterministic image search and fallbacks to the agent (admin only).
+    """
+    from ...agents.image_agent.keyword_search import get_image_search_stats as get_stats
+    return get_stats().stats()
+
+
+@router.get("/generation_cache")
+def get_generation_cache_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Hit rate of the cross-course InfoAgent/PlannerAgent cache, every hit is a saved agent call (admin only).
+    """
+    from ...services.generation_cache import get_generation_cache
+    cache = get_generation_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
 @router.post("/usage")
 def post_usage(
     usage: UsagePost,
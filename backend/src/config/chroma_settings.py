@@ -5,5 +5,12 @@ CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8001"))
 CHROMA_COLLECTION_NAME = os.getenv("CHROMA_COLLECTION_NAME", "nexora_content")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 
+# Number of paragraphs encoded and written to chroma per batch during bulk ingestion
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+
+# Embedding cache: in-memory LRU size and SQLite backing store (empty path disables the disk store)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache/embeddings.sqlite3")
+
 # For production, use HTTP client
 CHROMA_CLIENT_TYPE = os.getenv("CHROMA_CLIENT_TYPE", "http")  # "http" or "persistent"
\ No newline at end of file
@@ -95,6 +95,109 @@ UNSPLASH_SECRET_KEY = os.getenv("UNSPLASH_SECRET_KEY")
 CHROMA_DB_URL = os.getenv("CHROMA_DB_URL", "http://localhost:8000")
 
 
+# Executors for CPU-bound work during course creation (PDF parsing and embedding)
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "2"))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "2"))
+# Threads for the chat's section retrieval, separate so chat messages never queue behind a document ingestion
+CHAT_EMBEDDING_WORKERS = int(os.getenv("CHAT_EMBEDDING_WORKERS", "2"))
+
+# Page images of learning flashcards, rendered in the parse pool: resolution and format ("png" or "jpeg")
+FLASHCARD_IMAGE_DPI = int(os.getenv("FLASHCARD_IMAGE_DPI", "150"))
+FLASHCARD_IMAGE_FORMAT = os.getenv("FLASHCARD_IMAGE_FORMAT", "png").lower()
+
+# Chunk calls of large testing decks: concurrency at the start and upper bound of the adaptive (AIMD) limit
+FLASHCARD_CHUNK_CONCURRENCY = int(os.getenv("FLASHCARD_CHUNK_CONCURRENCY", "3"))
+FLASHCARD_CHUNK_MAX_CONCURRENCY = int(os.getenv("FLASHCARD_CHUNK_MAX_CONCURRENCY", "12"))
+
+# Course creation recovery: stuck courses are resumed from their checkpoints up to this many attempts.
+# A running creation sends a heartbeat every COURSE_HEARTBEAT_SECONDS, it is stuck after STUCK_COURSE_TIMEOUT_HOURS
+# without one
+MAX_COURSE_CREATION_ATTEMPTS = int(os.getenv("MAX_COURSE_CREATION_ATTEMPTS", "3"))
+STUCK_COURSE_TIMEOUT_HOURS = float(os.getenv("STUCK_COURSE_TIMEOUT_HOURS", "2"))
+COURSE_HEARTBEAT_SECONDS = float(os.getenv("COURSE_HEARTBEAT_SECONDS", "60"))
+
+
+# Long-lived ESLint workers for the JSX validation, 0 disables them and spawns the ESLint CLI per validation
+ESLINT_DAEMON_WORKERS = int(os.getenv("ESLINT_DAEMON_WORKERS", "2"))
+ESLINT_DAEMON_TIMEOUT = float(os.getenv("ESLINT_DAEMON_TIMEOUT", "30"))
+# Cache for JSX validation results. The SQLite path is optional and lets several workers share results.
+JSX_VALIDATION_CACHE_SIZE = int(os.getenv("JSX_VALIDATION_CACHE_SIZE", "2048"))
+JSX_VALIDATION_CACHE_PATH = os.getenv("JSX_VALIDATION_CACHE_PATH", "")
+
+# Admission control for agent (LLM) calls, see core/agent_scheduler.py
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "32"))
+AGENT_DEFAULT_RATE_PER_MINUTE = float(os.getenv("AGENT_DEFAULT_RATE_PER_MINUTE", "120"))
+AGENT_RATE_LIMIT_COOLDOWN = float(os.getenv("AGENT_RATE_LIMIT_COOLDOWN", "10"))
+# Requests per minute per model, format: "gemini-2.5-flash=600,gemini-2.5-pro=120"
+AGENT_MODEL_RATE_LIMITS = {
+    model.strip(): float(rate)
+    for model, rate in (
+        entry.split("=", 1)
+        for entry in os.getenv(
+            "AGENT_MODEL_RATE_LIMITS",
+            "gemini-2.5-flash=600,gemini-2.5-pro=120,gemini-2.0-flash=600"
+        ).split(",")
+        if "=" in entry
+    )
+}
+
+# Chapter and course images from a keyword search without an LLM, the ImageAgent is only the fallback
+IMAGE_FAST_PATH = os.getenv("IMAGE_FAST_PATH", "false").lower() == "true"
+
+# Cross-course cache of InfoAgent and PlannerAgent outputs for identical requests (opt-in)
+GENERATION_CACHE_ENABLED = os.getenv("GENERATION_CACHE_ENABLED", "false").lower() == "true"
+GENERATION_CACHE_TTL_HOURS = float(os.getenv("GENERATION_CACHE_TTL_HOURS", "24"))
+GENERATION_CACHE_SIZE = int(os.getenv("GENERATION_CACHE_SIZE", "256"))
+
+# Storage of the agent course states: "memory" (per process) or "sqlite" (shared by the workers of one machine)
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "course_states.db")
+
+# Cleanup of the in-memory agent sessions: idle sessions older than this are deleted, at most this many are kept
+SESSION_MAX_AGE_MINUTES = float(os.getenv("SESSION_MAX_AGE_MINUTES", "60"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "10000"))
+
+# Chat context window: turns kept verbatim after a compaction, sessions with more turns than CHAT_MAX_TURNS are
+# compacted (older turns folded into a running summary of at most CHAT_SUMMARY_MAX_CHARS)
+CHAT_CONTEXT_TURNS = int(os.getenv("CHAT_CONTEXT_TURNS", "20"))
+CHAT_MAX_TURNS = int(os.getenv("CHAT_MAX_TURNS", "40"))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv("CHAT_SUMMARY_MAX_CHARS", "2000"))
+
+# Chapter sections per chat turn: the CHAT_SECTIONS_TOP_K most relevant sections (of at most CHAT_SECTION_CHARS)
+# are added to the prompt, chapters with less text than CHAT_FULL_CHAPTER_CHARS are added whole
+CHAT_SECTIONS_TOP_K = int(os.getenv("CHAT_SECTIONS_TOP_K", "4"))
+CHAT_SECTION_CHARS = int(os.getenv("CHAT_SECTION_CHARS", "1500"))
+CHAT_FULL_CHAPTER_CHARS = int(os.getenv("CHAT_FULL_CHAPTER_CHARS", "4000"))
+
+# Chat hot path cache of the chapter access data (seconds until other workers see a change, number of chapters)
+# and of the chapter contents
+CHAPTER_CACHE_TTL_SECONDS = float(os.getenv("CHAPTER_CACHE_TTL_SECONDS", "60"))
+CHAPTER_CACHE_SIZE = int(os.getenv("CHAPTER_CACHE_SIZE", "4096"))
+CHAPTER_CONTENT_CACHE_SIZE = int(os.getenv("CHAPTER_CONTENT_CACHE_SIZE", "256"))
+
+# Blob store of uploaded documents and images: "local" (files under BLOB_STORE_PATH) or "s3" (S3 compatible bucket,
+# S3_ENDPOINT_URL for MinIO and others). Unreferenced blobs are deleted after BLOB_GC_GRACE_HOURS. Rows from before
+# the blob store are only moved into it (in batches of BLOB_MIGRATION_BATCH) if BLOB_MIGRATION_ENABLED is true, their
+# bytes are removed from the database then, so the store has to be on persistent storage
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local").lower()
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "blobs")
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "blobs")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_REGION = os.getenv("S3_REGION")
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY")
+BLOB_GC_GRACE_HOURS = float(os.getenv("BLOB_GC_GRACE_HOURS", "24"))
+BLOB_MIGRATION_ENABLED = os.getenv("BLOB_MIGRATION_ENABLED", "false").lower() == "true"
+BLOB_MIGRATION_BATCH = int(os.getenv("BLOB_MIGRATION_BATCH", "50"))
+
+# Flashcard generation tasks (stored in the database): lease of the running worker, retries of tasks of dead workers
+# and how long finished tasks, their decks and uploads are kept
+FLASHCARD_TASK_LEASE_SECONDS = float(os.getenv("FLASHCARD_TASK_LEASE_SECONDS", "60"))
+FLASHCARD_TASK_MAX_ATTEMPTS = int(os.getenv("FLASHCARD_TASK_MAX_ATTEMPTS", "3"))
+FLASHCARD_TASK_TTL_HOURS = float(os.getenv("FLASHCARD_TASK_TTL_HOURS", "24"))
+
+
 AGENT_DEBUG_MODE = os.getenv("AGENT_DEBUG_MODE", "true").lower() == "true"
 
 # Google Gemini AI API settings (required for course generation)
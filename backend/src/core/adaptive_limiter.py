@@ -0,0 +1,123 @@
+"""
+Adaptive concurrency for fan-out work such as the chunk calls of a flashcard deck.
+The limit follows AIMD (additive increase, multiplicative decrease): every successful call raises it by
+1 / limit, so it grows by about one per round of calls, and an overload signal (429 or 5xx) multiplies it by
+the decrease factor. Overloads of calls started before the last decrease are ignored, otherwise one burst of
+rejected calls would collapse the limit to the minimum.
+The process-wide AgentCallScheduler still applies on top, this limiter only decides how much of one job is queued.
+"""
+import asyncio
+import bisect
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from .agent_scheduler import is_rate_limit_error
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket is open
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120)
+
+
+def is_overload_error(error: Exception) -> bool:
+    """Rate limit (429) or server side (5xx) errors, the signal to back off"""
+    if is_rate_limit_error(error):
+        return True
+    text = f"{type(error).__name__} {error}"
+    return any(marker in text for marker in ("500", "502", "503", "504", "UNAVAILABLE", "INTERNAL", "overloaded"))
+
+
+class LatencyHistogram:
+    """Fixed bucket latency histogram with approximate percentiles"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.samples: List[float] = []
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.samples.append(seconds)
+
+    def _percentile(self, fraction: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}s" for bound in self.buckets] + [f">{self.buckets[-1]}s"]
+        result: Dict[str, Any] = {
+            "count": len(self.samples),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+        if self.samples:
+            result.update({
+                "p50": round(self._percentile(0.5), 2),
+                "p95": round(self._percentile(0.95), 2),
+                "max": round(max(self.samples), 2),
+            })
+        return result
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial: int = 3, min_limit: int = 1, max_limit: int = 16, decrease_factor: float = 0.5):
+        """
+        :param initial: concurrency at the start
+        :param min_limit: the limit never drops below this
+        :param max_limit: the limit never grows above this
+        :param decrease_factor: the limit is multiplied with it on overload
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.in_flight = 0
+        self.successes = 0
+        self.overloads = 0
+        self.max_reached = int(self.limit)
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily, so the limiter can be built outside of the event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one unit of concurrency while the block runs, yields the start time of the call.
+        Report the outcome with on_success or on_overload before leaving the block, the waiters are woken
+        when the slot is released and see the new limit.
+        """
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield time.monotonic()
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def on_success(self) -> None:
+        self.successes += 1
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        self.max_reached = max(self.max_reached, int(self.limit))
+
+    def on_overload(self, started_at: float) -> None:
+        """Back off, unless the limit was already decreased after the failed call started"""
+        self.overloads += 1
+        if started_at < self._last_decrease:
+            return
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self._last_decrease = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "max_reached": self.max_reached,
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "overloads": self.overloads,
+        }
@@ -0,0 +1,285 @@
+"""
+Process-wide admission control for LLM agent calls.
+Every course creation fans out into many agent calls (explainer, image, tester and code review per chapter),
+so a few parallel course creations can put hundreds of requests in flight and run into 429s. All leaf agent
+calls go through the AgentCallScheduler, which
+ - limits the number of calls in flight,
+ - rate limits every model with a token bucket,
+ - serves interactive calls (chat, grading) before batch generation,
+ - and serves the waiting users round-robin, so one large course cannot starve everyone else.
+"""
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar("agent_call_priority", default=PRIORITY_BATCH)
+
+
+@contextmanager
+def agent_priority(priority: int):
+    """Run all agent calls made inside the block (including spawned tasks) with the given priority"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def get_model_name(agent: Any) -> str:
+    """Model name of an agent wrapper (StandardAgent, StructuredAgent, ChatAgent), used as the bucket key"""
+    llm_agent = getattr(getattr(agent, "runner", None), "agent", None)
+    model = getattr(llm_agent, "model", None)
+    if model is None:
+        return "default"
+    # LiteLlm models are objects that carry their name in .model
+    return model if isinstance(model, str) else str(getattr(model, "model", model))
+
+
+class TokenBucket:
+    """Classic token bucket, refilled continuously with rate_per_minute / 60 tokens per second"""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_minute // 10)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> bool:
+        now = time.monotonic()
+        if now < self.paused_until:
+            return False
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def seconds_until_available(self) -> float:
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while, e.g. after the provider answered with 429"""
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class _Waiter:
+    __slots__ = ("future", "model", "user_id", "priority", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, model: str, user_id: str, priority: int):
+        self.future = future
+        self.model = model
+        self.user_id = user_id
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+
+
+class AgentCallScheduler:
+    def __init__(self, max_concurrency: int, model_rate_limits: Dict[str, float], default_rate_per_minute: float,
+                 rate_limit_cooldown: float = 10.0):
+        """
+        :param max_concurrency: maximum number of agent calls in flight over all models
+        :param model_rate_limits: requests per minute per model name
+        :param default_rate_per_minute: rate for models not listed in model_rate_limits
+        :param rate_limit_cooldown: seconds a model is paused after a 429
+        """
+        self.max_concurrency = max_concurrency
+        self.model_rate_limits = model_rate_limits
+        self.default_rate_per_minute = default_rate_per_minute
+        self.rate_limit_cooldown = rate_limit_cooldown
+
+        # priority -> user_id -> waiters of that user. The OrderedDict order is the round-robin order.
+        self._queues: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in PRIORITY_NAMES
+        }
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._in_flight = 0
+        self._in_flight_by_model: Dict[str, int] = {}
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self.granted = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _bucket(self, model: str) -> TokenBucket:
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            bucket = TokenBucket(self.model_rate_limits.get(model, self.default_rate_per_minute))
+            self._buckets[model] = bucket
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, model: str, user_id: str, priority: Optional[int] = None):
+        """
+        Wait until the call may start and hold a concurrency slot for the duration of the block.
+        The priority defaults to the one set with agent_priority().
+        """
+        await self._acquire(model, str(user_id), _current_priority.get() if priority is None else priority)
+        try:
+            yield
+        finally:
+            self._release(model)
+
+    async def _acquire(self, model: str, user_id: str, priority: int) -> None:
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), model, user_id, priority)
+        self._queues[priority].setdefault(user_id, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted right before the cancellation, hand it back
+                self._release(model)
+            else:
+                self._remove(waiter)
+            raise
+
+        wait = time.monotonic() - waiter.enqueued_at
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def _release(self, model: str) -> None:
+        self._in_flight -= 1
+        self._in_flight_by_model[model] = self._in_flight_by_model.get(model, 1) - 1
+        self._dispatch()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        users = self._queues[waiter.priority]
+        waiters = users.get(waiter.user_id)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+        if not waiters:
+            del users[waiter.user_id]
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """
+        Pop the next waiter that may start now: lowest priority value first, users round-robin,
+        FIFO per user. Waiters of a model without tokens are skipped, so a throttled model does not block others.
+        """
+        for priority in sorted(self._queues):
+            users = self._queues[priority]
+            for user_id in list(users.keys()):
+                waiters = users[user_id]
+                for waiter in waiters:
+                    if self._bucket(waiter.model).try_take():
+                        waiters.remove(waiter)
+                        # Served users move to the end of the round-robin order
+                        del users[user_id]
+                        if waiters:
+                            users[user_id] = waiters
+                        return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            if waiter.future.done():
+                # Cancelled while waiting, give the token back
+                self._bucket(waiter.model).tokens += 1.0
+                continue
+            self._in_flight += 1
+            self._in_flight_by_model[waiter.model] = self._in_flight_by_model.get(waiter.model, 0) + 1
+            self.granted += 1
+            waiter.future.set_result(None)
+
+        self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """If calls are only waiting for tokens, retry the dispatch once the next token is available"""
+        if self._in_flight >= self.max_concurrency:
+            return
+        waiting_models = {
+            waiter.model
+            for users in self._queues.values()
+            for waiters in users.values()
+            for waiter in waiters
+        }
+        if not waiting_models:
+            return
+        delay = min(self._bucket(model).seconds_until_available() for model in waiting_models)
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(max(delay, 0.01), self._dispatch)
+
+    def report_rate_limited(self, model: str) -> None:
+        """Called when the provider rejected a call with a rate limit error, pauses the model briefly"""
+        self.rate_limited += 1
+        self._bucket(model).pause(self.rate_limit_cooldown)
+        logger.warning("Model %s is rate limited, pausing it for %.0fs", model, self.rate_limit_cooldown)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth per priority and model, calls in flight and wait times"""
+        depth_by_priority = {}
+        depth_by_model: Dict[str, int] = {}
+        for priority, users in self._queues.items():
+            depth_by_priority[PRIORITY_NAMES[priority]] = sum(len(waiters) for waiters in users.values())
+            for waiters in users.values():
+                for waiter in waiters:
+                    depth_by_model[waiter.model] = depth_by_model.get(waiter.model, 0) + 1
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "in_flight_by_model": {model: count for model, count in self._in_flight_by_model.items() if count},
+            "queue_depth": sum(depth_by_priority.values()),
+            "queue_depth_by_priority": depth_by_priority,
+            "queue_depth_by_model": depth_by_model,
+            "waiting_users": len({user for users in self._queues.values() for user in users}),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "avg_wait_seconds": self.total_wait / self.granted if self.granted else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Best effort detection of provider rate limit errors (google-genai and litellm)"""
+    text = f"{type(error).__name__} {error}"
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "RateLimit" in text
+
+
+_scheduler: Optional[AgentCallScheduler] = None
+
+
+def get_agent_scheduler() -> AgentCallScheduler:
+    """Get or create the process-wide scheduler lazily"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AgentCallScheduler(
+            max_concurrency=settings.AGENT_MAX_CONCURRENCY,
+            model_rate_limits=settings.AGENT_MODEL_RATE_LIMITS,
+            default_rate_per_minute=settings.AGENT_DEFAULT_RATE_PER_MINUTE,
+            rate_limit_cooldown=settings.AGENT_RATE_LIMIT_COOLDOWN,
+        )
+    return _scheduler
@@ -0,0 +1,92 @@
+"""
+Executors for CPU-bound work that must not run on the event loop.
+Course creation runs as a background task on the same event loop that serves every other request (including
+the SSE chat streams). PDF parsing holds the GIL, so it is sent to a process pool. Embedding releases the GIL
+inside torch, so a small thread pool is enough and avoids pickling the model. Interactive chat messages embed their
+query in a pool of their own, they would otherwise wait for the ingestion of whole documents.
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_embedding_pool: Optional[ThreadPoolExecutor] = None
+_chat_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Process pool for document parsing, created lazily on first use"""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=settings.PDF_PARSE_WORKERS)
+        logger.info("Started PDF parse pool with %d processes", settings.PDF_PARSE_WORKERS)
+    return _parse_pool
+
+
+def get_embedding_pool() -> ThreadPoolExecutor:
+    """Thread pool for embedding and vector store writes, created lazily on first use"""
+    global _embedding_pool
+    if _embedding_pool is None:
+        _embedding_pool = ThreadPoolExecutor(max_workers=settings.EMBEDDING_WORKERS, thread_name_prefix="embedding")
+        logger.info("Started embedding pool with %d threads", settings.EMBEDDING_WORKERS)
+    return _embedding_pool
+
+
+def get_chat_pool() -> ThreadPoolExecutor:
+    """Thread pool for the section retrieval of chat messages, created lazily on first use"""
+    global _chat_pool
+    if _chat_pool is None:
+        _chat_pool = ThreadPoolExecutor(max_workers=settings.CHAT_EMBEDDING_WORKERS, thread_name_prefix="chat")
+        logger.info("Started chat pool with %d threads", settings.CHAT_EMBEDDING_WORKERS)
+    return _chat_pool
+
+
+async def run_in_parse_pool(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a picklable, module-level function in the parse process pool.
+    If the pool is broken (e.g. a worker was killed) it is recreated once and the call is retried.
+    """
+    global _parse_pool
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    try:
+        return await loop.run_in_executor(get_parse_pool(), call)
+    except BrokenProcessPool as e:
+        logger.warning("Parse pool unusable (%s), restarting it", e)
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+        return await loop.run_in_executor(get_parse_pool(), call)
+
+
+async def run_in_embedding_pool(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a function in the embedding thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_embedding_pool(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_in_chat_pool(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a function in the chat thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_chat_pool(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executors() -> None:
+    """Shut down all pools, called on application shutdown"""
+    global _parse_pool, _embedding_pool, _chat_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+    if _embedding_pool is not None:
+        _embedding_pool.shutdown(wait=False, cancel_futures=True)
+        _embedding_pool = None
+    if _chat_pool is not None:
+        _chat_pool.shutdown(wait=False, cancel_futures=True)
+        _chat_pool = None
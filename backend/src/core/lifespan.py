@@ -5,7 +5,14 @@ from fastapi import FastAPI
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from ..core.routines import update_stuck_courses
+from ..core.routines import (
+    update_stuck_courses, log_agent_scheduler_stats, check_unsplash_mcp_server, sweep_agent_sessions,
+    reclaim_flashcard_tasks, cleanup_flashcard_tasks, maintain_blob_store
+)
+from ..core.executors import shutdown_executors
+from ..db.database import dispose_async_engine
+from ..agents.code_checker.eslint_pool import shutdown_eslint_pools
+from ..services.blob_store import check_persistent_storage, get_blob_store
 
 scheduler = AsyncIOScheduler()
 logger = logging.getLogger(__name__)
@@ -16,6 +23,12 @@ async def start_scheduler_async():
     try:
         logger.info("Starting background scheduler...")
         scheduler.add_job(update_stuck_courses, 'interval', hours=1)
+        scheduler.add_job(log_agent_scheduler_stats, 'interval', minutes=1)
+        scheduler.add_job(check_unsplash_mcp_server, 'interval', minutes=5)
+        scheduler.add_job(sweep_agent_sessions, 'interval', minutes=10)
+        scheduler.add_job(reclaim_flashcard_tasks, 'interval', minutes=1)
+        scheduler.add_job(cleanup_flashcard_tasks, 'interval', hours=1)
+        scheduler.add_job(maintain_blob_store, 'interval', hours=1)
         scheduler.start()
         logger.info("✅ Scheduler started successfully")
     except Exception as e:
@@ -26,6 +39,9 @@ async def start_scheduler_async():
 async def lifespan(app: FastAPI):
     """Manage application lifecycle including startup and shutdown events."""
     logger.info("Starting application...")
+
+    # Fail before serving: uploads written to the container's own filesystem are lost on the next redeploy
+    check_persistent_storage(get_blob_store())
     
     # Start scheduler in background - don't wait for it
     scheduler_task = asyncio.create_task(start_scheduler_async())
@@ -46,5 +62,29 @@ async def lifespan(app: FastAPI):
                 logger.info("Scheduler stopped.")
             except Exception as e:
                 logger.error(f"Error stopping scheduler: {e}")
+
+        # Hand the running flashcard tasks over to the other workers
+        try:
+            from ..api.routers import flashcard
+            if flashcard.flashcard_service is not None:
+                await flashcard.flashcard_service.shutdown()
+        except Exception as e:
+            logger.error(f"Error releasing the flashcard tasks: {e}")
+
+        # Stop parse and embedding workers
+        shutdown_executors()
+
+        # Stop the ESLint workers
+        shutdown_eslint_pools()
+
+        # Close the connections of the async database engine
+        await dispose_async_engine()
+
+        # Stop the Unsplash MCP server process
+        try:
+            from ..agents.image_agent.toolset import close_unsplash_toolset
+            await close_unsplash_toolset()
+        except Exception as e:
+            logger.error(f"Error stopping the Unsplash MCP server: {e}")
         
         logger.info("Application shutdown complete.")
@@ -1,20 +1,37 @@
 """
 Core routines
 """
+import asyncio
 import logging
+import uuid
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from ..config.settings import (
+    MAX_COURSE_CREATION_ATTEMPTS, STUCK_COURSE_TIMEOUT_HOURS, SESSION_MAX_AGE_MINUTES, SESSION_MAX_COUNT,
+    FLASHCARD_TASK_TTL_HOURS
+)
+from ..db.crud import checkpoints_crud
 from ..db.database import get_db
 from ..db.models.db_course import Course, CourseStatus  # Your SQLAlchemy model
 
 
-def update_stuck_courses():
+# Keep references to the resumed course creations, otherwise the tasks could be garbage collected
+_resume_tasks = set()
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def update_stuck_courses():
     """
-    Check for courses that are stuck in 'creating' status for more than 2 hours
-    and mark them as 'error'.
+    Check for courses that are stuck in 'creating' status, without a heartbeat of their creation for longer than
+    STUCK_COURSE_TIMEOUT_HOURS. Courses with a stored request are resumed from their checkpoints until
+    MAX_COURSE_CREATION_ATTEMPTS is reached, all others are marked as 'error'.
+    Runs in every worker: a course is only resumed by the worker that claims it.
     """
     logging.info("Checking for stuck courses...")
     
@@ -26,30 +43,148 @@ def update_stuck_courses():
         logging.warning("Skipping stuck course check - database not available")
         return  # Exit gracefully if DB is not available
 
+    to_resume = []
     try:
-        threshold = datetime.now(timezone.utc) - timedelta(hours=2) # 2 hours threshold
+        now = datetime.now(timezone.utc)
+        threshold = now - timedelta(hours=STUCK_COURSE_TIMEOUT_HOURS)
 
-        stuck_courses = db.query(Course).filter(
-            Course.status == "creating",
-            Course.created_at < threshold
-        ).all()
+        creating_courses = db.query(Course).filter(Course.status == CourseStatus.CREATING.value).all()
+        checkpoints = {course.id: checkpoints_crud.get_checkpoints(db, course.id) for course in creating_courses}
 
-        for course in stuck_courses:
-            logging.info("Marking course %s as error due to timeout.", course.id)
+        failed_count = 0
+        for course in creating_courses:
+            attempt = checkpoints[course.id].get("attempt") or {}
+            # A running creation renews its heartbeat, a course is measured from the last one (or its start)
+            last_alive = attempt.get("heartbeat_at") or attempt.get("started_at")
+            last_alive = datetime.fromisoformat(last_alive) if last_alive else course.created_at
+            if last_alive is None or _as_utc(last_alive) >= threshold:
+                continue
 
-            course.status = CourseStatus.FAILED
+            if "request" in checkpoints[course.id] and attempt.get("count", 0) < MAX_COURSE_CREATION_ATTEMPTS:
+                # Claim the course: of several workers only the first compare and set of the heartbeat succeeds
+                claimed = checkpoints_crud.replace_checkpoint_if(
+                    db, course.id, "attempt", "heartbeat_at", attempt.get("heartbeat_at"),
+                    {**attempt, "heartbeat_at": now.isoformat()}
+                )
+                if claimed:
+                    logging.info("Resuming stuck course %s (attempt %s).", course.id, attempt.get("count", 0) + 1)
+                    to_resume.append(course.id)
+                continue
+
+            logging.info("Marking course %s as error due to timeout.", course.id)
+            course.status = CourseStatus.FAILED.value
             course.error_msg = "Course creation timed out."
+            failed_count += 1
         db.commit()
-        logging.info("Marked %s stuck courses as error.", len(stuck_courses))
+        logging.info("Marked %s stuck courses as error.", failed_count)
 
     except SQLAlchemyError as e:
         logging.error("Scheduler error: %s", e)
         db.rollback()
+        to_resume = []
     except Exception as e:
         logging.error("Unexpected error in scheduler: %s", e)
+        to_resume = []
     finally:
         try:
             next(db_gen, None)
         except:
             pass  # Ignore cleanup errors
 
+    if to_resume:
+        from ..services.agent_service import get_agent_service
+        agent_service = get_agent_service()
+        for course_id in to_resume:
+            task = asyncio.create_task(agent_service.resume_course(course_id, task_id=str(uuid.uuid4())))
+            _resume_tasks.add(task)
+            task.add_done_callback(_resume_tasks.discard)
+
+
+async def log_agent_scheduler_stats():
+    """
+    Publish the queue depth of the agent call scheduler to the log, only while calls are queued or running.
+    A coroutine, so it reads the scheduler on the event loop that owns it (sync jobs run in a thread pool).
+    """
+    from .agent_scheduler import get_agent_scheduler
+    stats = get_agent_scheduler().stats()
+    if stats["queue_depth"] or stats["in_flight"]:
+        logging.info("Agent scheduler: %s in flight, %s queued (%s), avg wait %.2fs",
+                     stats["in_flight"], stats["queue_depth"], stats["queue_depth_by_priority"],
+                     stats["avg_wait_seconds"])
+
+
+async def check_unsplash_mcp_server():
+    """
+    Health check of the shared Unsplash MCP server process, a dead or hanging server is restarted on next use.
+    """
+    from ..agents.image_agent.toolset import check_unsplash_toolset
+    await check_unsplash_toolset()
+
+
+async def sweep_agent_sessions():
+    """
+    Delete idle in-memory agent sessions (older than SESSION_MAX_AGE_MINUTES) and cap their number at SESSION_MAX_COUNT.
+    """
+    from .session_sweeper import sweep_sessions
+    result = await sweep_sessions(SESSION_MAX_AGE_MINUTES * 60, SESSION_MAX_COUNT)
+    if result["deleted"]:
+        logging.info("Session sweep: deleted %d sessions, %d remaining", result["deleted"], result["remaining"])
+
+
+async def reclaim_flashcard_tasks():
+    """
+    Take over flashcard tasks of workers that stopped renewing their lease, or fail them after too many attempts.
+    """
+    from ..api.routers.flashcard import get_flashcard_service
+    result = await get_flashcard_service().reclaim_orphaned_tasks()
+    if result["restarted"] or result["failed"]:
+        logging.info("Flashcard tasks: restarted %d, failed %d", result["restarted"], result["failed"])
+
+
+def cleanup_flashcard_tasks():
+    """
+    Delete finished flashcard tasks, their decks and unused uploads older than FLASHCARD_TASK_TTL_HOURS.
+    """
+    from ..api.routers.flashcard import get_flashcard_service
+    result = get_flashcard_service().cleanup_expired(FLASHCARD_TASK_TTL_HOURS)
+    if result["tasks"] or result["documents"]:
+        logging.info("Flashcard cleanup: deleted %d tasks and %d documents", result["tasks"], result["documents"])
+
+
+def maintain_blob_store():
+    """
+    Move a batch of uploads from before the blob store (content in the database) into it if BLOB_MIGRATION_ENABLED,
+    and delete the blobs no document or image references anymore, if they were not written for BLOB_GC_GRACE_HOURS.
+    """
+    from ..config.settings import BLOB_GC_GRACE_HOURS, BLOB_MIGRATION_BATCH, BLOB_MIGRATION_ENABLED
+    from ..db.crud import documents_crud, images_crud
+    from ..db.database import get_db_context
+    from ..services.blob_store import collect_garbage, get_blob_store
+
+    store = get_blob_store()
+    moved = 0
+    with get_db_context() as db:
+        for claim, move, data_attribute in (
+                (documents_crud.claim_document_without_blob, documents_crud.move_document_to_blob, "file_data"),
+                (images_crud.claim_image_without_blob, images_crud.move_image_to_blob, "image_data")):
+            # One row per transaction: the row lock of the claim keeps other workers away until the commit
+            failed = set()
+            for _ in range(BLOB_MIGRATION_BATCH if BLOB_MIGRATION_ENABLED else 0):
+                row = claim(db, failed)
+                if row is None:
+                    break
+                row_id = row.id
+                try:
+                    blob = store.put_bytes(getattr(row, data_attribute))
+                    move(db, row, blob.sha256, blob.size)
+                    moved += 1
+                except Exception as e:
+                    db.rollback()
+                    failed.add(row_id)
+                    logging.error("Blob store: moving %s of row %s failed: %s", data_attribute, row_id, e)
+        # Read after the batch, the blobs just written are referenced
+        referenced = documents_crud.get_referenced_blob_hashes(db)
+
+    deleted = collect_garbage(store, referenced, BLOB_GC_GRACE_HOURS * 3600)
+    if moved or deleted:
+        logging.info("Blob store: moved %d uploads out of the database, deleted %d unreferenced blobs", moved, deleted)
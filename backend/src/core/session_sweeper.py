@@ -0,0 +1,69 @@
+"""
+Background cleanup of the in-memory adk sessions.
+Agent calls delete their ephemeral session themselves (see agents/agent.py), the sweeper catches everything else:
+sessions of calls that were cancelled before their cleanup ran, course sessions and sessions of other code paths.
+Sessions idle for longer than the maximum age are deleted, and if a service still holds more sessions than allowed,
+the least recently updated ones go first.
+"""
+import logging
+import time
+import weakref
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Session services to sweep, weak so that a dropped service is not kept alive by the sweeper
+_services: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def register_session_service(session_service) -> None:
+    """Register an InMemorySessionService for the periodic sweep, other services are ignored"""
+    if isinstance(getattr(session_service, "sessions", None), dict):
+        _services.add(session_service)
+
+
+def count_sessions(session_service) -> int:
+    return sum(len(by_id) for users in session_service.sessions.values() for by_id in users.values())
+
+
+async def sweep_session_service(session_service, max_age_seconds: float, max_sessions: int) -> int:
+    """Delete expired and surplus sessions of one InMemorySessionService, returns the number of deleted sessions"""
+    # InMemorySessionService keeps app_name -> user_id -> session_id -> Session
+    entries = [
+        (session.last_update_time, app_name, user_id, session_id)
+        for app_name, users in session_service.sessions.items()
+        for user_id, by_id in users.items()
+        for session_id, session in by_id.items()
+    ]
+    entries.sort()
+
+    cutoff = time.time() - max_age_seconds
+    expired = [entry for entry in entries if entry[0] < cutoff]
+    surplus = max(0, len(entries) - len(expired) - max_sessions)
+    to_delete = entries[:len(expired) + surplus]
+
+    for _, app_name, user_id, session_id in to_delete:
+        try:
+            await session_service.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        except Exception as e:
+            logger.warning("Failed to delete session %s: %s", session_id, e)
+
+    # Drop the empty per-user and per-app maps left behind
+    for app_name in list(session_service.sessions):
+        users = session_service.sessions[app_name]
+        for user_id in [user_id for user_id, by_id in users.items() if not by_id]:
+            del users[user_id]
+        if not users:
+            del session_service.sessions[app_name]
+
+    return len(to_delete)
+
+
+async def sweep_sessions(max_age_seconds: float, max_sessions: int) -> Dict[str, int]:
+    """Sweep all registered session services"""
+    deleted = 0
+    remaining = 0
+    for session_service in list(_services):
+        deleted += await sweep_session_service(session_service, max_age_seconds, max_sessions)
+        remaining += count_sessions(session_service)
+    return {"deleted": deleted, "remaining": remaining}
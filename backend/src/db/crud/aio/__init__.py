@@ -0,0 +1,8 @@
+"""
+Async variants of the CRUD modules for the AsyncSession of db/database.py (get_async_db).
+The functions have the names and arguments of their sync counterparts in db/crud and are awaited, so a router is
+migrated by switching its dependency to get_async_db (and get_current_active_user_async), importing the modules
+from here instead of db/crud and awaiting the calls. Relationships are not lazy loaded in async, functions that
+need them load them eagerly.
+Routers that are not migrated yet keep the sync session, both work on the same tables.
+"""
@@ -0,0 +1,67 @@
+"""Async CRUD operations for chapters, see db/crud/chapters_crud.py."""
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ....services.chapter_cache import get_chapter_cache
+from ...models.db_course import Chapter
+
+
+
+############### CHAPTERS
+async def get_chapter_by_id(db: AsyncSession, chapter_id: int) -> Optional[Chapter]:
+    """Get chapter by ID"""
+    return await db.scalar(select(Chapter).where(Chapter.id == chapter_id))
+
+
+async def get_chapter_by_course_id_and_chapter_id(db: AsyncSession, course_id: int, chapter_id: int) -> Optional[Chapter]:
+    """Get chapter by ID within a course"""
+    return await db.scalar(select(Chapter).where(Chapter.id == chapter_id, Chapter.course_id == course_id))
+
+
+async def get_chapters_by_course_id(db: AsyncSession, course_id: int) -> List[Chapter]:
+    """Get all chapters for a specific course"""
+    result = await db.scalars(select(Chapter).where(Chapter.course_id == course_id).order_by(Chapter.index))
+    return list(result)
+
+
+async def update_chapter(db: AsyncSession, chapter_id: int, **kwargs) -> Optional[Chapter]:
+    """Update chapter with provided fields"""
+    chapter = await get_chapter_by_id(db, chapter_id)
+    if chapter:
+        for key, value in kwargs.items():
+            if hasattr(chapter, key):
+                setattr(chapter, key, value)
+        await db.commit()
+        get_chapter_cache().invalidate_chapter(chapter_id)
+        await db.refresh(chapter)
+    return chapter
+
+
+async def mark_chapter_complete(db: AsyncSession, chapter_id: int) -> Optional[Chapter]:
+    """Mark chapter as completed"""
+    return await update_chapter(db, chapter_id, is_completed=True)
+
+
+async def mark_chapter_incomplete(db: AsyncSession, chapter_id: int) -> Optional[Chapter]:
+    """Mark chapter as not completed"""
+    return await update_chapter(db, chapter_id, is_completed=False)
+
+
+async def delete_chapter(db: AsyncSession, chapter_id: int) -> bool:
+    """Delete chapter by ID (cascades to questions)"""
+    chapter = await get_chapter_by_id(db, chapter_id)
+    if chapter:
+        await db.delete(chapter)
+        await db.commit()
+        get_chapter_cache().invalidate_chapter(chapter_id)
+        return True
+    return False
+
+
+async def get_completed_chapters_count(db: AsyncSession, course_id: int) -> int:
+    """Get total number of completed chapters in a course"""
+    return await db.scalar(
+        select(func.count()).select_from(Chapter).where(Chapter.course_id == course_id, Chapter.is_completed == True)
+    )
@@ -0,0 +1,108 @@
+"""Async CRUD operations for courses, see db/crud/courses_crud.py."""
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from ....api.schemas.course import CourseInfo
+from ....services.chapter_cache import get_chapter_cache
+from ...models.db_course import Chapter, Course, CourseStatus
+
+
+
+############### COURSES
+async def get_course_by_id(db: AsyncSession, course_id: int) -> Optional[Course]:
+    """Get course by ID"""
+    return await db.scalar(select(Course).where(Course.id == course_id))
+
+
+async def get_courses_by_course_id_user_id(db: AsyncSession, course_id: int, user_id: str) -> Optional[Course]:
+    """Get the course if it belongs to the user"""
+    return await db.scalar(select(Course).where(Course.user_id == user_id, Course.id == course_id))
+
+
+async def get_course_count_by_user_id(db: AsyncSession, user_id: str) -> int:
+    """Get the count of courses for a specific user"""
+    return await db.scalar(select(func.count()).select_from(Course).where(Course.user_id == user_id))
+
+
+async def update_course(db: AsyncSession, course_id: int, **kwargs) -> Optional[Course]:
+    """Update course with provided fields"""
+    course = await get_course_by_id(db, course_id)
+    if course:
+        for key, value in kwargs.items():
+            if hasattr(course, key):
+                # Handle Enum conversion
+                if key == 'status' and isinstance(value, CourseStatus):
+                    value = value.value
+                setattr(course, key, value)
+        await db.commit()
+        get_chapter_cache().invalidate_course(course_id)
+        await db.refresh(course)
+    return course
+
+
+async def update_course_public_status(db: AsyncSession, course_id: int, is_public: bool) -> Optional[Course]:
+    """Update the public status of a course"""
+    return await update_course(db, course_id, is_public=is_public)
+
+
+async def delete_course(db: AsyncSession, course_id: int) -> bool:
+    """Delete course by ID (cascades to chapters and questions)"""
+    course = await get_course_by_id(db, course_id)
+    if course:
+        await db.delete(course)
+        await db.commit()
+        get_chapter_cache().invalidate_course(course_id)
+        return True
+    return False
+
+
+def _to_course_info(course: Course, completed_chapters: int = 0, user_name: Optional[str] = None) -> CourseInfo:
+    return CourseInfo(
+        course_id=course.id,
+        total_time_hours=course.total_time_hours,
+        status=str(course.status),
+        title=course.title,
+        description=course.description,
+        chapter_count=course.chapter_count,
+        image_url=course.image_url,
+        completed_chapter_count=completed_chapters,
+        user_name=user_name,
+        is_public=course.is_public,
+        created_at=course.created_at,
+    )
+
+
+async def get_public_courses_infos(db: AsyncSession, user_id: str, skip: int = 0, limit: int = 200) -> List[CourseInfo]:
+    """Get the infos of the public courses with the names of their owners, newest first"""
+    courses = await db.scalars(
+        select(Course)
+        .options(joinedload(Course.user))
+        .where(Course.is_public == True)
+        .order_by(Course.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return [_to_course_info(course, user_name=course.user.username if course.user else None)
+            for course in courses]
+
+
+async def get_courses_infos(db: AsyncSession, user_id: str, skip: int = 0, limit: int = 200) -> List[CourseInfo]:
+    """Get the infos of the courses of a user with their completed chapter count, newest first"""
+    completed_chapters_subq = (
+        select(Chapter.course_id, func.count(Chapter.id).label('completed_count'))
+        .where(Chapter.is_completed == True)
+        .group_by(Chapter.course_id)
+        .subquery()
+    )
+    rows = await db.execute(
+        select(Course, func.coalesce(completed_chapters_subq.c.completed_count, 0))
+        .outerjoin(completed_chapters_subq, Course.id == completed_chapters_subq.c.course_id)
+        .where(Course.user_id == user_id)
+        .order_by(Course.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return [_to_course_info(course, completed_chapters) for course, completed_chapters in rows]
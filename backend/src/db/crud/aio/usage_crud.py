@@ -0,0 +1,59 @@
+"""Async CRUD operations for usage logging, see db/crud/usage_crud.py."""
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...models.db_usage import Usage
+
+
+async def log_usage(db: AsyncSession, user_id: str, action: str, course_id: int = None, chapter_id: int = None,
+                    details: str = None) -> Usage:
+    """
+    Log a user action in the database.
+
+    :param db: Database session
+    :param user_id: ID of the user performing the action
+    :param action: Action performed by the user (e.g., "view", "complete", "start", "create", "delete")
+    :param course_id: Optional course ID if the action is related to a specific course
+    :param chapter_id: Optional chapter ID if the action is related to a specific chapter
+    :param details: Additional details about the action
+    :return: The created Usage object
+    """
+    usage = Usage(
+        user_id=user_id,
+        action=action,
+        course_id=course_id,
+        chapter_id=chapter_id,
+        details=details
+    )
+
+    db.add(usage)
+    await db.commit()
+    await db.refresh(usage)
+
+    return usage
+
+
+async def _count_actions(db: AsyncSession, user_id: str, action: str) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(Usage).where(Usage.user_id == user_id, Usage.action == action)
+    )
+
+
+async def log_chat_usage(db: AsyncSession, user_id: str, course_id: int, chapter_id: int, message: str) -> Usage:
+    """Log a chat message sent by a user."""
+    return await log_usage(db, user_id, action="chat", course_id=course_id, chapter_id=chapter_id, details=message)
+
+
+async def get_total_chat_usages(db: AsyncSession, user_id: str) -> int:
+    """Get the total number of chat messages sent by a user."""
+    return await _count_actions(db, user_id, "chat")
+
+
+async def get_total_created_courses(db: AsyncSession, user_id: str) -> int:
+    """Get the total number of courses created by a user."""
+    return await _count_actions(db, user_id, "create_course")
+
+
+async def log_chapter_completion(db: AsyncSession, user_id: str, course_id: int, chapter_id: int) -> Usage:
+    """Log the completion of a chapter by a user."""
+    return await log_usage(db, user_id, action="complete_chapter", course_id=course_id, chapter_id=chapter_id)
@@ -0,0 +1,17 @@
+"""Async CRUD operations for users, see db/crud/users_crud.py."""
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...models.db_user import User
+
+
+async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+    """Retrieve a user by their ID."""
+    return await db.scalar(select(User).where(User.id == user_id))
+
+
+async def get_active_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+    """Retrieve an active user by their ID."""
+    return await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from sqlalchemy import text
 from ..models.db_course import Chapter, Course
+from ...services.chapter_cache import get_chapter_cache
 
 
 
@@ -59,6 +60,7 @@ def update_chapter(db: Session, chapter_id: int, **kwargs) -> Optional[Chapter]:
             if hasattr(chapter, key):
                 setattr(chapter, key, value)
         db.commit()
+        get_chapter_cache().invalidate_chapter(chapter_id)
         db.refresh(chapter)
     return chapter
 
@@ -79,6 +81,7 @@ def delete_chapter(db: Session, chapter_id: int) -> bool:
     if chapter:
         db.delete(chapter)
         db.commit()
+        get_chapter_cache().invalidate_chapter(chapter_id)
         return True
     return False
 
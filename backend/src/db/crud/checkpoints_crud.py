@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models.db_course import CourseCheckpoint
+
+
+############### COURSE CREATION CHECKPOINTS
+def get_checkpoints(db: Session, course_id: int) -> Dict[str, Any]:
+    """Get all checkpoints of a course as a map from stage name to the stored data"""
+    checkpoints = db.query(CourseCheckpoint).filter(CourseCheckpoint.course_id == course_id).all()
+    return {checkpoint.stage: checkpoint.data for checkpoint in checkpoints}
+
+
+def get_checkpoint(db: Session, course_id: int, stage: str) -> Optional[Any]:
+    """Get the data of a single stage, None if the stage has not finished yet"""
+    checkpoint = db.query(CourseCheckpoint).filter(
+        CourseCheckpoint.course_id == course_id,
+        CourseCheckpoint.stage == stage
+    ).first()
+    return checkpoint.data if checkpoint else None
+
+
+def save_checkpoint(db: Session, course_id: int, stage: str, data: Any) -> CourseCheckpoint:
+    """Create or overwrite the checkpoint of a stage"""
+    checkpoint = db.query(CourseCheckpoint).filter(
+        CourseCheckpoint.course_id == course_id,
+        CourseCheckpoint.stage == stage
+    ).first()
+    if checkpoint:
+        checkpoint.data = data
+    else:
+        checkpoint = CourseCheckpoint(course_id=course_id, stage=stage, data=data)
+        db.add(checkpoint)
+    db.commit()
+    db.refresh(checkpoint)
+    return checkpoint
+
+
+def replace_checkpoint_if(db: Session, course_id: int, stage: str, key: str, expected: Optional[str],
+                          data: Any) -> bool:
+    """
+    Overwrite the checkpoint of a stage only if data[key] still is expected (compare and set).
+    Returns False if another writer changed it first, only one of several concurrent callers gets True.
+    """
+    value = CourseCheckpoint.data[key].as_string()
+    updated = db.query(CourseCheckpoint).filter(
+        CourseCheckpoint.course_id == course_id,
+        CourseCheckpoint.stage == stage,
+        value.is_(None) if expected is None else value == expected
+    ).update({CourseCheckpoint.data: data}, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+
+def get_course_ids_with_checkpoint(db: Session, course_ids: List[int], stage: str) -> List[int]:
+    """Return the subset of course_ids that have a checkpoint for the given stage"""
+    if not course_ids:
+        return []
+    rows = db.query(CourseCheckpoint.course_id).filter(
+        CourseCheckpoint.course_id.in_(course_ids),
+        CourseCheckpoint.stage == stage
+    ).all()
+    return [row[0] for row in rows]
+
+
+def delete_checkpoints(db: Session, course_id: int) -> int:
+    """Delete all checkpoints of a course once it is finished. Returns the number of deleted rows."""
+    deleted_count = db.query(CourseCheckpoint).filter(CourseCheckpoint.course_id == course_id).delete()
+    db.commit()
+    return deleted_count
@@ -7,6 +7,7 @@ from ..models.db_course import Course, Chapter
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import select, func as sql_func
 from ...api.schemas.course import CourseInfo
+from ...services.chapter_cache import get_chapter_cache
 
 
 
@@ -75,6 +76,7 @@ def update_course(db: Session, course_id: int, **kwargs) -> Optional[Course]:
                     value = value.value
                 setattr(course, key, value)
         db.commit()
+        get_chapter_cache().invalidate_course(course_id)
         db.refresh(course)
     return course
 
@@ -89,12 +91,28 @@ def update_course_public_status(db: Session, course_id: int, is_public: bool) ->
     return update_course(db, course_id, is_public=is_public)
 
 
+def claim_failed_course(db: Session, course_id: int) -> bool:
+    """
+    Move a failed course back to creating, only if it still is failed (compare and set).
+    Returns False if another request claimed it first, only one of several concurrent callers gets True.
+    """
+    updated = db.query(Course).filter(
+        Course.id == course_id,
+        Course.status == CourseStatus.FAILED.value
+    ).update({Course.status: CourseStatus.CREATING.value, Course.error_msg: None}, synchronize_session=False)
+    db.commit()
+    if updated:
+        get_chapter_cache().invalidate_course(course_id)
+    return updated == 1
+
+
 def delete_course(db: Session, course_id: int) -> bool:
     """Delete course by ID (cascades to chapters and questions)"""
     course = db.query(Course).filter(Course.id == course_id).first()
     if course:
         db.delete(course)
         db.commit()
+        get_chapter_cache().invalidate_course(course_id)
         return True
     return False
 
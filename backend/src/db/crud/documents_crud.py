@@ -1,7 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer, undefer
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy import and_
-from typing import List, Optional
-from ..models.db_file import Document
+from typing import List, Optional, Set
+from ..models.db_file import Document, DocumentText, FileBlob
 
 
 ############### DOCUMENTS
@@ -10,10 +11,20 @@ def get_document_by_id(db: Session, document_id: int) -> Optional[Document]:
     return db.query(Document).filter(Document.id == document_id).first()
 
 def get_documents_by_ids(db: Session, document_ids: List[int]) -> List[Document]:
-    """Get multiple documents by their IDs"""
+    """Get multiple documents by their IDs, file_data is only loaded for documents that are not in the blob store"""
     if not document_ids:
         return []
-    return db.query(Document).filter(Document.id.in_(document_ids)).all()
+    documents = db.query(Document).options(defer(Document.file_data)).filter(Document.id.in_(document_ids)).all()
+    legacy_ids = []
+    for document in documents:
+        if document.blob is None:
+            legacy_ids.append(document.id)
+        else:
+            set_committed_value(document, "file_data", None)  # What the row holds, readable after the session is closed
+    if legacy_ids:
+        # Fills the deferred column of the documents loaded above
+        db.query(Document).options(undefer(Document.file_data)).filter(Document.id.in_(legacy_ids)).all()
+    return documents
 
 
 def get_documents_by_user_id(db: Session, user_id: str) -> List[Document]:
@@ -60,6 +71,23 @@ def create_document(db: Session, course_id: int, user_id: str, filename: str,
     return db_document
 
 
+def create_document_from_blob(db: Session, user_id: str, filename: str, content_type: str,
+                              sha256: str, size: int, course_id: Optional[int] = None) -> Document:
+    """Create a new document whose content is in the blob store"""
+    db_document = Document(
+        course_id=course_id,
+        user_id=user_id,
+        filename=filename,
+        content_type=content_type,
+        file_data=None,
+        blob=FileBlob(sha256=sha256, size=size),
+    )
+    db.add(db_document)
+    db.commit()
+    db.refresh(db_document)
+    return db_document
+
+
 def update_document(db: Session, document_id: int, **kwargs) -> Optional[Document]:
     """Update document with provided fields"""
     document = db.query(Document).filter(Document.id == document_id).first()
@@ -123,3 +151,50 @@ def get_documents_by_content_type(db: Session, user_id: str, content_type: str)
     return db.query(Document).filter(
         and_(Document.user_id == user_id, Document.content_type == content_type)
     ).all()
+
+
+def claim_document_without_blob(db: Session, exclude_ids: Set[int] = frozenset()) -> Optional[Document]:
+    """
+    A document from before the blob store (content still in file_data), locked until the next commit or rollback.
+    Rows locked by another worker are skipped, so every row is moved by one worker only.
+    """
+    return db.query(Document).outerjoin(FileBlob, FileBlob.document_id == Document.id) \
+        .filter(FileBlob.id.is_(None), Document.file_data.isnot(None), Document.id.notin_(exclude_ids)) \
+        .with_for_update(skip_locked=True, of=Document).first()
+
+
+def move_document_to_blob(db: Session, document: Document, sha256: str, size: int) -> Document:
+    """Reference the stored blob and drop the content from the row"""
+    document.blob = FileBlob(sha256=sha256, size=size)
+    document.file_data = None
+    db.commit()
+    return document
+
+
+def get_referenced_blob_hashes(db: Session) -> Set[str]:
+    """sha256 of every blob referenced by a document or an image"""
+    return {sha256 for (sha256,) in db.query(FileBlob.sha256).distinct()}
+
+
+############### DERIVED TEXT
+def get_document_texts_by_document_ids(db: Session, document_ids: List[int]) -> List[DocumentText]:
+    """Get the parsed texts of multiple documents"""
+    if not document_ids:
+        return []
+    return db.query(DocumentText).filter(DocumentText.document_id.in_(document_ids)).all()
+
+
+def create_document_text(db: Session, document_id: int, parsed: dict) -> DocumentText:
+    """Persist the parsed text of a document (output of parse_pdf_document)"""
+    document_text = DocumentText(
+        document_id=document_id,
+        page_count=parsed["page_count"],
+        pages=parsed["pages"],
+        paragraphs=parsed["paragraphs"],
+        toc=parsed.get("toc"),
+        doc_metadata=parsed.get("metadata"),
+    )
+    db.add(document_text)
+    db.commit()
+    db.refresh(document_text)
+    return document_text
@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..models.db_flashcard_task import FlashcardDocument, FlashcardTask
+
+# Statuses of a task that is not finished yet (see TaskStatus)
+ACTIVE_STATUSES = ("pending", "analyzing", "extracting", "generating", "packaging")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+############### FLASHCARD DOCUMENTS
+def create_document(db: Session, document_id: str, filename: str, file_path: str, size: int,
+                    user_id: Optional[str] = None) -> FlashcardDocument:
+    document = FlashcardDocument(id=document_id, user_id=user_id, filename=filename, file_path=file_path, size=size)
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    return document
+
+
+def get_document(db: Session, document_id: str) -> Optional[FlashcardDocument]:
+    return db.query(FlashcardDocument).filter(FlashcardDocument.id == document_id).first()
+
+
+def get_stale_documents(db: Session, created_before: datetime) -> List[FlashcardDocument]:
+    """
+    Documents older than created_before that no task needs anymore. A task needs its document
+    until it expires (see get_finished_tasks), a failed task can be retried until then.
+    """
+    used_document_ids = db.query(FlashcardTask.document_id).filter(~_finished_before(created_before))
+    return db.query(FlashcardDocument).filter(
+        FlashcardDocument.created_at < created_before,
+        FlashcardDocument.id.notin_(used_document_ids)
+    ).all()
+
+
+def delete_document(db: Session, document_id: str) -> bool:
+    deleted = db.query(FlashcardDocument).filter(FlashcardDocument.id == document_id).delete()
+    db.commit()
+    return deleted > 0
+
+
+############### FLASHCARD TASKS
+def create_task(db: Session, task_id: str, document_id: str, config: Dict[str, Any],
+                user_id: Optional[str] = None) -> FlashcardTask:
+    task = FlashcardTask(
+        id=task_id,
+        user_id=user_id,
+        document_id=document_id,
+        config=config,
+        status="pending",
+        progress_percentage=0,
+        current_step="Initializing",
+        completed_steps=[],
+        attempts=0,
+        cancel_requested=False,
+    )
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def get_task(db: Session, task_id: str) -> Optional[FlashcardTask]:
+    return db.query(FlashcardTask).filter(FlashcardTask.id == task_id).first()
+
+
+def get_tasks_by_user(db: Session, user_id: str, limit: Optional[int] = None) -> List[FlashcardTask]:
+    """Tasks of a user, newest first"""
+    query = (db.query(FlashcardTask)
+             .filter(FlashcardTask.user_id == user_id)
+             .order_by(FlashcardTask.created_at.desc()))
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def update_task(db: Session, task_id: str, **kwargs) -> Optional[FlashcardTask]:
+    """Update task with provided fields"""
+    task = get_task(db, task_id)
+    if task:
+        for key, value in kwargs.items():
+            if hasattr(task, key):
+                setattr(task, key, value)
+        db.commit()
+        db.refresh(task)
+    return task
+
+
+def delete_task(db: Session, task_id: str) -> bool:
+    deleted = db.query(FlashcardTask).filter(FlashcardTask.id == task_id).delete()
+    db.commit()
+    return deleted > 0
+
+
+def claim_task(db: Session, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+    """
+    Take the lease of an unfinished task. Succeeds if the task is unclaimed, already held by this worker
+    or the lease of its worker has expired. Every claim counts as an attempt.
+    """
+    now = _now()
+    claimed = db.query(FlashcardTask).filter(
+        FlashcardTask.id == task_id,
+        FlashcardTask.status.in_(ACTIVE_STATUSES),
+        FlashcardTask.cancel_requested.is_(False),
+        or_(
+            FlashcardTask.worker_id.is_(None),
+            FlashcardTask.worker_id == worker_id,
+            FlashcardTask.lease_expires_at < now,
+        )
+    ).update({
+        FlashcardTask.worker_id: worker_id,
+        FlashcardTask.lease_expires_at: now + timedelta(seconds=lease_seconds),
+        FlashcardTask.attempts: FlashcardTask.attempts + 1,
+        FlashcardTask.started_at: now,
+    }, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+
+def renew_lease(db: Session, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+    """
+    Extend the lease of a running task. Returns False if the worker lost the lease or the task was cancelled,
+    the worker should stop working on it then.
+    """
+    renewed = db.query(FlashcardTask).filter(
+        FlashcardTask.id == task_id,
+        FlashcardTask.worker_id == worker_id,
+        FlashcardTask.cancel_requested.is_(False),
+    ).update({
+        FlashcardTask.lease_expires_at: _now() + timedelta(seconds=lease_seconds),
+    }, synchronize_session=False)
+    db.commit()
+    return renewed == 1
+
+
+def release_task(db: Session, task_id: str, worker_id: str) -> None:
+    """Give up the lease, e.g. when the worker shuts down"""
+    db.query(FlashcardTask).filter(
+        FlashcardTask.id == task_id,
+        FlashcardTask.worker_id == worker_id,
+    ).update({FlashcardTask.worker_id: None, FlashcardTask.lease_expires_at: None}, synchronize_session=False)
+    db.commit()
+
+
+def get_orphaned_task_ids(db: Session, grace_seconds: float) -> List[str]:
+    """
+    Unfinished tasks whose worker died (lease expired) or that were not claimed within grace_seconds
+    after their creation
+    """
+    now = _now()
+    rows = db.query(FlashcardTask.id).filter(
+        FlashcardTask.status.in_(ACTIVE_STATUSES),
+        FlashcardTask.cancel_requested.is_(False),
+        or_(
+            FlashcardTask.lease_expires_at < now,
+            and_(FlashcardTask.lease_expires_at.is_(None),
+                 FlashcardTask.created_at < now - timedelta(seconds=grace_seconds)),
+        )
+    ).all()
+    return [row[0] for row in rows]
+
+
+def get_finished_tasks(db: Session, finished_before: datetime) -> List[FlashcardTask]:
+    """Finished tasks (completed, failed or cancelled) older than finished_before"""
+    return db.query(FlashcardTask).filter(_finished_before(finished_before)).all()
+
+
+def _finished_before(finished_before: datetime):
+    """Condition of the tasks get_finished_tasks returns"""
+    return and_(
+        FlashcardTask.status.in_(FINISHED_STATUSES),
+        or_(
+            FlashcardTask.completed_at < finished_before,
+            FlashcardTask.completed_at.is_(None) & (FlashcardTask.created_at < finished_before),
+        )
+    )
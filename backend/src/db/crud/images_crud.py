@@ -1,7 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer, undefer
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy import and_
-from typing import List, Optional
-from ..models.db_file import Image
+from typing import List, Optional, Set
+from ..models.db_file import Image, FileBlob
 
 
 ############### IMAGES
@@ -10,10 +11,20 @@ def get_image_by_id(db: Session, image_id: int) -> Optional[Image]:
     return db.query(Image).filter(Image.id == image_id).first()
 
 def get_images_by_ids(db: Session, image_ids: List[int]) -> List[Image]:
-    """Get multiple images by their IDs"""
+    """Get multiple images by their IDs, image_data is only loaded for images that are not in the blob store"""
     if not image_ids:
         return []
-    return db.query(Image).filter(Image.id.in_(image_ids)).all()
+    images = db.query(Image).options(defer(Image.image_data)).filter(Image.id.in_(image_ids)).all()
+    legacy_ids = []
+    for image in images:
+        if image.blob is None:
+            legacy_ids.append(image.id)
+        else:
+            set_committed_value(image, "image_data", b"")  # What the row holds, readable after the session is closed
+    if legacy_ids:
+        # Fills the deferred column of the images loaded above
+        db.query(Image).options(undefer(Image.image_data)).filter(Image.id.in_(legacy_ids)).all()
+    return images
 
 
 def get_images_by_user_id(db: Session, user_id: str) -> List[Image]:
@@ -60,6 +71,23 @@ def create_image(db: Session, course_id: int, user_id: str, filename: str,
     return db_image
 
 
+def create_image_from_blob(db: Session, user_id: str, filename: str, content_type: str,
+                           sha256: str, size: int, course_id: Optional[int] = None) -> Image:
+    """Create a new image whose content is in the blob store"""
+    db_image = Image(
+        course_id=course_id,
+        user_id=user_id,
+        filename=filename,
+        content_type=content_type,
+        image_data=b"",  # Not nullable
+        blob=FileBlob(sha256=sha256, size=size),
+    )
+    db.add(db_image)
+    db.commit()
+    db.refresh(db_image)
+    return db_image
+
+
 def update_image(db: Session, image_id: int, **kwargs) -> Optional[Image]:
     """Update image with provided fields"""
     image = db.query(Image).filter(Image.id == image_id).first()
@@ -122,4 +150,22 @@ def get_images_by_content_type(db: Session, user_id: str, content_type: str) ->
     """Get all images of a specific content type for a user"""
     return db.query(Image).filter(
         and_(Image.user_id == user_id, Image.content_type == content_type)
-    ).all()
\ No newline at end of file
+    ).all()
+
+
+def claim_image_without_blob(db: Session, exclude_ids: Set[int] = frozenset()) -> Optional[Image]:
+    """
+    An image from before the blob store (content still in image_data), locked until the next commit or rollback.
+    Rows locked by another worker are skipped, so every row is moved by one worker only.
+    """
+    return db.query(Image).outerjoin(FileBlob, FileBlob.image_id == Image.id) \
+        .filter(FileBlob.id.is_(None), Image.image_data != b"", Image.id.notin_(exclude_ids)) \
+        .with_for_update(skip_locked=True, of=Image).first()
+
+
+def move_image_to_blob(db: Session, image: Image, sha256: str, size: int) -> Image:
+    """Reference the stored blob and drop the content from the row"""
+    image.blob = FileBlob(sha256=sha256, size=size)
+    image.image_data = b""
+    db.commit()
+    return image
@@ -1,7 +1,8 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 
 from ..config import settings
@@ -32,4 +33,54 @@ def get_db_context():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Async engine (asyncpg) for the request handlers, queries do not block the event loop.
+# Created on first use, the sync engine above stays for the agents, routines and the routers not migrated yet.
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.SQLALCHEMY_ASYNC_DATABASE_URL,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            connect_args={"timeout": settings.DB_CONNECT_TIMEOUT}
+        )
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        # Objects stay readable after commit, lazy loads of expired attributes are not possible in async
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_async_db_context():
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Close the connections of the async engine, called on application shutdown"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
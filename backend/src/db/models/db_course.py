@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, JSON, UniqueConstraint
 # Removed: from sqlalchemy.dialects.mysql import LONGBLOB (unused and not compatible with PostgreSQL)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -46,6 +46,7 @@ class Course(Base):
     user = relationship("User", back_populates="courses")
     documents = relationship("Document", foreign_keys="Document.course_id", cascade="all, delete-orphan")
     images = relationship("Image", foreign_keys="Image.course_id", cascade="all, delete-orphan")
+    checkpoints = relationship("CourseCheckpoint", back_populates="course", cascade="all, delete-orphan")
 
 
 class Chapter(Base):
@@ -96,4 +97,25 @@ class PracticeQuestion(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    chapter = relationship("Chapter", back_populates="questions")
\ No newline at end of file
+    chapter = relationship("Chapter", back_populates="questions")
+
+
+class CourseCheckpoint(Base):
+    """
+    Output of a finished course creation stage (e.g. info, planner, chapter_3).
+    A retried course creation resumes from the first stage without a checkpoint.
+    """
+    __tablename__ = "course_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
+    stage = Column(String(50), nullable=False)
+    data = Column(JSON, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    course = relationship("Course", back_populates="checkpoints")
+
+    __table_args__ = (
+        UniqueConstraint('course_id', 'stage', name='uq_course_checkpoint_stage'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, LargeBinary, DateTime, ForeignKey, JSON
 # Removed: from sqlalchemy.dialects.mysql import LONGBLOB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,11 +14,41 @@ class Document(Base):
     user_id = Column(String(50), ForeignKey("users.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     content_type = Column(String(100), nullable=False)
-    file_data = Column(LargeBinary, nullable=True)  # Actual file content
+    file_data = Column(LargeBinary, nullable=True)  # Actual file content, None if it is in the blob store
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     user = relationship("User")
+    parsed_text = relationship("DocumentText", uselist=False, back_populates="document", cascade="all, delete-orphan")
+    blob = relationship("FileBlob", uselist=False, lazy="joined", cascade="all, delete-orphan",
+                        foreign_keys="FileBlob.document_id")
+
+
+class DocumentText(Base):
+    """Text derived from a document. The PDF is parsed once and the result is reused by the whole pipeline."""
+    __tablename__ = "document_texts"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    page_count = Column(Integer, nullable=False)
+    pages = Column(JSON, nullable=False)  # Text of every page
+    paragraphs = Column(JSON, nullable=False)  # Paragraphs with page number, index and word count
+    toc = Column(JSON, nullable=True)  # Table of contents as [level, title, page]
+    doc_metadata = Column(JSON, nullable=True)  # Title and author
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    document = relationship("Document", back_populates="parsed_text")
+
+    def to_dict(self) -> dict:
+        """Return the parsed document in the same format as parse_pdf_document"""
+        return {
+            "page_count": self.page_count,
+            "metadata": self.doc_metadata or {},
+            "toc": self.toc or [],
+            "pages": self.pages,
+            "paragraphs": self.paragraphs,
+        }
 
 
 class Image(Base):
@@ -30,8 +60,26 @@ class Image(Base):
     user_id = Column(String(50), ForeignKey("users.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     content_type = Column(String(100), nullable=False)
-    image_data = Column(LargeBinary, nullable=False)  # Actual image content
+    image_data = Column(LargeBinary, nullable=False)  # Actual image content, empty if it is in the blob store
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+    blob = relationship("FileBlob", uselist=False, lazy="joined", cascade="all, delete-orphan",
+                        foreign_keys="FileBlob.image_id")
+
+
+class FileBlob(Base):
+    """
+    Content of a document or image in the blob store (services/blob_store.py), addressed by its sha256.
+    Identical uploads share one blob. A table of its own, so the documents and images tables need no migration,
+    rows from before the blob store keep their bytes in file_data / image_data until they are moved.
+    """
+    __tablename__ = "file_blobs"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=True, unique=True, index=True)
+    image_id = Column(Integer, ForeignKey("images.id", ondelete="CASCADE"), nullable=True, unique=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -0,0 +1,56 @@
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class FlashcardDocument(Base):
+    """PDF uploaded for flashcard generation. The file itself lives in the upload directory."""
+    __tablename__ = "flashcard_documents"
+
+    id = Column(String(36), primary_key=True)  # uuid4
+    user_id = Column(String(50), ForeignKey("users.id"), nullable=True, index=True)
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(1000), nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class FlashcardTask(Base):
+    """
+    Flashcard generation task with its progress.
+    A task is run by the worker that holds its lease (worker_id, lease_expires_at). The worker renews the lease
+    while it runs, so any worker can serve the status and a task of a dead worker is claimed by another one.
+    """
+    __tablename__ = "flashcard_tasks"
+
+    id = Column(String(36), primary_key=True)  # uuid4, the task id of the API
+    user_id = Column(String(50), ForeignKey("users.id"), nullable=True, index=True)
+    document_id = Column(String(36), nullable=False)
+    config = Column(JSON, nullable=False)  # FlashcardConfig, needed for retries
+
+    # Progress (see TaskProgress)
+    status = Column(String(20), nullable=False, default="pending")
+    progress_percentage = Column(Integer, nullable=False, default=0)
+    current_step = Column(String(200), nullable=True)
+    completed_steps = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+    download_url = Column(String(500), nullable=True)
+    step_details = Column(JSON, nullable=True)
+    activity_log = Column(JSON, nullable=True)
+    stats = Column(JSON, nullable=True)
+    estimated_time_remaining = Column(String(50), nullable=True)
+
+    # Claim/lease of the worker running the task
+    worker_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_flashcard_tasks_status_lease", "status", "lease_expires_at"),
+    )
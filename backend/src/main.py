@@ -23,6 +23,7 @@ from .api.schemas import user as user_schema
 from .db import database
 from .db.crud import users_crud
 from .db.models import db_user as user_model
+from .db.models import db_flashcard_task  # noqa: F401 (registers the flashcard tables for create_all)
 from .utils import auth as auth_utils
 
 from .core.routines import update_stuck_courses
@@ -4,7 +4,9 @@ This file defines the service that coordinates the interaction between all the a
 import json
 import asyncio
 import traceback
-from typing import List
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
 from logging import getLogger
 
 
@@ -19,7 +21,7 @@ from .state_service import StateService, CourseState
 # REMOVED: Agent imports moved inside lazy properties to prevent blocking litellm import
 # from ..agents.explainer_agent.agent import ExplainerAgent
 # from ..agents.grader_agent.agent import GraderAgent
-from ..db.crud import chapters_crud, documents_crud, images_crud, questions_crud, courses_crud
+from ..db.crud import chapters_crud, documents_crud, images_crud, questions_crud, courses_crud, checkpoints_crud
 
 
 # REMOVED: Duplicate import
@@ -36,12 +38,18 @@ from ..api.schemas.course import CourseRequest
 #from ..services.notification_service import WebSocketConnectionManager
 from ..db.models.db_course import Course
 from ..db.database import get_db_context
+from ..core.agent_scheduler import PRIORITY_INTERACTIVE, agent_priority
+from ..core.session_sweeper import register_session_service
+from ..config import settings
 from google.genai import types
 
 #from .data_processors.pdf_processor import PDFProcessor
 
 from ..db.models.db_file import Document, Image
 from ..db.crud import usage_crud
+from .progress_service import get_progress_bus
+from .generation_cache import GenerationCache, get_generation_cache
+from .blob_store import file_sha256
 
 
 
@@ -55,6 +63,7 @@ class AgentService:
         
         # session
         self.session_service = InMemorySessionService()
+        register_session_service(self.session_service)
         self.app_name = "Nexora"
         self.state_manager = StateService()
         self.query_service = QueryService(self.state_manager)
@@ -68,9 +77,12 @@ class AgentService:
         self._grader_agent = None
 
         # define Rag service (always needed)
-        self.vector_service = vector_service.VectorService()
+        self.vector_service = vector_service.get_vector_service()
         self.contentService = CourseContentService()
 
+        # progress events for the SSE endpoint
+        self.progress = get_progress_bus()
+
     @property
     def info_agent(self):
         """Lazy-load InfoAgent only when first accessed"""
@@ -145,9 +157,77 @@ class AgentService:
                 )
 
 
+    async def resume_course(self, course_id: int, task_id: Optional[str] = None) -> bool:
+        """
+        Resume a failed or stuck course creation from its checkpoints.
+        Returns False if the course cannot be resumed (unknown course or no stored request).
+        """
+        with get_db_context() as db:
+            course = courses_crud.get_course_by_id(db, course_id)
+            stored_request = checkpoints_crud.get_checkpoint(db, course_id, "request")
+            if not course or stored_request is None:
+                return False
+            user_id = str(course.user_id)
+            courses_crud.update_course(db, course_id, status=CourseStatus.CREATING, error_msg=None)
+
+        await self.create_course(
+            user_id=user_id,
+            course_id=course_id,
+            request=CourseRequest(**stored_request),
+            task_id=task_id or str(uuid.uuid4())
+        )
+        return True
+
+    async def _publish(self, course_id: int, event_type: str, **data):
+        """Publish a progress event, a failure here must never break the course creation"""
+        try:
+            await self.progress.publish(course_id, event_type, data)
+        except Exception as e:
+            logger.warning("Failed to publish %s event for course %s: %s", event_type, course_id, e)
+
+    @staticmethod
+    def _beat(course_id: int):
+        with get_db_context() as db:
+            attempt = checkpoints_crud.get_checkpoint(db, course_id, "attempt")
+            if attempt is None:
+                return  # Finished, its checkpoints are deleted
+            checkpoints_crud.save_checkpoint(db, course_id, "attempt", {
+                **attempt, "heartbeat_at": datetime.now(timezone.utc).isoformat()
+            })
+
+    async def _heartbeat(self, course_id: int):
+        """Renew the heartbeat of a running course creation, update_stuck_courses only resumes courses without one"""
+        while True:
+            await asyncio.sleep(settings.COURSE_HEARTBEAT_SECONDS)
+            try:
+                await asyncio.to_thread(self._beat, course_id)
+            except Exception as e:
+                logger.warning("Heartbeat of course %s failed: %s", course_id, e)
+
+    async def _find_image(self, user_id: str, caption: str, summary: str, content: types.Content,
+                          image_calls: dict) -> str:
+        """
+        Image url for the course or a chapter. With IMAGE_FAST_PATH the url comes from a keyword search
+        without an LLM, the ImageAgent is only asked if that search finds nothing.
+        image_calls counts the saved and the made ImageAgent calls of the course.
+        """
+        if settings.IMAGE_FAST_PATH:
+            from ..agents.image_agent.keyword_search import find_image_url
+            url = await find_image_url(caption, summary)
+            if url:
+                image_calls["saved"] += 1
+                return url
+
+        image_calls["llm"] += 1
+        image_response = await self.image_agent.run(user_id=user_id, state={}, content=content)
+        return image_response['explanation']
+
     async def create_course(self, user_id: str, course_id: int, request: CourseRequest, task_id: str):#, ws_manager: WebSocketConnectionManager):
         """
-        Main function for handling the course creation logic. Uses WebSocket for progress.
+        Main function for handling the course creation logic. Progress is published to the progress bus
+        (stage_started/stage_finished, chapter_ready, questions_ready, course_finished/course_failed).
+        The output of every finished stage is stored as a checkpoint. If a course creation is retried,
+        finished stages are loaded from their checkpoints and the pipeline resumes at the first incomplete stage.
 
         Parameters:
         user_id (str): The unique identifier of the user who is creating the course.
@@ -157,29 +237,39 @@ class AgentService:
         #ws_manager (WebSocketConnectionManager): Manager to send messages over WebSockets.
         """
         course_db = None
+        image_calls = {"saved": 0, "llm": 0}
+        heartbeat = None
         try:
             logger.info("[%s] Starting course creation for user %s", task_id, user_id)
+            await self._publish(course_id, "course_started")
 
-            # Log at the beginning of the task -> prevent over usage of limit
             with get_db_context() as db:
-                usage_crud.log_course_creation(
-                    db=db,
-                    user_id=user_id,
-                    course_id=course_id,
-                    detail=json.dumps(request.model_dump())
-                )
-                logger.info("[%s] Usage logged for course creation by user %s", task_id, user_id)
-
+                checkpoints = checkpoints_crud.get_checkpoints(db, course_id)
+                attempt = (checkpoints.get("attempt") or {}).get("count", 0) + 1
+                started_at = datetime.now(timezone.utc).isoformat()
+                checkpoints_crud.save_checkpoint(db, course_id, "attempt", {
+                    "count": attempt,
+                    "started_at": started_at,
+                    "heartbeat_at": started_at,
+                })
+            heartbeat = asyncio.create_task(self._heartbeat(course_id))
 
-
-            # Create a memory session for the course creation
-            session = await self.session_service.create_session(
-                app_name=self.app_name,
-                user_id=user_id,
-                state={}
-            )
-            session_id = session.id
-            logger.info("[%s] Session created: %s", task_id, session_id)
+            with get_db_context() as db:
+                # The course row exists already, so a failure in any stage is written back as FAILED
+                course_db = courses_crud.get_course_by_id(db, course_id)
+                if "request" in checkpoints:
+                    logger.info("[%s] Resuming course %s (attempt %d), finished stages: %s",
+                                task_id, course_id, attempt, sorted(checkpoints.keys()))
+                else:
+                    # Log at the beginning of the task -> prevent over usage of limit
+                    usage_crud.log_course_creation(
+                        db=db,
+                        user_id=user_id,
+                        course_id=course_id,
+                        detail=json.dumps(request.model_dump())
+                    )
+                    logger.info("[%s] Usage logged for course creation by user %s", task_id, user_id)
+                    checkpoints_crud.save_checkpoint(db, course_id, "request", request.model_dump())
 
             # Retrieve documents from database
             with get_db_context() as db:
@@ -188,42 +278,89 @@ class AgentService:
             
             logger.info("[%s] Retrieved %d documents and %d images.", task_id, len(docs), len(images))
 
-            #Add Data to ChromaDB for RAG
-            self.contentService.process_course_documents(
-                course_id=course_id,
-                documents=docs
-            )
+            # Identical requests (same query, settings and files) reuse the info and planner outputs
+            generation_cache = get_generation_cache()
+            generation_key = None
+            if generation_cache is not None:
+                generation_key = GenerationCache.make_key(
+                    request.query, request.time_hours, request.language, request.difficulty,
+                    file_hashes=[file_sha256(file) for file in docs + images]
+                )
 
-            # Get a short course title and description from the info_agent
-            info_response = await self.info_agent.run(
-                user_id=user_id,
-                state={},
-                content=self.query_service.get_info_query(request, docs, images,)
-            )
-            logger.info("[%s] InfoAgent response: %s", task_id, info_response['title'])
+            # Parse every PDF once, the result is shared by RAG ingestion and the info query
+            parsed_documents = await self.contentService.get_parsed_documents(docs)
 
-            # Get unsplash image url
-            image_response = await self.image_agent.run(
-                user_id=user_id,
-                state={},
-                content=create_text_query(
-                    f"Title: {info_response['title']}, Description: {info_response['description']}")
-            )
-
-            # Update course in database
-            with get_db_context() as db:
-                course_db = courses_crud.update_course(
-                    db=db,
+            #Add Data to ChromaDB for RAG
+            if "documents" not in checkpoints:
+                await self._publish(course_id, "stage_started", stage="documents")
+                await self.contentService.process_course_documents_async(
                     course_id=course_id,
-                    session_id=session_id,
-                    title=info_response['title'],
-                    description=info_response['description'],
-                    image_url=image_response['explanation'],
-                    total_time_hours=request.time_hours,
+                    documents=docs,
+                    parsed_documents=parsed_documents
+                )
+                with get_db_context() as db:
+                    checkpoints_crud.save_checkpoint(db, course_id, "documents", {"document_ids": request.document_ids})
+            await self._publish(course_id, "stage_finished", stage="documents")
+
+            if "info" not in checkpoints:
+                await self._publish(course_id, "stage_started", stage="info")
+                # Create a memory session for the course creation
+                session = await self.session_service.create_session(
+                    app_name=self.app_name,
+                    user_id=user_id,
+                    state={}
+                )
+                session_id = session.id
+                logger.info("[%s] Session created: %s", task_id, session_id)
+
+                # Get a short course title and description from the info_agent
+                info_response = generation_cache.get(generation_key, "info") if generation_cache else None
+                if info_response is not None:
+                    logger.info("[%s] InfoAgent output taken from the generation cache", task_id)
+                else:
+                    info_response = await self.info_agent.run(
+                        user_id=user_id,
+                        state={},
+                        content=self.query_service.get_info_query(request, docs, images, parsed_documents=parsed_documents)
+                    )
+                    if generation_cache is not None and info_response.get('title'):
+                        generation_cache.put(generation_key, "info", {
+                            "title": info_response['title'],
+                            "description": info_response['description'],
+                        })
+                logger.info("[%s] InfoAgent response: %s", task_id, info_response['title'])
+
+                # Get unsplash image url
+                image_url = await self._find_image(
+                    user_id=user_id,
+                    caption=info_response['title'],
+                    summary=info_response['description'],
+                    content=create_text_query(
+                        f"Title: {info_response['title']}, Description: {info_response['description']}"),
+                    image_calls=image_calls,
                 )
-                if not course_db:
-                    raise ValueError(f"Failed to update course in DB for user {user_id} with course_id {course_id}")
-            print(f"[{task_id}] Course updated in DB with ID: {course_id}")
+
+                # Update course in database
+                with get_db_context() as db:
+                    course_db = courses_crud.update_course(
+                        db=db,
+                        course_id=course_id,
+                        session_id=session_id,
+                        title=info_response['title'],
+                        description=info_response['description'],
+                        image_url=image_url,
+                        total_time_hours=request.time_hours,
+                    )
+                    if not course_db:
+                        raise ValueError(f"Failed to update course in DB for user {user_id} with course_id {course_id}")
+                    checkpoints["info"] = {
+                        "title": info_response['title'],
+                        "description": info_response['description'],
+                        "image_url": image_url,
+                    }
+                    checkpoints_crud.save_checkpoint(db, course_id, "info", checkpoints["info"])
+                print(f"[{task_id}] Course updated in DB with ID: {course_id}")
+            await self._publish(course_id, "stage_finished", stage="info", **checkpoints["info"])
 
             # Send Notification to WebSocket
             ###await ws_manager.send_json_message(task_id, {"type": "course_info", "data": "updating course info"})
@@ -251,86 +388,141 @@ class AgentService:
             ###await ws_manager.send_json_message(task_id, {"type": "course_info", "data": course_info_data})
             ###print(f"[{task_id}] Sent course_info update.")
 
-            # Query the planner agent
-            response_planner = await self.planner_agent.run(
-                user_id=user_id,
-                state=self.state_manager.get_state(user_id=user_id, course_id=course_id),
-                content=self.query_service.get_planner_query(request, docs, images),
-                debug=True
-            )
-            if not response_planner or "chapters" not in response_planner:
-                raise ValueError(f"PlannerAgent did not return valid chapters for user {user_id} with course_id {course_id}")
-            print(f"[{task_id}] PlannerAgent responded with {len(response_planner.get('chapters', []))} chapters.")
+            if "planner" in checkpoints:
+                response_planner = {"chapters": checkpoints["planner"]["chapters"]}
+            else:
+                await self._publish(course_id, "stage_started", stage="planner")
+                # Query the planner agent
+                response_planner = generation_cache.get(generation_key, "planner") if generation_cache else None
+                if response_planner is not None:
+                    logger.info("[%s] PlannerAgent output taken from the generation cache", task_id)
+                else:
+                    response_planner = await self.planner_agent.run(
+                        user_id=user_id,
+                        state=self.state_manager.get_state(user_id=user_id, course_id=course_id),
+                        content=self.query_service.get_planner_query(request, docs, images),
+                        debug=True
+                    )
+                    if generation_cache is not None and response_planner and "chapters" in response_planner:
+                        generation_cache.put(generation_key, "planner", {"chapters": response_planner["chapters"]})
+                if not response_planner or "chapters" not in response_planner:
+                    raise ValueError(f"PlannerAgent did not return valid chapters for user {user_id} with course_id {course_id}")
+                print(f"[{task_id}] PlannerAgent responded with {len(response_planner.get('chapters', []))} chapters.")
 
-            # Update course in database
-            with get_db_context() as db:
-                course_db = courses_crud.update_course(
-                    db=db,
-                    course_id=course_id,
-                    chapter_count=len(response_planner["chapters"])
-                )
+                # Update course in database
+                with get_db_context() as db:
+                    course_db = courses_crud.update_course(
+                        db=db,
+                        course_id=course_id,
+                        chapter_count=len(response_planner["chapters"])
+                    )
+                    checkpoints_crud.save_checkpoint(db, course_id, "planner", {"chapters": response_planner["chapters"]})
             # Send notification to WebSocket that course info is being updated
             ###await ws_manager.send_json_message(task_id, {"type": "course_info", "data": "updating course info"})
 
             # Save chapters to state
             self.state_manager.save_chapters(user_id, course_id, response_planner["chapters"])
+            await self._publish(
+                course_id, "stage_finished", stage="planner",
+                chapter_count=len(response_planner["chapters"]),
+                chapters=[{"index": idx + 1, "caption": topic["caption"]} for idx, topic in enumerate(response_planner["chapters"])]
+            )
 
             async def process_chapter(idx: int, topic: dict):
 
-                logger.info("[%s] Processing chapter %d: %s", task_id, idx + 1, topic['caption'])
-
-                # Get RAG infos for the topic
-                ragInfos = self.contentService.get_rag_infos(course_id, topic)
-
-                # Schedule image and coding agents to run concurrently as they do not depend on each other
-                coding_task = self.coding_agent.run(
-                    user_id=user_id,
-                    state=self.state_manager.get_state(user_id=user_id, course_id=course_id),
-                    content=self.query_service.get_explainer_query(user_id, course_id, idx, request.language, request.difficulty, ragInfos),
-                )
-
-                image_task = self.image_agent.run(
-                    user_id=user_id,
-                    state={},
-                    content=self.query_service.get_explainer_image_query(user_id, course_id, idx)
-                )
-
-                # Await both tasks to complete in parallel
-                response_code, image_response = await asyncio.gather(
-                    coding_task,
-                    image_task
-                )
-
-                summary = "\n".join(topic['content'][:3])
+                if f"chapter_{idx}_questions" in checkpoints:
+                    logger.info("[%s] Chapter %d already finished, skipping", task_id, idx + 1)
+                    await self._publish(course_id, "chapter_ready", index=idx + 1,
+                                        chapter_id=checkpoints[f"chapter_{idx}"]["chapter_id"], caption=topic['caption'])
+                    await self._publish(course_id, "questions_ready", index=idx + 1,
+                                        chapter_id=checkpoints[f"chapter_{idx}"]["chapter_id"],
+                                        question_count=checkpoints[f"chapter_{idx}_questions"]["question_count"])
+                    return
+
+                chapter_checkpoint = checkpoints.get(f"chapter_{idx}")
+                if chapter_checkpoint is None and "attempt" in checkpoints:
+                    # The chapter row is committed before its checkpoint, an attempt that stopped in between
+                    # left the row only. It is taken over instead of creating the chapter a second time.
+                    with get_db_context() as db:
+                        chapter_db = chapters_crud.get_chapter_by_course_and_index(db, course_id, idx + 1)
+                        if chapter_db is not None:
+                            chapter_checkpoint = {"chapter_id": chapter_db.id, "content": chapter_db.content}
+                            checkpoints_crud.save_checkpoint(db, course_id, f"chapter_{idx}", chapter_checkpoint)
+                if chapter_checkpoint:
+                    logger.info("[%s] Chapter %d content restored from checkpoint", task_id, idx + 1)
+                    chapter_id = chapter_checkpoint["chapter_id"]
+                    chapter_content = chapter_checkpoint["content"]
+                else:
+                    logger.info("[%s] Processing chapter %d: %s", task_id, idx + 1, topic['caption'])
+
+                    # Get RAG infos for the topic
+                    ragInfos = await self.contentService.get_rag_infos_async(course_id, topic)
+
+                    # Schedule image and coding agents to run concurrently as they do not depend on each other
+                    coding_task = self.coding_agent.run(
+                        user_id=user_id,
+                        state=self.state_manager.get_state(user_id=user_id, course_id=course_id),
+                        content=self.query_service.get_explainer_query(user_id, course_id, idx, request.language, request.difficulty, ragInfos),
+                    )
 
-                # Save the chapter in db first
-                with get_db_context() as db:
-                    chapter_db = chapters_crud.create_chapter(
-                        db=db,
-                        course_id=course_id,
-                        index=idx + 1,
+                    summary = "\n".join(topic['content'][:3])
+                    image_task = self._find_image(
+                        user_id=user_id,
                         caption=topic['caption'],
                         summary=summary,
-                        content=response_code['explanation'] if 'explanation' in response_code else "() => {<p>Something went wrong</p>}",
-                        time_minutes=topic['time'],
-                        image_url=image_response['explanation'],
+                        content=self.query_service.get_explainer_image_query(user_id, course_id, idx),
+                        image_calls=image_calls,
+                    )
+
+                    # Await both tasks to complete in parallel
+                    response_code, image_url = await asyncio.gather(
+                        coding_task,
+                        image_task
                     )
 
+                    chapter_content = response_code['explanation'] if 'explanation' in response_code else "() => {<p>Something went wrong</p>}"
+
+                    # Save the chapter in db first
+                    with get_db_context() as db:
+                        chapter_db = chapters_crud.create_chapter(
+                            db=db,
+                            course_id=course_id,
+                            index=idx + 1,
+                            caption=topic['caption'],
+                            summary=summary,
+                            content=chapter_content,
+                            time_minutes=topic['time'],
+                            image_url=image_url,
+                        )
+                        chapter_id = chapter_db.id
+                        checkpoints_crud.save_checkpoint(db, course_id, f"chapter_{idx}", {
+                            "chapter_id": chapter_id,
+                            "content": chapter_content,
+                        })
+                await self._publish(course_id, "chapter_ready", index=idx + 1, chapter_id=chapter_id, caption=topic['caption'])
+
                 # Get response from tester agent
                 response_tester = await self.tester_agent.run(
                     user_id=user_id,
                     state=self.state_manager.get_state(user_id=user_id, course_id=course_id),
-                    content=self.query_service.get_tester_query(user_id, course_id, idx, response_code["explanation"], request.language, request.difficulty) 
+                    content=self.query_service.get_tester_query(user_id, course_id, idx, chapter_content, request.language, request.difficulty) 
                 )
 
                 logger.info("Finished")
 
                 # Save questions in db
                 with get_db_context() as db:
-                    await self.save_questions(db, response_tester['questions'], chapter_db.id)
-                
-                return chapter_db
-
+                    if chapter_checkpoint:
+                        # Questions an earlier attempt saved without writing their checkpoint are replaced
+                        questions_crud.delete_questions_by_chapter(db, chapter_id)
+                    await self.save_questions(db, response_tester['questions'], chapter_id)
+                    checkpoints_crud.save_checkpoint(db, course_id, f"chapter_{idx}_questions", {
+                        "question_count": len(response_tester['questions'])
+                    })
+                await self._publish(course_id, "questions_ready", index=idx + 1, chapter_id=chapter_id,
+                                    question_count=len(response_tester['questions']))
+
+            await self._publish(course_id, "stage_started", stage="chapters")
             # Process all chapters in parallel
             chapter_tasks = [
                 process_chapter(idx, topic) 
@@ -340,9 +532,15 @@ class AgentService:
             # Wait for all chapters to be processed
             await asyncio.gather(*chapter_tasks)
 
-            # Update course status to finished
+            # Update course status to finished, the checkpoints are not needed anymore
             with get_db_context() as db:
                 courses_crud.update_course_status(db, course_id, CourseStatus.FINISHED)
+                checkpoints_crud.delete_checkpoints(db, course_id)
+            await self._publish(course_id, "stage_finished", stage="chapters")
+            if settings.IMAGE_FAST_PATH:
+                logger.info("[%s] Image fast path saved %d of %d image LLM calls", task_id,
+                            image_calls["saved"], image_calls["saved"] + image_calls["llm"])
+            await self._publish(course_id, "course_finished", status=CourseStatus.FINISHED.value)
 
             # Send completion signal
             #await ws_manager.send_json_message(task_id, {
@@ -366,6 +564,7 @@ class AgentService:
                     print(f"[{task_id}] Additionally, failed to update course status to FAILED: {db_error}")
             else:
                 print(f"[{task_id}] No course_db to update status, error occurred before course creation.")
+            await self._publish(course_id, "course_failed", status=CourseStatus.FAILED.value)
             #raise e
         
             #await ws_manager.send_json_message(task_id, {
@@ -377,6 +576,10 @@ class AgentService:
             # raise e
 
         finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            # The agent state is only needed while the course is created, a retry rebuilds it
+            self.state_manager.delete_state(user_id, course_id)
             print(f"[{task_id}] Finished processing create_course background task.")
             # Ensure the database session is closed if it was passed specifically for this task
             # and not managed by FastAPI's Depends. For now, assuming Depends handles it.
@@ -386,11 +589,26 @@ class AgentService:
                              chapter_id: int, db):
         """ Receives an open text question plus answer from the user and returns received points and short feedback """
         query = self.query_service.get_grader_query(question, correct_answer, users_answer)
-        grader_response = await self.grader_agent.run(
-            user_id=user_id,
-            state=self.state_manager.get_state(user_id=user_id, course_id=course_id),
-            content=query
-        )
+        # The grader only needs query, language and difficulty. Once the course is created its state is evicted,
+        # so these are taken from the course itself.
+        state = self.state_manager.get_state(user_id=user_id, course_id=course_id)
+        if not self.state_manager.has_state(user_id, course_id):
+            course = courses_crud.get_course_by_id(db, course_id)
+            if course:
+                state = CourseState(
+                    query=course.query,
+                    time_hours=course.total_time_hours,
+                    language=course.language,
+                    difficulty=course.difficulty,
+                ).model_dump()
+
+        # The user waits for the grade, so it is served before course generation
+        with agent_priority(PRIORITY_INTERACTIVE):
+            grader_response = await self.grader_agent.run(
+                user_id=user_id,
+                state=state,
+                content=query
+            )
 
         # Log usage of grading
         usage_crud.log_usage(
@@ -411,3 +629,13 @@ class AgentService:
 
         return grader_response['points'], grader_response['explanation']
 
+
+# Lazy AgentService singleton, shared by the routers and the scheduler routines
+_agent_service = None
+
+def get_agent_service():
+    """Get or create the AgentService singleton lazily"""
+    global _agent_service
+    if _agent_service is None:
+        _agent_service = AgentService()
+    return _agent_service
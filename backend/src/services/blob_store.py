@@ -0,0 +1,299 @@
+"""
+Content-addressed store for the bytes of uploaded documents and images.
+Uploads used to be LargeBinary columns: an upload was read into memory and written into the row, every download
+loaded the whole blob (even for a 1 KB Range request) and the course creation pulled all of them from Postgres.
+Blobs are now addressed by their sha256, so identical uploads are stored once, the rows only keep the hash
+(db/models/db_file.FileBlob). Backends:
+ - local: files under BLOB_STORE_PATH, sharded as ab/cd/abcd..., served with FileResponse (sendfile, Range)
+ - s3: an S3 compatible bucket (AWS, MinIO, ...), needs boto3, Range requests are passed on to the bucket
+Blobs are never deleted when a row is, other rows can share them. The blob store routine deletes blobs that no
+row references anymore and that were not written for BLOB_GC_GRACE_HOURS (an upload in progress re-writes them).
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobTooLargeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    sha256: str
+    size: int
+
+
+class BlobStore(ABC):
+    """Content-addressed storage of file contents, put_stream and put_bytes hash the content for the backends"""
+
+    def __init__(self, tmp_dir: Optional[str] = None):
+        self.tmp_dir = tmp_dir
+
+    def put_stream(self, stream: BinaryIO, max_size: Optional[int] = None) -> StoredBlob:
+        """
+        Store the content of a file object, hashed while it is copied in chunks to a temporary file.
+        Raises BlobTooLargeError as soon as more than max_size bytes were read.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, prefix="upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while chunk := stream.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise BlobTooLargeError(f"Blob larger than {max_size} bytes")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            blob = StoredBlob(digest.hexdigest(), size)
+            self._commit(tmp_path, blob)
+            return blob
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put_bytes(self, data: bytes) -> StoredBlob:
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, prefix="upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            blob = StoredBlob(hashlib.sha256(data).hexdigest(), len(data))
+            self._commit(tmp_path, blob)
+            return blob
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @abstractmethod
+    def _commit(self, tmp_path: str, blob: StoredBlob) -> None:
+        """Move the temporary file to the blob's address, or refresh the blob's age if it exists already"""
+
+    @abstractmethod
+    def read(self, sha256: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def iter_range(self, sha256: str, start: int, end: int) -> Iterator[bytes]:
+        """Bytes start to end (inclusive) of a blob in chunks"""
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        """Path of the blob on the local filesystem, None for remote backends"""
+        return None
+
+    @abstractmethod
+    def written_at(self, sha256: str) -> Optional[float]:
+        """When the blob was last written as unix time, None if it does not exist"""
+
+    @abstractmethod
+    def delete(self, sha256: str) -> None:
+        pass
+
+    @abstractmethod
+    def list_blobs(self) -> Iterator[Tuple[str, float]]:
+        """(sha256, last written as unix time) of every stored blob"""
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        # Temporary files on the same filesystem, so committing them is an atomic rename
+        super().__init__(os.path.join(self.root, "tmp"))
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def _commit(self, tmp_path: str, blob: StoredBlob) -> None:
+        path = self.path(blob.sha256)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    def read(self, sha256: str) -> bytes:
+        with open(self.path(sha256), "rb") as f:
+            return f.read()
+
+    def iter_range(self, sha256: str, start: int, end: int) -> Iterator[bytes]:
+        with open(self.path(sha256), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0 and (chunk := f.read(min(CHUNK_SIZE, remaining))):
+                remaining -= len(chunk)
+                yield chunk
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        path = self.path(sha256)
+        return path if os.path.exists(path) else None
+
+    def written_at(self, sha256: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.path(sha256))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, sha256: str) -> None:
+        try:
+            os.remove(self.path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def list_blobs(self) -> Iterator[Tuple[str, float]]:
+        for directory, subdirectories, files in os.walk(self.root):
+            if directory == self.root:
+                subdirectories[:] = [d for d in subdirectories if d != "tmp"]
+            for name in files:
+                if len(name) == 64:
+                    yield name, os.path.getmtime(os.path.join(directory, name))
+
+
+class S3BlobStore(BlobStore):
+    def __init__(self, bucket: str, prefix: str = "", client=None, **client_kwargs):
+        """
+        :param client: a boto3 S3 client (or a stand-in with the same methods), created from client_kwargs if None
+        """
+        super().__init__()
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("BLOB_STORE_BACKEND=s3 needs boto3 (pip install boto3)") from e
+            client = boto3.client("s3", **{key: value for key, value in client_kwargs.items() if value})
+        self.client = client
+
+    def key(self, sha256: str) -> str:
+        return "/".join(filter(None, [self.prefix, sha256[:2], sha256[2:4], sha256]))
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def _commit(self, tmp_path: str, blob: StoredBlob) -> None:
+        key = self.key(blob.sha256)
+        if self._head(key) is not None:
+            # Copying the object onto itself refreshes LastModified, the garbage collection keeps it
+            self.client.copy_object(Bucket=self.bucket, Key=key, CopySource={"Bucket": self.bucket, "Key": key},
+                                    MetadataDirective="REPLACE")
+            return
+        with open(tmp_path, "rb") as f:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=f)
+
+    def read(self, sha256: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self.key(sha256))["Body"].read()
+
+    def iter_range(self, sha256: str, start: int, end: int) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=self.bucket, Key=self.key(sha256), Range=f"bytes={start}-{end}")["Body"]
+        while chunk := body.read(CHUNK_SIZE):
+            yield chunk
+
+    def written_at(self, sha256: str) -> Optional[float]:
+        head = self._head(self.key(sha256))
+        return head["LastModified"].timestamp() if head is not None else None
+
+    def delete(self, sha256: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(sha256))
+
+    def list_blobs(self) -> Iterator[Tuple[str, float]]:
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": f"{self.prefix}/" if self.prefix else ""}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**kwargs)
+            for item in page.get("Contents", []):
+                name = item["Key"].rsplit("/", 1)[-1]
+                if len(name) == 64:
+                    yield name, item["LastModified"].timestamp()
+            if not page.get("IsTruncated"):
+                return
+            token = page.get("NextContinuationToken")
+
+
+def read_file_data(row) -> bytes:
+    """Bytes of a Document or Image row, from the blob store or from the row itself (rows from before the store)"""
+    if row.blob is not None:
+        return get_blob_store().read(row.blob.sha256)
+    data = getattr(row, "file_data", None)
+    if data is None:
+        data = getattr(row, "image_data", None)
+    return data or b""
+
+
+def file_sha256(row) -> str:
+    """sha256 of the bytes of a Document or Image row, without loading a stored blob"""
+    if row.blob is not None:
+        return row.blob.sha256
+    return hashlib.sha256(read_file_data(row)).hexdigest()
+
+
+def check_persistent_storage(store: BlobStore) -> None:
+    """
+    Raise RuntimeError if a local store is in the writable layer of a container: it is lost when the container is
+    recreated (redeploy), while the rows still reference its blobs. BLOB_STORE_PATH has to be a mounted volume there.
+    """
+    if not isinstance(store, LocalBlobStore):
+        return
+    if not (os.path.exists("/.dockerenv") or os.path.exists("/run/.containerenv")):
+        return
+    mount_point = os.path.realpath(store.root)
+    while not os.path.ismount(mount_point):
+        mount_point = os.path.dirname(mount_point)
+    if mount_point == "/":
+        raise RuntimeError(f"BLOB_STORE_PATH {store.root} is not on a mounted volume, "
+                           f"uploads would be lost when the container is recreated")
+
+
+def collect_garbage(store: BlobStore, referenced: set, grace_seconds: float) -> int:
+    """Delete the blobs that are not referenced and were last written more than grace_seconds ago"""
+    cutoff = time.time() - grace_seconds
+    deleted = 0
+    for sha256, written_at in list(store.list_blobs()):
+        if sha256 in referenced or written_at >= cutoff:
+            continue
+        # Checked again right before the delete, an upload of the same content since the listing refreshed it
+        written_at = store.written_at(sha256)
+        if written_at is None or written_at >= cutoff:
+            continue
+        store.delete(sha256)
+        deleted += 1
+    return deleted
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _blob_store
+    if _blob_store is None:
+        if settings.BLOB_STORE_BACKEND == "s3":
+            _blob_store = S3BlobStore(
+                bucket=settings.S3_BUCKET,
+                prefix=settings.S3_PREFIX,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                region_name=settings.S3_REGION,
+                aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            )
+        else:
+            _blob_store = LocalBlobStore(settings.BLOB_STORE_PATH)
+        logger.info("Blob store: %s", type(_blob_store).__name__)
+    return _blob_store
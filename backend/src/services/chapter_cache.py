@@ -0,0 +1,160 @@
+"""
+Read-through cache of the chapter data on the chat hot path.
+Every chat message loaded the chapter with its course for the access check and then loaded it again for the full
+content (the React source of the chapter, often tens of KB). Chapters are kept here as (course, owner, is_public,
+content hash), the content itself in a second, smaller LRU keyed by the content hash.
+Entries are dropped by the chapter and course CRUD functions on every change, other workers see changes after the TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from ..config import settings
+
+
+@dataclass(frozen=True)
+class ChapterAccess:
+    chapter_id: int
+    course_id: int
+    owner_id: str
+    is_public: bool
+    content_hash: str
+
+    def can_access(self, user_id: str) -> bool:
+        return self.is_public or self.owner_id == user_id
+
+
+def _load_chapter_access(chapter_id: int) -> Optional[ChapterAccess]:
+    # Imported here, the CRUD modules import this module for the invalidation
+    from sqlalchemy import func
+    from ..db.database import get_db_context
+    from ..db.models.db_course import Chapter, Course
+
+    with get_db_context() as db:
+        # The hash is computed by the database, the content column is not transferred
+        row = db.query(Chapter.course_id, Course.user_id, Course.is_public, func.md5(Chapter.content)) \
+            .join(Course, Course.id == Chapter.course_id) \
+            .filter(Chapter.id == chapter_id).first()
+    if row is None:
+        return None
+    course_id, owner_id, is_public, content_hash = row
+    return ChapterAccess(chapter_id, course_id, owner_id, bool(is_public), content_hash or "")
+
+
+def _load_chapter_content(chapter_id: int) -> Optional[Tuple[str, str]]:
+    from sqlalchemy import func
+    from ..db.database import get_db_context
+    from ..db.models.db_course import Chapter
+
+    with get_db_context() as db:
+        row = db.query(Chapter.content, func.md5(Chapter.content)).filter(Chapter.id == chapter_id).first()
+    if row is None:
+        return None
+    return row[0] or "", row[1] or ""
+
+
+class ChapterCache:
+    def __init__(self, ttl: float = 60.0, max_entries: int = 4096, max_contents: int = 256,
+                 load_access: Callable[[int], Optional[ChapterAccess]] = _load_chapter_access,
+                 load_content: Callable[[int], Optional[Tuple[str, str]]] = _load_chapter_content,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param ttl: seconds an access entry stays valid, bounds the staleness across worker processes
+        :param max_entries: number of chapters whose access data is kept
+        :param max_contents: number of chapter contents kept
+        :param load_access: chapter id -> ChapterAccess or None, called on a miss
+        :param load_content: chapter id -> (content, content hash) or None, called on a content miss
+        :param clock: time source, replaceable in tests
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_contents = max_contents
+        self._load_access = load_access
+        self._load_content = load_content
+        self._clock = clock
+        self._entries: "OrderedDict[int, Tuple[float, ChapterAccess]]" = OrderedDict()
+        self._contents: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, a load that overlapped one is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_access(self, chapter_id: int) -> Optional[ChapterAccess]:
+        """Access data of the chapter, None if it does not exist"""
+        with self._lock:
+            entry = self._entries.get(chapter_id)
+            if entry is not None and entry[0] >= self._clock():
+                self._entries.move_to_end(chapter_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        access = self._load_access(chapter_id)
+        if access is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[chapter_id] = (self._clock() + self.ttl, access)
+                    self._entries.move_to_end(chapter_id)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return access
+
+    def get_content(self, access: ChapterAccess) -> Optional[str]:
+        """Content of the chapter in the version of access.content_hash (or newer), None if it was deleted"""
+        with self._lock:
+            content = self._contents.get(access.content_hash)
+            if content is not None:
+                self._contents.move_to_end(access.content_hash)
+                return content
+
+        loaded = self._load_content(access.chapter_id)
+        if loaded is None:
+            return None
+        content, content_hash = loaded
+        with self._lock:
+            self._contents[content_hash] = content
+            self._contents.move_to_end(content_hash)
+            while len(self._contents) > self.max_contents:
+                self._contents.popitem(last=False)
+        return content
+
+    def invalidate_chapter(self, chapter_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(chapter_id, None)
+
+    def invalidate_course(self, course_id: int) -> None:
+        """Drop all chapters of a course, its owner or visibility changed or it was deleted"""
+        with self._lock:
+            self._generation += 1
+            for chapter_id in [cid for cid, (_, access) in self._entries.items() if access.course_id == course_id]:
+                del self._entries[chapter_id]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "contents": len(self._contents),
+            }
+
+
+_chapter_cache: Optional[ChapterCache] = None
+
+
+def get_chapter_cache() -> ChapterCache:
+    global _chapter_cache
+    if _chapter_cache is None:
+        _chapter_cache = ChapterCache(
+            ttl=settings.CHAPTER_CACHE_TTL_SECONDS,
+            max_entries=settings.CHAPTER_CACHE_SIZE,
+            max_contents=settings.CHAPTER_CONTENT_CACHE_SIZE,
+        )
+    return _chapter_cache
@@ -17,13 +17,17 @@ from sqlalchemy import create_engine
 
 from ..config import settings
 from ..agents.chat_agent.agent import ChatAgent
+from ..agents.chat_agent.chapter_sections import (
+    OUTLINE_STATE_KEY, SECTIONS_STATE_KEY, ChapterSectionIndex, format_sections, outline
+)
 from ..agents.utils import create_text_query
 from ..api.schemas.chat import ChatRequest
 from ..config.settings import SQLALCHEMY_DATABASE_URL
+from ..core.executors import run_in_chat_pool
 from ..db.database import get_db_context
 
-from ..db.crud import chapters_crud
 from ..db.crud import usage_crud
+from .chapter_cache import ChapterAccess, get_chapter_cache
 
 
 logger = logging.getLogger(__name__)
@@ -46,13 +50,55 @@ class ChatService:
             max_overflow=settings.DB_MAX_OVERFLOW
         )
         self.chat_agent = ChatAgent("Nexora", self.session_service)
+        self.section_index = ChapterSectionIndex(
+            encode=self._encode,
+            section_chars=settings.CHAT_SECTION_CHARS,
+            full_chapter_chars=settings.CHAT_FULL_CHAPTER_CHARS,
+        )
+        # Keep references to the running usage writes, otherwise the tasks could be garbage collected
+        self._usage_tasks = set()
+
+    @staticmethod
+    def _encode(texts):
+        # Imported on first use, the embedding model is only loaded once a long chapter is chatted about
+        from .vector_service import get_vector_service
+        return get_vector_service().encode(texts)
+
+    def _relevant_sections(self, access: ChapterAccess, message: str):
+        """(indexed chapter, its sections relevant to message), (None, None) if the chapter is gone"""
+        chapter = self.section_index.get(access.content_hash, lambda: get_chapter_cache().get_content(access))
+        if chapter is None:
+            return None, None
+        return chapter, self.section_index.search(chapter, message, top_k=settings.CHAT_SECTIONS_TOP_K)
+
+    @staticmethod
+    def _log_usage(user_id: str, message: str, course_id: int, chapter_id: int):
+        try:
+            with get_db_context() as db:
+                usage_crud.log_chat_usage(
+                    db=db,
+                    user_id=user_id,
+                    message=message,
+                    course_id=course_id,
+                    chapter_id=chapter_id
+                )
+            logger.info("Logged chat usage", extra={"user_id": user_id, "chapter_id": chapter_id})
+        except Exception as e:
+            logger.warning("Failed to log chat usage of user %s for chapter %s: %s", user_id, chapter_id, e)
+
+    def _log_usage_in_background(self, user_id: str, message: str, course_id: int, chapter_id: int):
+        """Write the usage row in a thread, off the path to the first token"""
+        task = asyncio.create_task(asyncio.to_thread(self._log_usage, user_id, message, course_id, chapter_id))
+        self._usage_tasks.add(task)
+        task.add_done_callback(self._usage_tasks.discard)
 
    
     async def process_chat_message(
         self, 
         user_id: str, 
         chapter_id: int, 
-        request: ChatRequest
+        request: ChatRequest,
+        access: Optional[ChapterAccess] = None
     ) -> AsyncGenerator[str, None]:
         """Process a chat message and stream the response.
         
@@ -60,7 +106,7 @@ class ChatService:
             user_id: The ID of the user sending the message
             chapter_id: The ID of the chapter the chat is related to
             request: The chat request containing the message
-            db: Database session
+            access: Cached access data of the chapter, loaded if None
             
         Yields:
             str: Server-Sent Events formatted response chunks
@@ -80,40 +126,30 @@ class ChatService:
                 }
             )
 
-            # Get chapter content for the agent state
-            chapter_content = None
-            with get_db_context() as db:
-                chapter = chapters_crud.get_chapter_by_id(db, chapter_id)
-                if not chapter:
-                    raise HTTPException(status_code=404, detail="Chapter not found")
-                
-                chapter_content = chapter.content
-            
-                # Log the chat usage
-                usage_crud.log_chat_usage(
-                    db=db,
-                    user_id=user_id,
-                    message=request.message,
-                    course_id=chapter.course_id,
-                    chapter_id=chapter_id
-                )
-                logger.info(
-                    "Logged chat usage",
-                    extra={
-                        "user_id": user_id,
-                        "chapter_id": chapter_id,
-                        "message_length": len(request.message)
-                    }
-                )
+            # Chapter data from the cache, the router passes the access data it already checked
+            cache = get_chapter_cache()
+            if access is None:
+                access = cache.get_access(chapter_id)
+            # Only the sections relevant to the message go into the prompt, the content is loaded and
+            # embedded once per chapter version
+            chapter = sections = None
+            if access:
+                chapter, sections = await run_in_chat_pool(self._relevant_sections, access, request.message)
+            if chapter is None:
+                raise HTTPException(status_code=404, detail="Chapter not found")
+
+            # The usage row is written in the background, the answer does not wait for its commit
+            self._log_usage_in_background(user_id, request.message, access.course_id, chapter_id)
             
             # Process the message through the chat agent and stream responses
             try:
                 async for text_chunk, is_final in self.chat_agent.run(
                     user_id=user_id,
-                    state={"chapter_content": chapter_content},
+                    state={OUTLINE_STATE_KEY: outline(chapter.sections)},
                     chapter_id=chapter_id,
                     content=create_text_query(request.message),
-                    debug=logger.isEnabledFor(logging.DEBUG)
+                    debug=logger.isEnabledFor(logging.DEBUG),
+                    state_delta={SECTIONS_STATE_KEY: format_sections(sections)}
                 ):
                     # Skip empty chunks
                     if not text_chunk:
@@ -1,9 +1,15 @@
 # backend/src/services/course_content_service.py
-from typing import List
+import asyncio
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
-from .data_processors.pdf_processor import PDFProcessor
-from .vector_service import VectorService
+from sqlalchemy.exc import IntegrityError
+from .data_processors.pdf_processor import PDFProcessor, parse_pdf_document
+from .vector_service import get_vector_service
+from .blob_store import read_file_data
 from ..db.models.db_file import Document
+from ..db.crud import documents_crud
+from ..db.database import get_db_context
+from ..core.executors import run_in_parse_pool, run_in_embedding_pool
 import logging
 
 
@@ -11,24 +17,38 @@ import logging
 class CourseContentService:
     def __init__(self):
         self.pdf_processor = PDFProcessor()
-        self.vector_service = VectorService()
+        self.vector_service = get_vector_service()
         self.logger = logging.getLogger(__name__)
 
     def get_rag_infos(self, course_id: int, topic: dict[str, str]):
         """
         Get the important rag infos for a given chapter topic.
+        The caption and all content bullets are retrieved with a single batched query. The results are
+        deduplicated and ranked by their best distance to any of the queries.
         """
-        ragInfos = set()
-        queryRes = self.vector_service.search_by_course_id(course_id, topic['caption'], n_results=2)
-        for doc in queryRes['documents']:
-            for str_inf in doc:
-                ragInfos.add(str_inf)
-        for content in topic['content']:
-            queryRes = self.vector_service.search_by_course_id(course_id, content, n_results=3)
-            for doc in queryRes['documents']:
-                for str_inf in doc:
-                    ragInfos.add(str_inf)
-        return list(set(ragInfos))
+        queries = [topic['caption']] + list(topic['content'])
+        # The caption only contributes its 2 best hits, content bullets their 3 best hits
+        limits = [2] + [3] * len(topic['content'])
+
+        queryRes = self.vector_service.search_many_by_course_id(course_id, queries, n_results=max(limits))
+
+        best_distance = {}
+        documents = queryRes.get('documents') or []
+        distances = queryRes.get('distances') or [[] for _ in documents]
+        for limit, docs, dists in zip(limits, documents, distances):
+            for rank, str_inf in enumerate(docs[:limit]):
+                distance = dists[rank] if rank < len(dists) else float(rank)
+                if str_inf not in best_distance or distance < best_distance[str_inf]:
+                    best_distance[str_inf] = distance
+
+        return sorted(best_distance, key=best_distance.get)
+
+    async def get_rag_infos_async(self, course_id: int, topic: dict[str, str]):
+        """
+        Same as get_rag_infos, but runs the encoding and the chroma round trip in the embedding pool
+        so the event loop is not blocked.
+        """
+        return await run_in_embedding_pool(self.get_rag_infos, course_id, topic)
     
     def process_course_documents(self, course_id: int, documents: List[Document]):
         """
@@ -52,38 +72,108 @@ class CourseContentService:
             self.logger.error(f"Failed to process documents for course {course_id}: {e}")
             raise
     
+    async def get_parsed_documents(self, documents: List[Document]) -> Dict[int, Dict]:
+        """
+        Return the parsed text of every PDF in documents, keyed by document id.
+        Each PDF is parsed at most once: the result is stored in the document_texts table and
+        reused on later calls. Parsing runs in the parse process pool.
+        """
+        pdf_ids = [int(doc.id) for doc in documents if doc and doc.content_type == "application/pdf"]
+        if not pdf_ids:
+            return {}
+
+        with get_db_context() as db:
+            parsed = {
+                int(text.document_id): text.to_dict()
+                for text in documents_crud.get_document_texts_by_document_ids(db, pdf_ids)
+            }
+
+        for document in documents:
+            if not document or document.content_type != "application/pdf" or int(document.id) in parsed:
+                continue
+            try:
+                file_data = await asyncio.to_thread(read_file_data, document)
+                parsed[int(document.id)] = await run_in_parse_pool(parse_pdf_document, file_data)
+            except Exception as e:
+                self.logger.error(f"Failed to parse PDF {document.filename}: {e}")
+                continue
+
+            try:
+                with get_db_context() as db:
+                    documents_crud.create_document_text(db, int(document.id), parsed[int(document.id)])
+            except IntegrityError:
+                # Another task stored the same document in the meantime
+                pass
+
+        self.logger.info(f"Parsed {len(parsed)} of {len(pdf_ids)} PDF documents")
+        return parsed
+
+    async def process_course_documents_async(self, course_id: int, documents: List[Document],
+                                             parsed_documents: Optional[Dict[int, Dict]] = None):
+        """
+        Same as process_course_documents, but uses the shared parsed text (see get_parsed_documents)
+        and embeds the paragraphs in the embedding pool, so the event loop stays responsive.
+        """
+        if parsed_documents is None:
+            parsed_documents = await self.get_parsed_documents(documents)
+
+        try:
+            for document in documents:
+                if not document:
+                    self.logger.warning("Skipping missing document")
+                    continue
+
+                if document.content_type == "application/pdf":
+                    content_data = parsed_documents.get(int(document.id))
+                    if content_data is None:
+                        self.logger.warning(f"No parsed text for {document.filename}, skipping")
+                        continue
+                    try:
+                        await run_in_embedding_pool(self._add_paragraphs, course_id, document, content_data)
+                    except Exception as e:
+                        self.logger.error(f"Failed to process PDF {document.filename}: {e}")
+                        raise
+                else:
+                    self.logger.info(f"Skipping non-PDF document: {document.filename}")
+
+            self.logger.info(f"Processed {len(documents)} documents for course {course_id}")
+
+        except Exception as e:
+            self.logger.error(f"Failed to process documents for course {course_id}: {e}")
+            raise
+
     def _process_pdf_document(self, course_id: int, document: Document):
         """
         Extract paragraphs from PDF and add to vector database.
         """
         try:
             # Extract structured content
-            content_data = self.pdf_processor.extract_structured_content(document.file_data)
-            
-            # Add each paragraph to vector database
-            for para_data in content_data["paragraphs"]:
-                content_id = f"doc_{document.id}_page_{para_data['page_number']}_para_{para_data['paragraph_index']}"
-                
-                metadata = {
-                    "type": "pdf_paragraph",
-                    "course_id": course_id,
-                    "document_id": document.id,
-                    "filename": document.filename,
-                    "page_number": para_data["page_number"],
-                    "paragraph_index": para_data["paragraph_index"],
-                    "word_count": para_data["word_count"]
-                }
-                
-                # Add to vector database
-                self.vector_service.add_content_by_course_id(
-                    course_id=course_id,
-                    content_id=content_id,
-                    text=para_data["text"],
-                    metadata=metadata
-                )
-            
-            self.logger.info(f"Added {len(content_data['paragraphs'])} paragraphs from {document.filename}")
+            content_data = self.pdf_processor.extract_structured_content(read_file_data(document))
+            self._add_paragraphs(course_id, document, content_data)
             
         except Exception as e:
             self.logger.error(f"Failed to process PDF {document.filename}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _add_paragraphs(self, course_id: int, document: Document, content_data: Dict):
+        """
+        Add the extracted paragraphs of a document to the vector database in batches.
+        """
+        items = []
+        for para_data in content_data["paragraphs"]:
+            content_id = f"doc_{document.id}_page_{para_data['page_number']}_para_{para_data['paragraph_index']}"
+
+            metadata = {
+                "type": "pdf_paragraph",
+                "course_id": course_id,
+                "document_id": document.id,
+                "filename": document.filename,
+                "page_number": para_data["page_number"],
+                "paragraph_index": para_data["paragraph_index"],
+                "word_count": para_data["word_count"]
+            }
+            items.append({"id": content_id, "text": para_data["text"], "metadata": metadata})
+
+        self.vector_service.add_contents_by_course_id(course_id=course_id, items=items)
+
+        self.logger.info(f"Added {len(content_data['paragraphs'])} paragraphs from {document.filename}")
@@ -12,6 +12,8 @@ from typing import Optional
 from ..db.models.db_course import Chapter
 
 from ..db.crud import usage_crud, chapters_crud
+from ..db.crud.aio import chapters_crud as aio_chapters_crud, courses_crud as aio_courses_crud
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 
@@ -85,3 +87,34 @@ def get_chapter_by_id(course_id: int, chapter_id: int, db: Session) -> Chapter:
 
     return chapter
 
+
+
+############### ASYNC (routers on get_async_db)
+async def verify_course_ownership_async(course_id: int, user_id: str, db: AsyncSession) -> Course:
+    """Same as verify_course_ownership with an AsyncSession"""
+    course = await aio_courses_crud.get_courses_by_course_id_user_id(db, course_id, user_id)
+
+    if not course:
+        course = await aio_courses_crud.get_course_by_id(db, course_id)
+        if course and course.is_public:
+            return course
+
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found or access denied"
+        )
+
+    return course
+
+
+async def get_chapter_by_id_async(course_id: int, chapter_id: int, db: AsyncSession) -> Chapter:
+    """Same as get_chapter_by_id with an AsyncSession"""
+    chapter = await aio_chapters_crud.get_chapter_by_course_id_and_chapter_id(db, course_id, chapter_id)
+
+    if not chapter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chapter not found in this course"
+        )
+
+    return chapter
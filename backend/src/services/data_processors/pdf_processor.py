@@ -1,6 +1,7 @@
 # backend/src/services/pdf_processor.py
 import fitz  # PyMuPDF
 import re
+from pathlib import Path
 from typing import List, Dict
 import logging
 
@@ -93,4 +94,76 @@ class PDFProcessor:
             
         except Exception as e:
             self.logger.error(f"PDF structured extraction failed: {e}")
-            return {"paragraphs": [], "metadata": {}}
\ No newline at end of file
+            return {"paragraphs": [], "metadata": {}}
+
+
+def parse_pdf_document(source) -> Dict:
+    """
+    Parse a PDF once into the artifact that is shared across the pipeline (RAG ingestion, info query
+    and flashcards). This is a module level function so it can be sent to the parse process pool.
+
+    :param source: the raw PDF bytes or a path to a PDF file
+    :return: dict with page_count, metadata, toc, pages (text per page) and paragraphs
+    """
+    doc = fitz.open(stream=source, filetype="pdf") if isinstance(source, (bytes, bytearray)) else fitz.open(source)
+    try:
+        processor = PDFProcessor()
+        pages = []
+        paragraphs = []
+        for page_num in range(len(doc)):
+            page_text = doc[page_num].get_text()
+            pages.append(page_text)
+
+            for para_index, paragraph in enumerate(processor._split_into_paragraphs(page_text)):
+                paragraphs.append({
+                    "text": paragraph,
+                    "page_number": page_num + 1,
+                    "paragraph_index": para_index,
+                    "word_count": len(paragraph.split())
+                })
+
+        return {
+            "page_count": len(doc),
+            "metadata": {
+                "title": doc.metadata.get("title") or "Unknown",
+                "author": doc.metadata.get("author") or "Unknown",
+            },
+            "toc": [list(entry[:3]) for entry in doc.get_toc()],
+            "pages": pages,
+            "paragraphs": paragraphs,
+        }
+    finally:
+        doc.close()
+
+
+def render_pdf_pages(pdf_path: str, page_indices: List[int], output_dir: str, dpi: int = 150,
+                     image_format: str = "png") -> Dict[int, str]:
+    """
+    Render pages of a PDF to image files. Each page is written to disk as soon as it is rendered and its pixmap
+    released, so only one page is held in memory. Pages that were already rendered are not rendered again.
+    Module level so it can be sent to the parse process pool.
+
+    :param page_indices: 0-indexed page numbers, pages outside the document are skipped
+    :param image_format: "png" or "jpeg"
+    :return: dict of page index -> image path
+    """
+    extension = "jpg" if image_format == "jpeg" else "png"
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    doc = fitz.open(pdf_path)
+    try:
+        rendered = {}
+        for page_index in page_indices:
+            if not 0 <= page_index < len(doc):
+                continue
+            image_path = Path(output_dir) / f"page_{page_index + 1:04d}.{extension}"
+            if not image_path.exists():
+                pixmap = doc[page_index].get_pixmap(dpi=dpi)
+                # Write to a temporary name first, a concurrent reader never sees a half written image
+                tmp_path = image_path.with_name(f".{image_path.name}.tmp")
+                pixmap.save(str(tmp_path), output=image_format)
+                pixmap = None
+                tmp_path.replace(image_path)
+            rendered[page_index] = str(image_path)
+        return rendered
+    finally:
+        doc.close()
@@ -0,0 +1,142 @@
+"""
+Persistent cache for sentence embeddings.
+Users upload the same lecture PDFs for many courses, so the same paragraphs get encoded over and over again.
+Embeddings are keyed by (model name, sha256 of the normalized text), kept in an in-memory LRU and backed by
+a small SQLite database so that they survive restarts.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, db_path: Optional[str] = None, max_memory_entries: int = 50000):
+        """
+        :param model_name: name of the embedding model, part of every cache key
+        :param db_path: path to the SQLite backing store. If None, the cache is memory only
+        :param max_memory_entries: number of embeddings kept in the in-memory LRU
+        """
+        self.model_name = model_name
+        self.max_memory_entries = max_memory_entries
+        self.logger = logging.getLogger(__name__)
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if db_path:
+            try:
+                directory = os.path.dirname(db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "model TEXT NOT NULL, text_hash TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL, "
+                    "PRIMARY KEY (model, text_hash))"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self.logger.warning("Embedding cache disk store unavailable (%s), using memory only: %s", db_path, e)
+                self._conn = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so that re-extracted paragraphs map to the same key"""
+        return " ".join(text.split())
+
+    def make_key(self, text: str) -> str:
+        return hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        Look up embeddings for the given texts.
+        Returns a dict from the position in texts to the cached embedding, misses are left out.
+        """
+        found: Dict[int, np.ndarray] = {}
+        disk_lookups: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for idx, text in enumerate(texts):
+                key = self.make_key(text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[idx] = vector
+                else:
+                    disk_lookups.setdefault(key, []).append(idx)
+
+            if disk_lookups and self._conn is not None:
+                for key, vector in self._load_from_disk(list(disk_lookups.keys())).items():
+                    self._remember(key, vector)
+                    for idx in disk_lookups[key]:
+                        found[idx] = vector
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, texts: List[str], vectors) -> None:
+        """Store the embeddings for the given texts in memory and on disk"""
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((self.model_name, key, int(vector.shape[0]), vector.tobytes()))
+
+            if rows and self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)", rows
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    self.logger.warning("Failed to persist %d embeddings: %s", len(rows), e)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters, the hit rate is the fraction of encodes that were saved"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the LRU, caller must hold the lock"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch the given keys from SQLite, caller must hold the lock"""
+        result: Dict[str, np.ndarray] = {}
+        # Stay below SQLite's limit for host parameters
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset:offset + 500]
+            placeholders = ",".join("?" * len(chunk))
+            try:
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *chunk]
+                ).fetchall()
+            except sqlite3.Error as e:
+                self.logger.warning("Embedding cache lookup failed: %s", e)
+                return result
+            for text_hash, blob in rows:
+                result[text_hash] = np.frombuffer(blob, dtype=np.float32)
+        return result
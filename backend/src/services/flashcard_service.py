@@ -1,8 +1,12 @@
 import asyncio
+import glob
+import logging
+import socket
 import uuid
 import os
 import tempfile
-from typing import Dict, Any, Optional, Callable, List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Callable, List, Tuple
 from pathlib import Path
 import shutil
 
@@ -10,122 +14,200 @@ from ..agents.flashcard_agent.agent import FlashcardAgent
 from ..agents.flashcard_agent.schema import (
     FlashcardConfig, TaskStatus, TaskProgress, FlashcardPreview
 )
+from ..config import settings
+from ..db.crud import flashcard_tasks_crud
+from ..db.database import get_db_context
+from ..db.models.db_flashcard_task import FlashcardTask
+
+logger = logging.getLogger(__name__)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
 
 
 class TaskManager:
-    """Manages flashcard generation tasks and their status."""
+    """
+    Manages flashcard generation tasks and their status.
+    Tasks are stored in the database, so every worker can report them. The worker running a task holds its lease
+    and renews it, a task whose lease expired is taken over by another worker (see FlashcardService).
+    """
 
     def __init__(self):
-        self.tasks: Dict[str, TaskProgress] = {}
-        self.running_tasks: Dict[str, asyncio.Task] = {}
-        self.task_configs: Dict[str, tuple] = {}  # Store (document_id, config) for retries
+        self.running_tasks: Dict[str, asyncio.Task] = {}  # Tasks running in this process
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = settings.FLASHCARD_TASK_LEASE_SECONDS
 
-    def create_task(self, document_id: str, config: FlashcardConfig) -> str:
+    def create_task(self, document_id: str, config: FlashcardConfig, user_id: Optional[str] = None) -> str:
         """Create a new flashcard generation task."""
         task_id = str(uuid.uuid4())
+        with get_db_context() as db:
+            # Store config for retry functionality
+            flashcard_tasks_crud.create_task(db, task_id, document_id, config.model_dump(mode="json"), user_id)
+        return task_id
 
-        self.tasks[task_id] = TaskProgress(
-            task_id=task_id,
-            status=TaskStatus.PENDING,
-            progress_percentage=0,
-            current_step="Initializing",
-            completed_steps=[]
+    @staticmethod
+    def _to_progress(task: FlashcardTask) -> TaskProgress:
+        return TaskProgress(
+            task_id=task.id,
+            status=TaskStatus(task.status),
+            progress_percentage=task.progress_percentage,
+            current_step=task.current_step or "",
+            completed_steps=task.completed_steps or [],
+            error_message=task.error_message,
+            download_url=task.download_url,
+            step_details=task.step_details,
+            activity_log=task.activity_log,
+            stats=task.stats,
+            estimated_time_remaining=task.estimated_time_remaining,
+            started_at=_isoformat(task.started_at),
+            completed_at=_isoformat(task.completed_at)
         )
 
-        # Store config for retry functionality
-        self.task_configs[task_id] = (document_id, config)
-
-        return task_id
-
     def get_task_status(self, task_id: str) -> Optional[TaskProgress]:
         """Get the current status of a task."""
-        return self.tasks.get(task_id)
+        with get_db_context() as db:
+            task = flashcard_tasks_crud.get_task(db, task_id)
+            return self._to_progress(task) if task else None
+
+    def get_task_config(self, task_id: str) -> Optional[tuple]:
+        """Get (document_id, config) of a task."""
+        with get_db_context() as db:
+            task = flashcard_tasks_crud.get_task(db, task_id)
+            return (task.document_id, FlashcardConfig(**task.config)) if task else None
+
+    def get_user_tasks(self, user_id: str, limit: Optional[int] = None) -> List[TaskProgress]:
+        """Tasks of a user, newest first."""
+        with get_db_context() as db:
+            return [self._to_progress(task) for task in flashcard_tasks_crud.get_tasks_by_user(db, user_id, limit)]
+
+    def claim_task(self, task_id: str) -> bool:
+        """Take the lease of a task, only the worker holding it may run the task."""
+        with get_db_context() as db:
+            return flashcard_tasks_crud.claim_task(db, task_id, self.worker_id, self.lease_seconds)
+
+    def renew_lease(self, task_id: str) -> bool:
+        """Extend the lease, False if the task was cancelled or taken over by another worker."""
+        with get_db_context() as db:
+            return flashcard_tasks_crud.renew_lease(db, task_id, self.worker_id, self.lease_seconds)
+
+    def release_task(self, task_id: str):
+        """Give up the lease, another worker takes the task over at its next reclaim."""
+        with get_db_context() as db:
+            flashcard_tasks_crud.release_task(db, task_id, self.worker_id)
 
     def update_task_progress(self, task_id: str, status: TaskStatus, progress: int, step: str = "", error: str = None,
                              details: Dict[str, Any] = None):
         """Update task progress with enhanced tracking."""
-        if task_id in self.tasks:
-            task = self.tasks[task_id]
-            task.status = status
-            task.progress_percentage = progress
-            task.current_step = step
+        with get_db_context() as db:
+            task = flashcard_tasks_crud.get_task(db, task_id)
+            # Ignore late updates of a cancelled task or of a task another worker took over
+            if not task or task.cancel_requested or task.worker_id not in (None, self.worker_id):
+                return
+
+            # JSON columns are replaced, not mutated in place, so that the changes are written
+            completed_steps = list(task.completed_steps or [])
+            step_details = dict(task.step_details or {})
+            activity_log = list(task.activity_log or [])
+            stats = dict(task.stats or {})
+            fields: Dict[str, Any] = {
+                "status": status.value,
+                "progress_percentage": progress,
+                "current_step": step,
+            }
 
             if error:
-                task.error_message = error
+                fields["error_message"] = error
 
             # Update step details if provided
             if details:
-                if not task.step_details:
-                    task.step_details = {}
-                task.step_details.update(details)
+                step_details.update(details)
 
                 # Add activity to log
                 if "activity" in details:
-                    if not task.activity_log:
-                        task.activity_log = []
-
-                    import datetime
-                    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                    task.activity_log.append({
+                    timestamp = datetime.now().strftime("%H:%M:%S")
+                    activity_log.append({
                         "timestamp": timestamp,
                         "message": details["activity"]
                     })
 
-                    # Keep only last 20 activities to avoid memory bloat
-                    if len(task.activity_log) > 20:
-                        task.activity_log = task.activity_log[-20:]
+                    # Keep only last 20 activities to avoid bloating the row
+                    activity_log = activity_log[-20:]
 
                 # Update estimated time remaining
                 if "estimated_time_remaining" in details:
-                    task.estimated_time_remaining = details["estimated_time_remaining"]
-
-                # Update stats
-                if not task.stats:
-                    task.stats = {}
+                    fields["estimated_time_remaining"] = details["estimated_time_remaining"]
 
                 # Update processing stats
                 for key in ["chunks_total", "chunks_completed", "questions_generated", "estimated_questions",
-                            "processing_speed"]:
+                            "processing_speed", "chunk_latency", "concurrency"]:
                     if key in details:
-                        task.stats[key] = details[key]
+                        stats[key] = details[key]
 
             # Add completed steps
-            if status == TaskStatus.ANALYZING and "analyzing" not in task.completed_steps:
-                task.completed_steps.append("analyzing")
-            elif status == TaskStatus.EXTRACTING and "extracting" not in task.completed_steps:
-                task.completed_steps.append("extracting")
-            elif status == TaskStatus.GENERATING and "generating" not in task.completed_steps:
-                task.completed_steps.append("generating")
-            elif status == TaskStatus.PACKAGING and "packaging" not in task.completed_steps:
-                task.completed_steps.append("packaging")
+            if status in (TaskStatus.ANALYZING, TaskStatus.EXTRACTING, TaskStatus.GENERATING, TaskStatus.PACKAGING) \
+                    and status.value not in completed_steps:
+                completed_steps.append(status.value)
+
+            if status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+                fields["completed_at"] = datetime.now(timezone.utc)
+
+            flashcard_tasks_crud.update_task(
+                db, task_id, completed_steps=completed_steps, step_details=step_details or None,
+                activity_log=activity_log or None, stats=stats or None, **fields
+            )
+
+    def reset_task(self, task_id: str, step: str, **kwargs):
+        """Reset the progress of a task that is started again."""
+        with get_db_context() as db:
+            flashcard_tasks_crud.update_task(
+                db, task_id, status=TaskStatus.PENDING.value, progress_percentage=0, current_step=step,
+                completed_steps=[], error_message=None, download_url=None, step_details=None, activity_log=None,
+                stats=None, estimated_time_remaining=None, completed_at=None, cancel_requested=False, **kwargs
+            )
 
     def cancel_task(self, task_id: str) -> bool:
-        """Cancel a running task."""
+        """Cancel a running task, the worker running it stops at its next lease renewal."""
+        with get_db_context() as db:
+            task = flashcard_tasks_crud.get_task(db, task_id)
+            if not task or task.status not in flashcard_tasks_crud.ACTIVE_STATUSES:
+                return False
+            flashcard_tasks_crud.update_task(
+                db, task_id, status=TaskStatus.CANCELLED.value, cancel_requested=True,
+                completed_at=datetime.now(timezone.utc)
+            )
+
         if task_id in self.running_tasks:
             self.running_tasks[task_id].cancel()
             del self.running_tasks[task_id]
+        return True
 
-            if task_id in self.tasks:
-                self.tasks[task_id].status = TaskStatus.CANCELLED
-
-            return True
-        return False
+    def fail_task(self, task_id: str, error: str):
+        """Mark a task as failed without a lease, e.g. after too many attempts."""
+        with get_db_context() as db:
+            flashcard_tasks_crud.update_task(
+                db, task_id, status=TaskStatus.FAILED.value, current_step="Generation failed", error_message=error,
+                worker_id=None, lease_expires_at=None, completed_at=datetime.now(timezone.utc)
+            )
 
     def set_task_download_url(self, task_id: str, download_url: str):
         """Set the download URL for a completed task."""
-        if task_id in self.tasks:
-            self.tasks[task_id].download_url = download_url
+        with get_db_context() as db:
+            flashcard_tasks_crud.update_task(db, task_id, download_url=download_url)
+
+    def delete_task(self, task_id: str) -> bool:
+        with get_db_context() as db:
+            return flashcard_tasks_crud.delete_task(db, task_id)
 
 
 class DocumentManager:
-    """Manages uploaded PDF documents."""
+    """Manages uploaded PDF documents. Metadata is stored in the database, the files in the upload directory."""
 
     def __init__(self):
         self.upload_dir = Path("/tmp/flashcard_uploads") if os.path.exists("/tmp") else Path("./flashcard_uploads")
         self.upload_dir.mkdir(exist_ok=True)
-        self.documents: Dict[str, Dict[str, Any]] = {}
 
-    def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
+    def save_uploaded_file(self, file_content: bytes, filename: str, user_id: Optional[str] = None) -> str:
         """Save uploaded file and return document ID."""
         document_id = str(uuid.uuid4())
 
@@ -135,22 +217,47 @@ class DocumentManager:
             f.write(file_content)
 
         # Store metadata
-        self.documents[document_id] = {
-            "filename": filename,
-            "file_path": str(file_path),
-            "size": len(file_content)
-        }
+        with get_db_context() as db:
+            flashcard_tasks_crud.create_document(
+                db, document_id, filename, str(file_path), len(file_content), user_id
+            )
 
         return document_id
 
     def get_document_path(self, document_id: str) -> Optional[str]:
         """Get the file path for a document."""
-        doc = self.documents.get(document_id)
+        doc = self.get_document_info(document_id)
         return doc["file_path"] if doc else None
 
     def get_document_info(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get document metadata."""
-        return self.documents.get(document_id)
+        with get_db_context() as db:
+            doc = flashcard_tasks_crud.get_document(db, document_id)
+            if not doc:
+                return None
+            return {
+                "filename": doc.filename,
+                "file_path": doc.file_path,
+                "size": doc.size
+            }
+
+    def delete_stale_documents(self, created_before: datetime) -> int:
+        """Delete old documents no unfinished task uses anymore, returns their number."""
+        with get_db_context() as db:
+            documents = flashcard_tasks_crud.get_stale_documents(db, created_before)
+            for doc in documents:
+                upload = Path(doc.file_path)
+                # The upload and what was derived from it (parsed sidecar, rendered page images)
+                for path in [upload, *upload.parent.glob(f"{glob.escape(upload.name)}.*")]:
+                    try:
+                        if path.is_dir():
+                            shutil.rmtree(path)
+                        else:
+                            path.unlink(missing_ok=True)
+                    except OSError as e:
+                        logger.warning("Failed to delete upload %s: %s", path, e)
+                flashcard_tasks_crud.delete_document(db, doc.id)
+            return len(documents)
 
 
 class FlashcardService:
@@ -165,9 +272,9 @@ class FlashcardService:
         self.output_dir = Path("/tmp/anki_output") if os.path.exists("/tmp") else Path("./anki_output")
         self.output_dir.mkdir(exist_ok=True)
 
-    def upload_document(self, file_content: bytes, filename: str) -> Dict[str, Any]:
+    def upload_document(self, file_content: bytes, filename: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Upload and save a PDF document."""
-        document_id = self.document_manager.save_uploaded_file(file_content, filename)
+        document_id = self.document_manager.save_uploaded_file(file_content, filename, user_id)
         doc_info = self.document_manager.get_document_info(document_id)
 
         return {
@@ -189,33 +296,63 @@ class FlashcardService:
             print(f"Error analyzing document {document_id}: {e}")
             return None
 
-    def start_generation_task(self, document_id: str, config: FlashcardConfig) -> str:
+    def start_generation_task(self, document_id: str, config: FlashcardConfig, user_id: Optional[str] = None) -> str:
         """Start a flashcard generation task."""
-        task_id = self.task_manager.create_task(document_id, config)
+        task_id = self.task_manager.create_task(document_id, config, user_id)
+        self._start_claimed_task(task_id, document_id, config)
+        return task_id
 
-        # Start the async task
+    def _start_claimed_task(self, task_id: str, document_id: str, config: FlashcardConfig) -> bool:
+        """Claim the task and run it in this worker, False if another worker holds it."""
+        if not self.task_manager.claim_task(task_id):
+            return False
+        self._run_task(task_id, document_id, config)
+        return True
+
+    def _run_task(self, task_id: str, document_id: str, config: FlashcardConfig):
+        """Start a task this worker holds the lease of."""
         async_task = asyncio.create_task(
             self._run_generation_task(task_id, document_id, config)
         )
         self.task_manager.running_tasks[task_id] = async_task
 
-        return task_id
-
     async def _run_generation_task(self, task_id: str, document_id: str, config: FlashcardConfig):
+        """Run the generation and keep the lease of the task alive while it runs."""
+        generation = asyncio.create_task(self._generate(task_id, document_id, config))
+        heartbeat = self.task_manager.lease_seconds / 3
+        try:
+            while not generation.done():
+                await asyncio.wait({generation}, timeout=heartbeat)
+                if not generation.done() and not await asyncio.to_thread(self.task_manager.renew_lease, task_id):
+                    # Cancelled (possibly through another worker) or taken over after a stall
+                    logger.info("Stopping flashcard task %s, it was cancelled or its lease was lost", task_id)
+                    generation.cancel()
+                    break
+        finally:
+            if not generation.done():
+                generation.cancel()
+            # Clean up running task
+            self.task_manager.running_tasks.pop(task_id, None)
+
+    async def _generate(self, task_id: str, document_id: str, config: FlashcardConfig):
         """Run the actual flashcard generation task."""
-        pdf_path = self.document_manager.get_document_path(document_id)
+        pdf_path = await asyncio.to_thread(self.document_manager.get_document_path, document_id)
         if not pdf_path or not os.path.exists(pdf_path):
-            self.task_manager.update_task_progress(
-                task_id, TaskStatus.FAILED, 0, "File not found", "Document not found"
+            await asyncio.to_thread(
+                self.task_manager.update_task_progress, task_id, TaskStatus.FAILED, 0, "File not found",
+                "Document not found"
             )
             return
 
+        # Progress updates are written in order by one writer in a thread, the callback only queues them
+        updates: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(self._write_progress(updates))
         try:
             # Create progress callback
             def progress_callback(status: TaskStatus, progress: int, details: Dict[str, Any] = None):
                 step_name = status.value.title()
                 error = details.get('error') if details else None
-                self.task_manager.update_task_progress(task_id, status, progress, step_name, error, details)
+                updates.put_nowait((task_id, status, progress, step_name, error, details))
 
             # Generate flashcards
             apkg_path = await self.flashcard_agent.generate_flashcards(
@@ -228,16 +365,21 @@ class FlashcardService:
             shutil.move(apkg_path, final_path)
 
             download_url = f"/output/{final_filename}"
-            self.task_manager.set_task_download_url(task_id, download_url)
+            await asyncio.to_thread(self.task_manager.set_task_download_url, task_id, download_url)
 
         except Exception as e:
-            self.task_manager.update_task_progress(
-                task_id, TaskStatus.FAILED, 0, "Generation failed", str(e)
-            )
+            updates.put_nowait((task_id, TaskStatus.FAILED, 0, "Generation failed", str(e), None))
         finally:
-            # Clean up running task
-            if task_id in self.task_manager.running_tasks:
-                del self.task_manager.running_tasks[task_id]
+            updates.put_nowait(None)
+            await writer
+
+    async def _write_progress(self, updates: asyncio.Queue):
+        """Write the queued progress updates of a task until None is queued."""
+        while (update := await updates.get()) is not None:
+            try:
+                await asyncio.to_thread(self.task_manager.update_task_progress, *update)
+            except Exception as e:
+                logger.warning("Failed to write the progress of flashcard task %s: %s", update[0], e)
 
     def get_task_status(self, task_id: str) -> Optional[TaskProgress]:
         """Get the status of a generation task."""
@@ -254,26 +396,90 @@ class FlashcardService:
             return None
 
         # Get stored configuration
-        if task_id not in self.task_manager.task_configs:
+        task_config = self.task_manager.get_task_config(task_id)
+        if task_config is None:
             return None
 
-        document_id, config = self.task_manager.task_configs[task_id]
+        document_id, config = task_config
 
-        # Reset task status
-        task.status = TaskStatus.PENDING
-        task.progress_percentage = 0
-        task.current_step = "Retrying"
-        task.completed_steps = []
-        task.error_message = None
+        # Reset task status, a manual retry starts with fresh attempts
+        self.task_manager.reset_task(task_id, "Retrying", attempts=0, worker_id=None, lease_expires_at=None)
 
         # Start the async task again
-        async_task = asyncio.create_task(
-            self._run_generation_task(task_id, document_id, config)
-        )
-        self.task_manager.running_tasks[task_id] = async_task
+        if not self._start_claimed_task(task_id, document_id, config):
+            return None
 
         return task_id
 
+    async def reclaim_orphaned_tasks(self) -> Dict[str, int]:
+        """
+        Take over unfinished tasks whose worker stopped renewing their lease (crash, restart, deploy).
+        A task that already used FLASHCARD_TASK_MAX_ATTEMPTS is marked as failed instead.
+        The database work runs in a thread, only the claimed tasks are started on the event loop.
+        """
+        claimed, failed = await asyncio.to_thread(self._claim_orphaned_tasks)
+        for task_id, document_id, config in claimed:
+            self._run_task(task_id, document_id, config)
+        return {"restarted": len(claimed), "failed": failed}
+
+    def _claim_orphaned_tasks(self) -> Tuple[List[Tuple[str, str, FlashcardConfig]], int]:
+        """(task_id, document_id, config) of the orphaned tasks this worker claimed and reset, number of failed tasks"""
+        claimed, failed = [], 0
+        with get_db_context() as db:
+            task_ids = flashcard_tasks_crud.get_orphaned_task_ids(db, self.task_manager.lease_seconds)
+
+        for task_id in task_ids:
+            with get_db_context() as db:
+                task = flashcard_tasks_crud.get_task(db, task_id)
+                if task is None:
+                    continue
+                attempts = task.attempts
+            if attempts >= settings.FLASHCARD_TASK_MAX_ATTEMPTS:
+                self.task_manager.fail_task(task_id, f"Generation stopped after {attempts} attempts")
+                failed += 1
+                continue
+
+            document_id, config = self.task_manager.get_task_config(task_id)
+            # Claim before resetting, so that only one worker restarts the task
+            if self.task_manager.claim_task(task_id):
+                self.task_manager.reset_task(task_id, "Resuming")
+                claimed.append((task_id, document_id, config))
+        return claimed, failed
+
+    async def shutdown(self):
+        """Stop the tasks running in this worker and release their leases, other workers take them over."""
+        tasks = dict(self.task_manager.running_tasks)
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for task_id in tasks:
+            try:
+                await asyncio.to_thread(self.task_manager.release_task, task_id)
+            except Exception as e:
+                logger.warning("Failed to release flashcard task %s: %s", task_id, e)
+        if tasks:
+            logger.info("Released %d flashcard tasks", len(tasks))
+
+    def cleanup_expired(self, ttl_hours: float) -> Dict[str, int]:
+        """Delete finished tasks, their decks and unused uploads older than ttl_hours."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
+        with get_db_context() as db:
+            tasks = flashcard_tasks_crud.get_finished_tasks(db, cutoff)
+            for task in tasks:
+                self._delete_output(task.download_url)
+                flashcard_tasks_crud.delete_task(db, task.id)
+
+        documents = self.document_manager.delete_stale_documents(cutoff)
+        return {"tasks": len(tasks), "documents": documents}
+
+    def _delete_output(self, download_url: Optional[str]):
+        if not download_url:
+            return
+        filename = download_url.split("/")[-1]
+        file_path = self.output_dir / filename
+        if file_path.exists():
+            file_path.unlink()
+
     def get_download_path(self, task_id: str) -> Optional[str]:
         """Get the file path for downloading a completed task."""
         task = self.task_manager.get_task_status(task_id)
@@ -284,10 +490,7 @@ class FlashcardService:
 
     def get_processing_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get user's processing history."""
-        # In a real implementation, this would query a database
-        # For now, return recent tasks from memory
-        tasks = list(self.task_manager.tasks.values())
-        tasks.sort(key=lambda x: x.task_id, reverse=True)  # Sort by creation time (task_id is UUID)
+        tasks = self.task_manager.get_user_tasks(user_id, limit)
         return [{
             "task_id": task.task_id,
             "status": task.status.value,
@@ -296,11 +499,11 @@ class FlashcardService:
             "completed_steps": task.completed_steps,
             "error_message": task.error_message,
             "download_url": task.download_url
-        } for task in tasks[:limit]]
+        } for task in tasks]
 
     def get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """Get processing statistics for the user."""
-        tasks = list(self.task_manager.tasks.values())
+        tasks = self.task_manager.get_user_tasks(user_id)
         total_tasks = len(tasks)
         completed_tasks = len([t for t in tasks if t.status == TaskStatus.COMPLETED])
         failed_tasks = len([t for t in tasks if t.status == TaskStatus.FAILED])
@@ -326,30 +529,19 @@ class FlashcardService:
             "completed_steps": task.completed_steps,
             "error_message": task.error_message,
             "download_url": task.download_url,
-            "created_at": task.task_id,  # Using task_id as timestamp placeholder
+            "created_at": task.started_at,
         }
 
     def delete_task(self, task_id: str) -> bool:
         """Delete a processing task and its files."""
-        if task_id not in self.task_manager.tasks:
+        task = self.task_manager.get_task_status(task_id)
+        if task is None:
             return False
 
         # Cancel if running
         self.task_manager.cancel_task(task_id)
 
         # Delete files if they exist
-        task = self.task_manager.tasks[task_id]
-        if task.download_url:
-            filename = task.download_url.split("/")[-1]
-            file_path = self.output_dir / filename
-            if file_path.exists():
-                file_path.unlink()
+        self._delete_output(task.download_url)
 
-        # Remove from memory
-        del self.task_manager.tasks[task_id]
-
-        # Remove stored config
-        if task_id in self.task_manager.task_configs:
-            del self.task_manager.task_configs[task_id]
-
-        return True
+        return self.task_manager.delete_task(task_id)
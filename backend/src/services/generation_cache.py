@@ -0,0 +1,96 @@
+"""
+Cross-course cache for the outputs of the InfoAgent (title/description) and the PlannerAgent (chapter plan).
+Many users submit near-identical requests ("learn Python basics", 5h, English, beginner), each of them used to
+run both agents from scratch. Outputs are keyed by the normalized request and the content hashes of the attached
+documents and images, and kept in a size bounded LRU with a TTL.
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from ..config import settings
+
+
+class GenerationCache:
+    def __init__(self, ttl: float = 86400.0, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        """
+        :param ttl: seconds an output stays valid
+        :param max_entries: number of outputs kept, least recently used ones are dropped first
+        :param clock: time source, replaceable in tests
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str, time_hours: int, language: str, difficulty: str,
+                 file_contents: Iterable[bytes] = (), file_hashes: Iterable[str] = ()) -> str:
+        """
+        Key of a course request. The query is compared case and whitespace insensitive,
+        attached files by the sha256 of their content (their order does not matter).
+        :param file_hashes: sha256 of files that are not loaded, e.g. of the blob store (services/blob_store.py)
+        """
+        payload = {
+            "query": " ".join(query.lower().split()),
+            "time_hours": time_hours,
+            "language": language.strip().lower(),
+            "difficulty": difficulty.strip().lower(),
+            "files": sorted([hashlib.sha256(content or b"").hexdigest() for content in file_contents] +
+                            list(file_hashes)),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached output of kind ("info" or "planner"), None on a miss or if expired"""
+        with self._lock:
+            entry = self._entries.get((key, kind))
+            if entry is None or entry[0] < self._clock():
+                if entry is not None:
+                    del self._entries[(key, kind)]
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, kind))
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, kind: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[(key, kind)] = (self._clock() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end((key, kind))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Every hit is an agent (LLM) call that was saved"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+_generation_cache: Optional[GenerationCache] = None
+
+
+def get_generation_cache() -> Optional[GenerationCache]:
+    """The process-wide cache, None if GENERATION_CACHE_ENABLED is off"""
+    global _generation_cache
+    if not settings.GENERATION_CACHE_ENABLED:
+        return None
+    if _generation_cache is None:
+        _generation_cache = GenerationCache(
+            ttl=settings.GENERATION_CACHE_TTL_HOURS * 3600,
+            max_entries=settings.GENERATION_CACHE_SIZE,
+        )
+    return _generation_cache
@@ -0,0 +1,159 @@
+"""
+In-process event bus for course creation progress.
+The course creation pipeline publishes stage and chapter events, the SSE endpoint in the courses router
+streams them to the client. Every course keeps a bounded history, so a reconnecting client can resume
+after the last event id it has seen (Last-Event-ID) instead of polling the course and chapters.
+With several workers only the worker running a creation has its events. A stream on another worker only gets
+keep-alives, it polls the course status on every heartbeat and ends with the final event once the course is done.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, Optional
+
+# Events after which no further events are published for a course
+TERMINAL_EVENTS = ("course_finished", "course_failed")
+
+
+class _CourseChannel:
+    def __init__(self, max_events: int):
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.next_seq = 1
+        self.condition = asyncio.Condition()
+        self.closed_at: Optional[float] = None
+
+
+class CourseProgressBus:
+    def __init__(self, max_events_per_course: int = 500, retention_seconds: float = 600.0,
+                 heartbeat_seconds: float = 15.0):
+        """
+        :param max_events_per_course: number of events kept per course for resuming clients
+        :param retention_seconds: how long the history of a finished course is kept
+        :param heartbeat_seconds: interval of the keep-alive comments on idle streams
+        """
+        self.max_events_per_course = max_events_per_course
+        self.retention_seconds = retention_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        # Event ids are "<epoch>-<seq>". A new epoch (e.g. after a restart) lets clients detect a reset history.
+        self.epoch = str(int(time.time() * 1000))
+        self._channels: Dict[int, _CourseChannel] = {}
+        # Notified when a course gets a channel, wakes up subscribers that connected before its first event
+        self._channel_created = asyncio.Condition()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            course_id for course_id, channel in self._channels.items()
+            if channel.closed_at is not None and now - channel.closed_at > self.retention_seconds
+        ]
+        for course_id in expired:
+            del self._channels[course_id]
+
+    async def publish(self, course_id: int, event_type: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Append an event to the history of the course and wake up all subscribers"""
+        self._evict_expired()
+        channel = self._channels.get(course_id)
+        if channel is None:
+            channel = _CourseChannel(self.max_events_per_course)
+            self._channels[course_id] = channel
+            async with self._channel_created:
+                self._channel_created.notify_all()
+        event = {
+            "id": f"{self.epoch}-{channel.next_seq}",
+            "seq": channel.next_seq,
+            "type": event_type,
+            "data": {"course_id": course_id, **(data or {})},
+        }
+        channel.next_seq += 1
+        if event_type in TERMINAL_EVENTS:
+            channel.closed_at = time.monotonic()
+        else:
+            # A resumed course reopens its channel
+            channel.closed_at = None
+
+        async with channel.condition:
+            channel.events.append(event)
+            channel.condition.notify_all()
+        return event
+
+    def _parse_last_event_id(self, last_event_id: Optional[str]) -> int:
+        """Sequence number after which to resume, 0 if the id is missing or from an older epoch"""
+        if not last_event_id:
+            return 0
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return 0
+        return int(seq)
+
+    def is_closed(self, course_id: int) -> bool:
+        channel = self._channels.get(course_id)
+        return channel is not None and channel.closed_at is not None
+
+    def has_history(self, course_id: int) -> bool:
+        return course_id in self._channels
+
+    def final_event(self, course_id: int, event_type: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Terminal event that is not in the history, for courses finished outside of this process"""
+        return {"id": f"{self.epoch}-0", "seq": 0, "type": event_type, "data": {"course_id": course_id, **(data or {})}}
+
+    async def _wait(self, condition: asyncio.Condition, predicate: Callable[[], bool]) -> bool:
+        """Wait until predicate is true, False if the heartbeat interval passed first"""
+        async with condition:
+            try:
+                await asyncio.wait_for(condition.wait_for(predicate), timeout=self.heartbeat_seconds)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    async def subscribe(self, course_id: int, last_event_id: Optional[str] = None,
+                        poll_final: Optional[Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = None
+                        ) -> AsyncGenerator[Optional[Dict[str, Any]], None]:
+        """
+        Yield all events after last_event_id, then live events until a terminal event.
+        Yields None when no event arrived within the heartbeat interval.
+        :param poll_final: called on every heartbeat, returns a terminal event (see final_event) once the course
+            is done, e.g. by another worker, or None while it is still being created. The stream ends with it.
+        """
+        last_seq = self._parse_last_event_id(last_event_id)
+
+        while True:
+            # Subscribing does not create a channel, only publishing does (channels are evicted once closed)
+            channel = self._channels.get(course_id)
+            if channel is None:
+                arrived = await self._wait(self._channel_created, lambda: course_id in self._channels)
+            else:
+                pending = [event for event in channel.events if event["seq"] > last_seq]
+                if pending:
+                    for event in pending:
+                        last_seq = event["seq"]
+                        yield event
+                        if event["type"] in TERMINAL_EVENTS:
+                            return
+                    continue
+                arrived = await self._wait(channel.condition, lambda: channel.next_seq - 1 > last_seq)
+            if arrived:
+                continue
+
+            final = await poll_final() if poll_final is not None else None
+            if final is not None:
+                yield final
+                return
+            yield None
+
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Serialize an event as a Server-Sent Event, None becomes a keep-alive comment"""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+_progress_bus = None
+
+def get_progress_bus() -> CourseProgressBus:
+    """Get or create the CourseProgressBus singleton lazily"""
+    global _progress_bus
+    if _progress_bus is None:
+        _progress_bus = CourseProgressBus()
+    return _progress_bus
@@ -3,9 +3,12 @@ Utility class to get the queries for all the agents
 As the queries are very text heavy, I do not want to build them up in the agent or state service.
 """
 import json
+from typing import Dict, Optional
+
 import fitz #pymupdf
 
 from ..agents.utils import create_text_query, create_docs_query
+from .blob_store import read_file_data
 
 
 class QueryService:
@@ -23,7 +26,7 @@ User Answer: {users_answer}
 
 
     def get_tester_query(self, user_id: str, course_id: int, chapter_idx: int, explanation: str, language: str, difficulty: str):
-        chapter = self.sm.get_state(user_id, course_id)['chapters'][chapter_idx]
+        chapter = self.sm.get_chapter(user_id, course_id, chapter_idx)
         pretty_chapter = \
         f"""
         Title: {chapter["caption"]}
@@ -36,7 +39,7 @@ User Answer: {users_answer}
 
 
     def get_explainer_query(self, user_id, course_id, chapter_idx, language: str, difficulty: str, ragInfos: list):
-        chapter = self.sm.get_state(user_id, course_id)['chapters'][chapter_idx]
+        chapter = self.sm.get_chapter(user_id, course_id, chapter_idx)
         pretty_chapter = \
             f"""
                 Chapter {chapter_idx + 1}:
@@ -54,7 +57,7 @@ User Answer: {users_answer}
         return create_text_query(pretty_chapter)
 
     def get_explainer_image_query(self, user_id, course_id, chapter_idx):
-        chapter = self.sm.get_state(user_id, course_id)['chapters'][chapter_idx]
+        chapter = self.sm.get_chapter(user_id, course_id, chapter_idx)
         pretty_chapter = \
             f"""
                 Caption: {chapter['caption']}
@@ -64,8 +67,11 @@ User Answer: {users_answer}
         return create_text_query(pretty_chapter)
 
     @staticmethod
-    def get_info_query(request, docs, images):
-        """Get the query for the info agent"""
+    def get_info_query(request, docs, images, parsed_documents: Optional[Dict[int, Dict]] = None):
+        """
+        Get the query for the info agent
+        :param parsed_documents: optional map from document id to the parsed PDF (see CourseContentService.get_parsed_documents)
+        """
         doc_data = []
         text_extensions = {'.txt', '.md', '.py', '.js', '.html', '.css', '.json', '.xml', '.csv', '.yaml', '.yml'}
 
@@ -73,12 +79,16 @@ User Answer: {users_answer}
             ext = doc.filename.lower().split('.')[-1] if '.' in doc.filename else ''
 
             try:
-                if doc.filename.lower().endswith('.pdf'):
-                    pdf_doc = fitz.open(stream=doc.file_data, filetype="pdf")
+                if doc.filename.lower().endswith('.pdf') and parsed_documents is not None:
+                    if doc.id not in parsed_documents:
+                        continue  # Parsing failed
+                    text = "".join(parsed_documents[doc.id]["pages"])
+                elif doc.filename.lower().endswith('.pdf'):
+                    pdf_doc = fitz.open(stream=read_file_data(doc), filetype="pdf")
                     text = "".join(page.get_text() for page in pdf_doc)
                     pdf_doc.close()
                 elif f'.{ext}' in text_extensions:
-                    text = doc.file_data.decode('utf-8', errors='ignore')
+                    text = read_file_data(doc).decode('utf-8', errors='ignore')
                 else:
                     continue  # Skip non-text files
 
@@ -8,12 +8,19 @@ this creates the problem that agent a does not know what agent b does. That is w
 In addition, this class probides all the polished queries to the agents
 """
 import json
-from collections import defaultdict
-from typing import Dict, List, Any, Optional
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from itertools import count
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 
 from pydantic import BaseModel
 
 from ..agents.utils import create_text_query, create_docs_query
+from ..config import settings
+
+logger = logging.getLogger(__name__)
 
 
 class CourseState(BaseModel):
@@ -27,16 +34,165 @@ class CourseState(BaseModel):
     difficulty: str ="Intermediate"
 
 
-class StateService:
+class FrozenState(dict):
+    """
+    Read-only dict returned by get_state. It is shared by all readers, so it must not be changed.
+    Copies (e.g. the deepcopy of the adk session) are plain dicts again.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("The course state is read-only, use StateService.update_state")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+    def __copy__(self):
+        return dict(self)
+
+
+def freeze(value: Any) -> Any:
+    """Turn dicts into FrozenState and lists into tuples, recursively"""
+    if isinstance(value, dict):
+        return FrozenState({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class StateBackend(ABC):
+    """Storage of the course states, every put gives the state a new version"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(version, state) or None"""
+
+    @abstractmethod
+    def version(self, key: str) -> Optional[int]:
+        """Current version of the state, None if there is no state"""
+
+    @abstractmethod
+    def put(self, key: str, state: Dict[str, Any]) -> int:
+        """Store the state and return its new version"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+
+class InMemoryStateBackend(StateBackend):
+    """States of this process only (the default)"""
+
     def __init__(self):
-        # The state is a hashmap that maps from the user id to another hashmap that maps from a course id to the state of the course.
-        self.state: Dict[str, Dict[int, CourseState]] = defaultdict(dict)
+        self._states: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._versions = count(1)
+
+    def get(self, key: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        return self._states.get(key)
+
+    def version(self, key: str) -> Optional[int]:
+        entry = self._states.get(key)
+        return entry[0] if entry else None
+
+    def put(self, key: str, state: Dict[str, Any]) -> int:
+        version = next(self._versions)
+        self._states[key] = (version, state)
+        return version
+
+    def delete(self, key: str) -> None:
+        self._states.pop(key, None)
+
+
+class SQLiteStateBackend(StateBackend):
+    """
+    Key-value store in a SQLite file, a local stand-in for Redis.
+    Several workers on the same machine share the course states through it.
+    Versions come from one sequence for all keys, so a state that is deleted and created again never gets a
+    version that another worker still has a frozen view of.
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS course_states (key TEXT PRIMARY KEY, version INTEGER NOT NULL, state TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state_sequence (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+        )
+        # Files from before the sequence continue after their highest version
+        self._conn.execute(
+            "INSERT OR IGNORE INTO state_sequence (id, version) SELECT 1, COALESCE(MAX(version), 0) FROM course_states"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute("SELECT version, state FROM course_states WHERE key = ?", (key,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def version(self, key: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM course_states WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, state: Dict[str, Any]) -> int:
+        with self._lock:
+            data = json.dumps(state)
+            # The update takes the write lock of the file, no other worker can draw the same version
+            self._conn.execute("UPDATE state_sequence SET version = version + 1 WHERE id = 1")
+            version = self._conn.execute("SELECT version FROM state_sequence WHERE id = 1").fetchone()[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO course_states (key, version, state) VALUES (?, ?, ?)", (key, version, data)
+            )
+            self._conn.commit()
+        return version
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM course_states WHERE key = ?", (key,))
+            self._conn.commit()
+
+
+def create_state_backend() -> StateBackend:
+    """Backend from the settings, falls back to memory if the shared store cannot be opened"""
+    if settings.STATE_BACKEND == "sqlite":
+        try:
+            return SQLiteStateBackend(settings.STATE_DB_PATH)
+        except sqlite3.Error as e:
+            logger.warning("State store %s unavailable, using memory only: %s", settings.STATE_DB_PATH, e)
+    return InMemoryStateBackend()
+
+
+_EMPTY_STATE = freeze(CourseState().model_dump())
+
+
+class StateService:
+    def __init__(self, backend: Optional[StateBackend] = None):
+        # The backend maps "user_id:course_id" to the state of the course.
+        self.backend = backend or create_state_backend()
+        # Frozen views of the states, rebuilt only when the version in the backend changes
+        self._views: Dict[str, Tuple[int, FrozenState]] = {}
+
+    @staticmethod
+    def _key(user_id: str, course_id: int) -> str:
+        return f"{user_id}:{course_id}"
+
+    def _load(self, user_id: str, course_id: int) -> CourseState:
+        entry = self.backend.get(self._key(user_id, course_id))
+        return CourseState(**entry[1]) if entry else CourseState()
+
+    def _store(self, user_id: str, course_id: int, state: CourseState) -> None:
+        self.backend.put(self._key(user_id, course_id), state.model_dump())
 
     def save_chapters(self, user_id: str, course_id: int, chapters: List[Dict[str, Any]]) -> None:
         """
         Save newly created chapters to state for agents to use
         """
-        self.state[user_id][course_id].chapters.extend(chapters)
+        state = self._load(user_id, course_id)
+        state.chapters.extend(chapters)
         for idx, chapter in enumerate(chapters):
             chapter_str = \
             f"""
@@ -44,17 +200,43 @@ class StateService:
             Caption: {chapter['caption']}
             Content Summary: \n{json.dumps(chapter['content'], indent=2)}
             """
-            self.state[user_id][course_id].chapters_str += chapter_str
+            state.chapters_str += chapter_str
+        self._store(user_id, course_id, state)
 
-    def get_state(self, user_id: str, course_id: int) -> dict[str, Any]:
-        print(f"Getting state for user {user_id} and course {course_id}")
-        try:
-            return self.state[user_id][course_id].model_dump()
-        except KeyError:
-            return CourseState().model_dump()
+    def get_state(self, user_id: str, course_id: int) -> Mapping[str, Any]:
+        """
+        Read-only view of the state, no copy is made. The view is shared and must not be changed,
+        use update_state instead. Returns the default state if the course has none.
+        """
+        key = self._key(user_id, course_id)
+        version = self.backend.version(key)
+        if version is None:
+            self._views.pop(key, None)
+            return _EMPTY_STATE
+
+        view = self._views.get(key)
+        if view is None or view[0] != version:
+            entry = self.backend.get(key)
+            if entry is None:
+                return _EMPTY_STATE
+            view = (entry[0], freeze(entry[1]))
+            self._views[key] = view
+        return view[1]
+
+    def get_chapter(self, user_id: str, course_id: int, chapter_idx: int) -> Mapping[str, Any]:
+        return self.get_state(user_id, course_id)['chapters'][chapter_idx]
+
+    def has_state(self, user_id: str, course_id: int) -> bool:
+        return self.backend.version(self._key(user_id, course_id)) is not None
 
     def create_state(self, user_id: str, course_id: int, state: CourseState):
-        self.state[user_id][course_id] = state
+        self._store(user_id, course_id, state)
+
+    def delete_state(self, user_id: str, course_id: int) -> None:
+        """Evict the state, called when the course creation is over"""
+        key = self._key(user_id, course_id)
+        self.backend.delete(key)
+        self._views.pop(key, None)
 
     def update_state(self, user_id: str, course_id: int, **updates) -> None:
         """
@@ -65,20 +247,11 @@ class StateService:
             course_id: The course identifier
             **updates: Keyword arguments for the fields to update
         """
-        # Check if user exists, if not create empty dict
-        if user_id not in self.state:
-            self.state[user_id] = {}
-
-        # Check if course exists for user, if not create default CourseState
-        if course_id not in self.state[user_id]:
-            self.state[user_id][course_id] = CourseState()
-
-        # Get current state as dict
-        current_state_dict = self.state[user_id][course_id].model_dump()
+        # Get current state as dict (default CourseState if the course has none)
+        current_state_dict = self._load(user_id, course_id).model_dump()
 
         # Update with new values
         current_state_dict.update(updates)
 
         # Create new CourseState with validation
-        self.state[user_id][course_id] = CourseState(**current_state_dict)
-
+        self._store(user_id, course_id, CourseState(**current_state_dict))
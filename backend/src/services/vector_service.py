@@ -1,11 +1,18 @@
+import logging
+import threading
+import time
+
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Optional
 from ..config.chroma_settings import (
     CHROMA_HOST, CHROMA_PORT, CHROMA_COLLECTION_NAME, 
-    EMBEDDING_MODEL, CHROMA_CLIENT_TYPE
+    EMBEDDING_MODEL, CHROMA_CLIENT_TYPE, EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH
 )
+from .embedding_cache import EmbeddingCache
 
 class VectorService:
     def __init__(self, ):
@@ -20,6 +27,32 @@ class VectorService:
             self.client = chromadb.PersistentClient(path="./chroma_db")
             
         self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        self.embedding_cache = EmbeddingCache(
+            model_name=EMBEDDING_MODEL,
+            db_path=EMBEDDING_CACHE_PATH or None,
+            max_memory_entries=EMBEDDING_CACHE_SIZE
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def encode(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        """
+        Encode texts, only running the embedding model for texts that are not in the embedding cache.
+        """
+        cached = self.embedding_cache.get_many(texts)
+        missing = [idx for idx in range(len(texts)) if idx not in cached]
+
+        if missing:
+            missing_texts = [texts[idx] for idx in missing]
+            new_vectors = self.embedding_model.encode(missing_texts, batch_size=batch_size)
+            self.embedding_cache.put_many(missing_texts, new_vectors)
+            for idx, vector in zip(missing, new_vectors):
+                cached[idx] = vector
+
+        return np.vstack([cached[idx] for idx in range(len(texts))]) if texts else np.empty((0, 0))
+
+    def get_embedding_cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters of the embedding cache"""
+        return self.embedding_cache.stats()
 
     def create_collection(self, collection_id: str):
         """Create a new collection in the vector store"""
@@ -35,17 +68,49 @@ class VectorService:
     
     def add_content_by_course_id(self, course_id: int, content_id: str, text: str, metadata: Dict):
         """Add content to vector store"""
-        embedding = self.embedding_model.encode([text])
+        embedding = self.encode([text])
         self.client.get_or_create_collection("course_" + str(course_id)).add(
             documents=[text],
             embeddings=embedding.tolist(),
             metadatas=[metadata],
             ids=[content_id]
         )
+
+    def add_contents_by_course_id(self, course_id: int, items: List[Dict], batch_size: int = EMBEDDING_BATCH_SIZE) -> int:
+        """
+        Bulk add content to the vector store.
+        Each item is a dict with the keys "id", "text" and "metadata". Texts are encoded in batches
+        of batch_size and every batch is written with a single add call.
+        Returns the number of added rows.
+        """
+        if not items:
+            return 0
+
+        collection = self.client.get_or_create_collection("course_" + str(course_id))
+        start = time.perf_counter()
+
+        for offset in range(0, len(items), batch_size):
+            batch = items[offset:offset + batch_size]
+            texts = [item["text"] for item in batch]
+            embeddings = self.encode(texts, batch_size=batch_size)
+            collection.add(
+                documents=texts,
+                embeddings=embeddings.tolist(),
+                metadatas=[item["metadata"] for item in batch],
+                ids=[item["id"] for item in batch]
+            )
+
+        elapsed = time.perf_counter() - start
+        self.logger.info(
+            "Added %d rows to course_%s in %.2fs (%.1f rows/sec, batch size %d), embedding cache: %s",
+            len(items), course_id, elapsed, len(items) / elapsed if elapsed > 0 else float("inf"), batch_size,
+            self.embedding_cache.stats()
+        )
+        return len(items)
     
     def search_by_course_id(self, course_id: int, query: str, n_results: int = 5, filter_metadata: Optional[Dict] = None):
         """Search for similar content"""
-        query_embedding = self.embedding_model.encode([query])
+        query_embedding = self.encode([query])
         results = self.client.get_or_create_collection("course_" + str(course_id)).query(
             query_embeddings=query_embedding.tolist(),
             n_results=n_results,
@@ -53,6 +118,21 @@ class VectorService:
         )
         return results
 
+    def search_many_by_course_id(self, course_id: int, queries: List[str], n_results: int = 5, filter_metadata: Optional[Dict] = None):
+        """
+        Search for several queries at once.
+        All queries are encoded in one forward pass and sent to chroma in a single query call.
+        The result lists are in the same order as the queries.
+        """
+        if not queries:
+            return {"ids": [], "documents": [], "distances": [], "metadatas": []}
+        query_embeddings = self.encode(queries)
+        return self.client.get_or_create_collection("course_" + str(course_id)).query(
+            query_embeddings=query_embeddings.tolist(),
+            n_results=n_results,
+            where=filter_metadata
+        )
+
     
     def delete_content_by_course_id(self, course_id: int, content_id: str):
         """Delete content from vector store"""
@@ -69,3 +149,19 @@ class VectorService:
     def get_collection_by_course_id(self, course_id: int):
         """Get collection by course ID"""
         return self.client.get_or_create_collection("course_" + str(course_id))
+
+
+# Lazy singleton, loading the embedding model takes seconds. The course creation, the content service and the
+# chat share it, one model and one embedding cache per process
+_vector_service = None
+_vector_service_lock = threading.Lock()
+
+
+def get_vector_service() -> VectorService:
+    global _vector_service
+    if _vector_service is None:
+        # Chat threads and the event loop can ask for it at the same time
+        with _vector_service_lock:
+            if _vector_service is None:
+                _vector_service = VectorService()
+    return _vector_service
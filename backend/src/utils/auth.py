@@ -8,13 +8,15 @@ from pydantic import BaseModel
 # Import the SQLAlchemy User model module correctly
 from ..db.models import db_user as user_model
 # Import Pydantic schemas (only TokenData is directly used here)
-from ..db.database import get_db
+from ..db.database import get_db, get_async_db
 # Import security utilities
 from ..core import security
 from ..core.security import get_access_token_from_cookie
 # Import settings
 
 from ..db.crud.users_crud import get_active_user_by_id
+from ..db.crud.aio import users_crud as aio_users_crud
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Request # Added Request for get_optional_current_user
 
 class TokenData(BaseModel):
@@ -95,6 +97,27 @@ async def get_current_user_optional(access_token: Optional[str] = Depends(get_ac
     user = get_active_user_by_id(db, user_id)
     return user # if user else None
 
+async def get_current_active_user_async(access_token: Optional[str] = Depends(get_access_token_from_cookie),
+                                        db: AsyncSession = Depends(get_async_db)) -> user_model.User:
+    """
+    Same as get_current_active_user, but looks the user up with the async session.
+    For routers that are migrated to get_async_db, the lookup does not block the event loop.
+    """
+    if not access_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated: Access token missing",
+        )
+
+    user_id = security.verify_token(access_token)
+    user = await aio_users_crud.get_active_user_by_id(db, user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    return user
+
 async def get_current_admin_user(current_db_user: user_model.User = Depends(get_current_active_user)) -> user_model.User:
     """Ensure the current user is an admin."""
      # Check if the user is an admin
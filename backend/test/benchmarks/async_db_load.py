@@ -0,0 +1,160 @@
+"""
+Benchmark: mixed chat and browse traffic with the sync and the async database layer.
+
+Browse clients run what GET /courses/{id}/chapters runs (user lookup, ownership check, chapter list) in a closed
+loop, either with the sync session on the event loop (the routers before the migration) or with the AsyncSession
+and the crud functions of db/crud/aio. At the same time SSE chat streams expect a token every 20 ms, a late token
+is time the event loop was blocked.
+The database is sqlite (sqlite3 / aiosqlite) with a simulated round trip of --query-ms per statement, slept in the
+thread that executes the statement, like the network wait of psycopg2 / asyncpg.
+
+Run from the repository root:
+    python -m backend.test.benchmarks.async_db_load --seconds 5 --browse-clients 20 --chat-streams 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from ...src.db.database import Base
+from ...src.db.crud import chapters_crud, courses_crud, users_crud
+from ...src.db.crud.aio import (
+    chapters_crud as aio_chapters_crud, courses_crud as aio_courses_crud, users_crud as aio_users_crud
+)
+# All models, the mappers of the relationships need them
+from ...src.db.models import db_course, db_file, db_flashcard_task, db_note, db_usage, db_user  # noqa: F401
+
+USERS = 20
+COURSES_PER_USER = 3
+CHAPTERS_PER_COURSE = 8
+TOKEN_INTERVAL = 0.02
+
+
+def seed(url: str):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        for u in range(USERS):
+            db.add(db_user.User(id=f"user{u}", username=f"user{u}", email=f"user{u}@example.com",
+                                hashed_password="x", is_active=True))
+            for c in range(COURSES_PER_USER):
+                course = db_course.Course(user_id=f"user{u}", query="Learn SQL", total_time_hours=2, language="en",
+                                          difficulty="beginner", status="finished", title=f"Course {c}")
+                db.add(course)
+                db.flush()
+                for i in range(CHAPTERS_PER_COURSE):
+                    db.add(db_course.Chapter(course_id=course.id, index=i, caption=f"Chapter {i}",
+                                             summary="Summary", content="() => <div>Chapter</div>" * 50,
+                                             time_minutes=10, image_url=""))
+        db.commit()
+    engine.dispose()
+
+
+def add_round_trip(engine, query_ms: float, is_async: bool):
+    """Sleep query_ms in the thread that executes a statement"""
+    def round_trip(statement):
+        time.sleep(query_ms / 1000)
+
+    @event.listens_for(engine.sync_engine if is_async else engine, "connect")
+    def on_connect(dbapi_connection, _):
+        if is_async:
+            # aiosqlite runs the sqlite3 connection in its own thread, the callback has to be set there
+            dbapi_connection.run_async(lambda conn: conn._execute(conn._conn.set_trace_callback, round_trip))
+        else:
+            dbapi_connection.set_trace_callback(round_trip)
+
+
+def course_ids():
+    return [(f"user{u}", u * COURSES_PER_USER + c + 1) for u in range(USERS) for c in range(COURSES_PER_USER)]
+
+
+async def browse_sync(session_factory, user_id: str, course_id: int):
+    with session_factory() as db:
+        users_crud.get_active_user_by_id(db, user_id)
+        courses_crud.get_courses_by_course_id_user_id(db, course_id, user_id)
+        return len(chapters_crud.get_chapters_by_course_id(db, course_id))
+
+
+async def browse_async(session_factory, user_id: str, course_id: int):
+    async with session_factory() as db:
+        await aio_users_crud.get_active_user_by_id(db, user_id)
+        await aio_courses_crud.get_courses_by_course_id_user_id(db, course_id, user_id)
+        return len(await aio_chapters_crud.get_chapters_by_course_id(db, course_id))
+
+
+async def browse_client(browse, session_factory, offset: int, stop: asyncio.Event, latencies: list):
+    targets = course_ids()
+    i = offset
+    while not stop.is_set():
+        user_id, course_id = targets[i % len(targets)]
+        start = time.perf_counter()
+        assert await browse(session_factory, user_id, course_id) == CHAPTERS_PER_COURSE
+        latencies.append(time.perf_counter() - start)
+        i += 1
+        # Yield even if the request never waited, like the response write of a real handler
+        await asyncio.sleep(0)
+
+
+async def chat_stream(stop: asyncio.Event, delays: list):
+    expected = time.perf_counter()
+    while not stop.is_set():
+        expected += TOKEN_INTERVAL
+        await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+        delays.append(time.perf_counter() - expected)
+
+
+def percentile(values: list, share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))] if values else 0.0
+
+
+async def measure(name: str, browse, session_factory, args):
+    stop = asyncio.Event()
+    latencies, delays = [], []
+    tasks = [asyncio.create_task(chat_stream(stop, delays)) for _ in range(args.chat_streams)]
+    tasks += [asyncio.create_task(browse_client(browse, session_factory, i, stop, latencies))
+              for i in range(args.browse_clients)]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    print(f"{name:<6} browse {len(latencies) / args.seconds:7.1f} req/s | "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms | p99 {percentile(latencies, 0.99) * 1000:7.1f} ms | "
+          f"chat token delay p50 {statistics.median(delays) * 1000:6.1f} ms | "
+          f"p99 {percentile(delays, 0.99) * 1000:6.1f} ms | max {max(delays) * 1000:6.1f} ms")
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "load.db")
+        seed(f"sqlite:///{path}")
+        print(f"{args.browse_clients} browse clients (3 queries per request), {args.chat_streams} chat streams, "
+              f"{args.query_ms} ms per query, pool size {args.pool_size}")
+
+        sync_engine = create_engine(f"sqlite:///{path}", pool_size=args.pool_size,
+                                    connect_args={"check_same_thread": False})
+        add_round_trip(sync_engine, args.query_ms, is_async=False)
+        await measure("sync", browse_sync, sessionmaker(bind=sync_engine, autoflush=False), args)
+        sync_engine.dispose()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=args.pool_size)
+        add_round_trip(async_engine, args.query_ms, is_async=True)
+        factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        await measure("async", browse_async, factory, args)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--browse-clients", type=int, default=20)
+    parser.add_argument("--chat-streams", type=int, default=50)
+    parser.add_argument("--query-ms", type=float, default=5)
+    parser.add_argument("--pool-size", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
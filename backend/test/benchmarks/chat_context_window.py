@@ -0,0 +1,96 @@
+"""
+Benchmark: chat sessions over many turns, with and without the bounded context window.
+Every turn loads the session from the DatabaseSessionService (as the runner does), builds the prompt contents from
+its events and appends the student message and the tutor answer. Unbounded is the previous behaviour, windowed
+trims the prompt like the before_model_callback and compacts the session (agents/chat_agent/context_window.py).
+The summaries come from fallback_summary, no LLM is called. Tokens are estimated as characters / 4.
+The session store is sqlite (aiosqlite) instead of Postgres, the load times show the trend, not production numbers.
+
+Run from the repository root:
+    python -m backend.test.benchmarks.chat_context_window --turns 500
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+
+from ...src.agents.chat_agent.context_window import (
+    SUMMARY_STATE_KEY, ChatContextManager, fallback_summary, trim_contents
+)
+
+APP_NAME = "Nexora"
+USER_ID = "student"
+SESSION_ID = "42"
+QUESTION = "Can you explain again how the gradient of the loss is used to update the weights in step {turn}?"
+ANSWER = "Sure. The gradient points in the direction of the steepest increase of the loss, so we move " * 8
+
+
+def estimate_tokens(contents, summary: str) -> int:
+    chars = len(summary) + sum(len(part.text or "") for content in contents for part in content.parts or [])
+    return chars // 4
+
+
+async def run(mode: str, turns: int, keep_turns: int, max_turns: int, db_path: str):
+    session_service = DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{db_path}")
+
+    async def summarize(previous: str, transcript: str) -> str:
+        return fallback_summary(previous, transcript, 2000)
+
+    context = ChatContextManager(session_service, APP_NAME, keep_turns, max_turns, summarize)
+    await session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID,
+                                         state={"chapter_content": "Gradient descent. " * 200})
+    load_times = []
+    compact_time = 0.0
+    print(f"\n{mode}")
+    print(f"{'turn':>6} {'load ms':>9} {'prompt tokens':>14} {'stored events':>14}")
+    for turn in range(1, turns + 1):
+        start = time.perf_counter()
+        session = await session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
+        load_times.append((time.perf_counter() - start) * 1000)
+
+        question = types.Content(role="user", parts=[types.Part(text=QUESTION.format(turn=turn))])
+        contents = [event.content for event in session.events if event.content] + [question]
+        summary = ""
+        if mode == "windowed":
+            contents = trim_contents(contents, max_turns)
+            summary = session.state.get(SUMMARY_STATE_KEY, "")
+        tokens = estimate_tokens(contents, summary)
+
+        if turn == 1 or turn % 100 == 0:
+            recent = load_times[-20:]
+            print(f"{turn:6d} {sum(recent) / len(recent):9.2f} {tokens:14d} {len(session.events):14d}")
+
+        await session_service.append_event(session, Event(author="user", content=question))
+        answer = types.Content(role="model", parts=[types.Part(text=ANSWER)])
+        await session_service.append_event(session, Event(author="chat_agent", content=answer))
+
+        if mode == "windowed" and context.needs_compaction(session):
+            start = time.perf_counter()
+            await context.compact(USER_ID, SESSION_ID)
+            compact_time += time.perf_counter() - start
+
+    if mode == "windowed":
+        print(f"{context.compactions} compactions, {compact_time * 1000 / max(1, context.compactions):.1f} ms each")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--keep-turns", type=int, default=20)
+    parser.add_argument("--max-turns", type=int, default=40)
+    args = parser.parse_args()
+    logging.getLogger("backend.src.agents.chat_agent.context_window").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("unbounded", "windowed"):
+            await run(mode, args.turns, args.keep_turns, args.max_turns, os.path.join(tmp, f"{mode}.db"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark: chat latency while a course with large PDFs is being created.
+
+Simulates SSE chat requests on the event loop (each request waits a few ms for "upstream tokens")
+while the CPU-bound part of course creation (PDF parsing and embedding)
+runs either directly on the event loop or through the executors in core/executors.py.
+
+Run from the repository root:
+    python -m backend.test.benchmarks.chat_latency_during_course_creation --pages 300
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import fitz  # PyMuPDF
+
+from ...src.core.executors import run_in_parse_pool, run_in_embedding_pool, shutdown_executors
+from ...src.services.data_processors.pdf_processor import parse_pdf_document
+
+PARAGRAPH = ("Branch and bound is an algorithm design paradigm for discrete and combinatorial optimization "
+             "problems. It enumerates candidate solutions by means of state space search. ")
+
+
+def build_pdf(pages: int) -> bytes:
+    """Create a synthetic lecture PDF with a few paragraphs per page"""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        y = 50
+        for para_idx in range(6):
+            page.insert_textbox(fitz.Rect(40, y, 560, y + 110), f"{para_idx + 1}. " + PARAGRAPH * 3, fontsize=9)
+            y += 120
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def load_encoder():
+    """Use the real embedding model if it is installed, otherwise only parsing is measured"""
+    try:
+        from sentence_transformers import SentenceTransformer
+        from ...src.config.chroma_settings import EMBEDDING_MODEL
+        return SentenceTransformer(EMBEDDING_MODEL)
+    except ImportError:
+        print("sentence-transformers not installed, embedding step is skipped")
+        return None
+
+
+async def chat_client(latencies: list, stop: asyncio.Event, interval: float = 0.025):
+    """
+    Simulated chat client: requests arrive on a fixed schedule, each one waits for a streamed token.
+    Latency is measured from the scheduled arrival, so time spent waiting for a blocked loop is included.
+    """
+    arrival = time.perf_counter() + random.uniform(0, interval)
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        await asyncio.sleep(0.005)
+        latencies.append(time.perf_counter() - arrival)
+        arrival += interval
+
+
+async def create_course_inline(pdf: bytes, encoder):
+    content = parse_pdf_document(pdf)
+    if encoder is not None:
+        encoder.encode([p["text"] for p in content["paragraphs"]])
+
+
+async def create_course_executors(pdf: bytes, encoder):
+    content = await run_in_parse_pool(parse_pdf_document, pdf)
+    if encoder is not None:
+        await run_in_embedding_pool(encoder.encode, [p["text"] for p in content["paragraphs"]])
+
+
+async def measure(name: str, workload, clients: int):
+    latencies = []
+    stop = asyncio.Event()
+    chats = [asyncio.create_task(chat_client(latencies, stop)) for _ in range(clients)]
+    await asyncio.sleep(0.2)  # warm up
+
+    start = time.perf_counter()
+    await workload
+    duration = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*chats)
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<10} course creation {duration:6.2f}s | chat requests {len(latencies):5d} | "
+          f"p50 {p50:7.1f} ms | p99 {p99:7.1f} ms | max {latencies[-1] * 1000:7.1f} ms")
+
+
+async def main(pages: int, clients: int):
+    pdf = build_pdf(pages)
+    encoder = load_encoder()
+    print(f"PDF with {pages} pages ({len(pdf) / 1024:.0f} KB), {clients} concurrent chat clients")
+
+    # Warm up the pools so process start-up is not part of the measurement
+    await run_in_parse_pool(parse_pdf_document, build_pdf(1))
+
+    await measure("inline", create_course_inline(pdf, encoder), clients)
+    await measure("executors", create_course_executors(pdf, encoder), clients)
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--clients", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.clients))
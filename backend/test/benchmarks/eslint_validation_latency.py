@@ -0,0 +1,99 @@
+"""
+Benchmark: latency of a single JSX validation, ESLint CLI per call vs. the long-lived ESLint worker pool.
+
+Needs node and an installed ESLint setup (package.json, eslint.config.js and node_modules), e.g. the
+/opt/eslint-setup directory of the Docker image or `npm install` in src/agents/code_checker.
+
+Run from the repository root:
+    python -m backend.test.benchmarks.eslint_validation_latency --runs 30 --eslint-dir /opt/eslint-setup
+"""
+import argparse
+import statistics
+import time
+
+from ...src.agents.code_checker.code_checker import ESLintValidator, find_react_code_in_response, plugin_imports
+from ...src.agents.code_checker.eslint_pool import ESLintWorkerPool
+
+VALID_CODE = """
+() => {
+  const [count, setCount] = React.useState(0);
+  const data = [{ name: 'a', value: 1 }, { name: 'b', value: 2 }];
+  return (
+    <div>
+      <p>Clicked {count} times</p>
+      <button onClick={() => setCount(count + 1)}>Click</button>
+      <Recharts.BarChart width={300} height={200} data={data}>
+        <Recharts.Bar dataKey="value" />
+      </Recharts.BarChart>
+    </div>
+  );
+}
+"""
+
+INVALID_CODE = """
+() => {
+  return (<div>{undefinedVariable}</div>);
+}
+"""
+
+
+def summarize(name: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<14} mean {statistics.mean(latencies) * 1000:8.1f} ms   "
+          f"p50 {statistics.median(latencies) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+def measure(validate, runs: int) -> list:
+    latencies = []
+    for i in range(runs):
+        code = VALID_CODE if i % 2 == 0 else INVALID_CODE
+        start = time.perf_counter()
+        result = validate(code)
+        latencies.append(time.perf_counter() - start)
+        assert result['valid'] == (i % 2 == 0), result
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--eslint-dir", default=None, help="directory with the installed ESLint setup")
+    args = parser.parse_args()
+
+    validator = ESLintValidator(eslint_base_dir=args.eslint_dir)
+    if not validator.enabled:
+        print("ESLint setup not found, nothing to measure")
+        return
+
+    # CLI path: one node process per validation
+    def cli(code):
+        return validator._validate_with_cli(plugin_imports + "\n" + find_react_code_in_response(code))
+    cli_latencies = measure(cli, args.runs)
+
+    # Worker pool path, the first call starts the worker and is reported separately.
+    # The result cache is disabled, otherwise the repeated snippets would not reach ESLint at all.
+    cache = validator.cache
+    validator.cache = None
+    validator.pool = ESLintWorkerPool(validator.eslint_base_dir, size=1)
+    start = time.perf_counter()
+    validator.validate_jsx(VALID_CODE)
+    warmup = time.perf_counter() - start
+    pool_latencies = measure(validator.validate_jsx, args.runs)
+
+    # Repeated snippets with the result cache
+    validator.cache = cache
+    cached_latencies = measure(validator.validate_jsx, args.runs) if cache is not None else None
+    validator.pool.shutdown()
+
+    print(f"{args.runs} validations each")
+    summarize("eslint cli", cli_latencies)
+    summarize("worker pool", pool_latencies)
+    if cached_latencies:
+        summarize("cached", cached_latencies)
+    print(f"worker startup (once): {warmup * 1000:.1f} ms")
+    print(f"speedup (mean): {statistics.mean(cli_latencies) / statistics.mean(pool_latencies):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
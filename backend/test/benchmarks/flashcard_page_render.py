@@ -0,0 +1,104 @@
+"""
+Benchmark: page images of learning flashcards.
+The previous extraction rendered the page range of every chapter on its own, held all images of the range in
+memory and saved them one after another, so pages of overlapping chapters were rendered more than once.
+The page-render stage (PDFParser.extract_images_for_learning) renders every page once, in batches spread over the
+parse process pool, and writes each page to disk as soon as it is rendered.
+The previous path is reproduced with PyMuPDF (pdf2image needs poppler), so both sides use the same renderer.
+
+Run from the repository root:
+    python -m backend.test.benchmarks.flashcard_page_render --pages 60 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import fitz
+
+from ...src.config import settings
+from ...src.core.executors import get_parse_pool, run_in_parse_pool
+from ...src.services.data_processors.pdf_processor import render_pdf_pages
+
+
+def make_pdf(path: str, pages: int) -> None:
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Chapter page {page_num + 1}", fontsize=24)
+        for line in range(40):
+            page.insert_text((72, 110 + line * 16), "Lorem ipsum dolor sit amet, consectetur adipiscing. " * 2,
+                             fontsize=9)
+        page.draw_rect(fitz.Rect(300, 500, 540, 740), color=(0.2, 0.4, 0.8), fill=(0.8, 0.9, 1.0))
+    doc.save(path)
+    doc.close()
+
+
+def overlapping_chapters(pages: int, size: int = 10, overlap: int = 3):
+    """TOC chapters whose last pages are the first pages of the next chapter"""
+    chapters = []
+    start = 0
+    while start < pages:
+        end = min(start + size, pages)
+        chapters.append({"pages": list(range(start, end))})
+        start = end - overlap if end < pages else end
+    return chapters
+
+
+def legacy_render(pdf_path: str, chapters, output_dir: str, dpi: int) -> int:
+    """Per chapter: render the whole range into memory, then save the images"""
+    rendered = 0
+    doc = fitz.open(pdf_path)
+    for index, chapter in enumerate(chapters):
+        images = [doc[page].get_pixmap(dpi=dpi) for page in range(min(chapter["pages"]), max(chapter["pages"]) + 1)]
+        rendered += len(images)
+        for page, image in enumerate(images):
+            image.save(os.path.join(output_dir, f"chapter_{index}_{page}.png"))
+    doc.close()
+    return rendered
+
+
+async def stage_render(pdf_path: str, chapters, output_dir: str, dpi: int, workers: int) -> int:
+    """Same batching as PDFParser.extract_images_for_learning, without the settings lookup"""
+    page_indices = sorted({page for chapter in chapters for page in chapter["pages"]})
+    batch_size = -(-len(page_indices) // min(workers, len(page_indices)))
+    results = await asyncio.gather(*[
+        run_in_parse_pool(render_pdf_pages, pdf_path, page_indices[i:i + batch_size], output_dir, dpi, "png")
+        for i in range(0, len(page_indices), batch_size)
+    ])
+    return sum(len(result) for result in results)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    settings.PDF_PARSE_WORKERS = args.workers
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "slides.pdf")
+        make_pdf(pdf_path, args.pages)
+        chapters = overlapping_chapters(args.pages)
+        print(f"{args.pages} pages, {len(chapters)} overlapping chapters, {args.dpi} dpi, {args.workers} workers")
+
+        legacy_dir = os.path.join(tmp, "legacy")
+        os.mkdir(legacy_dir)
+        start = time.perf_counter()
+        rendered = legacy_render(pdf_path, chapters, legacy_dir, args.dpi)
+        print(f"legacy     {rendered:4d} page renders   {time.perf_counter() - start:6.2f} s")
+
+        start = time.perf_counter()
+        rendered = await stage_render(pdf_path, chapters, os.path.join(tmp, "stage"), args.dpi, args.workers)
+        print(f"stage      {rendered:4d} page renders   {time.perf_counter() - start:6.2f} s (incl. pool start)")
+
+        start = time.perf_counter()
+        await stage_render(pdf_path, chapters, os.path.join(tmp, "stage"), args.dpi, args.workers)
+        print(f"stage      already rendered        {time.perf_counter() - start:6.2f} s (retry)")
+        get_parse_pool().shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
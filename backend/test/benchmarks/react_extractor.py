@@ -0,0 +1,169 @@
+"""
+Micro-benchmark: React component extraction from explainer outputs.
+Compares the single-pass extractor (react_extractor.py) with the previous regex scan, which re-scanned the
+braces from every candidate header. The corpus is the example explainer output and the plugin examples shipped
+with the explainer agent; the long cases embed the output in prose, as in retries that quote the previous code.
+
+Run from the repository root:
+    python -m backend.test.benchmarks.react_extractor --repeat 20
+"""
+import argparse
+import glob
+import os
+import re
+import statistics
+import time
+
+from ...src.agents.code_checker import react_extractor
+
+AGENTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "src", "agents")
+PROSE = "The explanation below shows the idea (see the chart for details). Don't skip the example! "
+
+
+def load_corpus() -> dict:
+    """Real explainer outputs plus longer responses built from them"""
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(AGENTS_DIR, "explainer_agent", "*docs", "*"))):
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                corpus[os.path.basename(path)] = f.read()
+    example = corpus.get("6_example.txt", "")
+    corpus["example_x4_with_prose"] = (PROSE * 20 + example) * 4
+    corpus["example_x16_with_prose"] = (PROSE * 20 + example) * 16
+    return corpus
+
+
+# Previous implementation, kept here as the baseline
+def legacy_find_react_code_in_response(text: str) -> str:
+    """
+    Extracts React component code from a text response.
+    Handles nested components, complex JSX, and various React patterns.
+
+    Returns the first complete React component found, or None if no valid component is detected.
+    """
+
+    def is_jsx_element(s):
+        """Check if string contains JSX elements"""
+        jsx_patterns = [
+            r'<[A-Z][a-zA-Z0-9]*[^>]*>',  # Component tags like <MyComponent>
+            r'<[a-z]+[^>]*>',  # HTML tags like <div>, <span>
+            r'<[^>]+\s*/>',  # Self-closing tags like <img />
+            r'{\s*[^}]*\s*}',  # JSX expressions like {variable}
+        ]
+        return any(re.search(pattern, s) for pattern in jsx_patterns)
+
+    def extract_balanced_braces(text, start_pos):
+        """Extract content within balanced braces starting from start_pos"""
+        if start_pos >= len(text) or text[start_pos] != '{':
+            return None, start_pos
+
+        brace_count = 0
+        i = start_pos
+
+        while i < len(text):
+            char = text[i]
+            if char == '{':
+                brace_count += 1
+            elif char == '}':
+                brace_count -= 1
+                if brace_count == 0:
+                    return text[start_pos:i + 1], i + 1
+            i += 1
+
+        return None, start_pos  # Unmatched braces
+
+    def extract_function_body(text, start_pos):
+        """Extract complete function body including parameters and body"""
+        # Find the opening brace of the function
+        brace_pos = text.find('{', start_pos)
+        if brace_pos == -1:
+            return None
+
+        # Extract the balanced content
+        body, end_pos = extract_balanced_braces(text, brace_pos)
+        if body is None:
+            return None
+
+        # Include everything from start_pos to end_pos
+        return text[start_pos:end_pos]
+
+    # Patterns to identify React components
+    react_patterns = [
+        # Arrow functions: () => {}, (props) => {}, ({prop1, prop2}) => {}
+        (r'(\([^)]*\)\s*=>\s*\{)', r'\([^)]*\)\s*=>\s*\{'),
+
+        # Function declarations: function ComponentName() {}, function() {}
+        (r'(function\s+[A-Z][a-zA-Z0-9]*\s*\([^)]*\)\s*\{)', r'function\s+[A-Z][a-zA-Z0-9]*\s*\([^)]*\)\s*\{'),
+        (r'(function\s*\([^)]*\)\s*\{)', r'function\s*\([^)]*\)\s*\{'),
+
+        # Const/let/var assignments: const Component = () => {}, const Component = function() {}
+        (r'(const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)',
+         r'const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
+        (r'(const\s+[A-Z][a-zA-Z0-9]*\s*=\s*function\s*\([^)]*\)\s*\{)',
+         r'const\s+[A-Z][a-zA-Z0-9]*\s*=\s*function\s*\([^)]*\)\s*\{'),
+        (r'(let\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)', r'let\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
+        (r'(var\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)', r'var\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
+
+        # Export statements: export default () => {}, export const Component = () => {}
+        (r'(export\s+default\s+\([^)]*\)\s*=>\s*\{)', r'export\s+default\s+\([^)]*\)\s*=>\s*\{'),
+        (r'(export\s+const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{)',
+         r'export\s+const\s+[A-Z][a-zA-Z0-9]*\s*=\s*\([^)]*\)\s*=>\s*\{'),
+    ]
+
+    # Look for direct JSX without function wrapper
+    jsx_direct_pattern = r'(<[A-Z][a-zA-Z0-9]*[^>]*>.*?</[A-Z][a-zA-Z0-9]*>|<[a-z]+[^>]*>.*?</[a-z]+>|<[^>]+\s*/>)'
+
+    candidates = []
+
+    # First, try to find function-based components
+    for full_pattern, match_pattern in react_patterns:
+        for match in re.finditer(match_pattern, text, re.DOTALL | re.IGNORECASE):
+            start_pos = match.start()
+
+            # Extract the complete function
+            complete_function = extract_function_body(text, start_pos)
+            if complete_function and is_jsx_element(complete_function):
+                candidates.append((start_pos, complete_function))
+
+    # Also look for direct JSX (might be just JSX without function wrapper)
+    for match in re.finditer(jsx_direct_pattern, text, re.DOTALL):
+        jsx_content = match.group(1)
+        if is_jsx_element(jsx_content):
+            candidates.append((match.start(), jsx_content))
+
+    # Return the first (earliest in text) valid React component
+    if candidates:
+        candidates.sort(key=lambda x: x[0])  # Sort by position in text
+        return candidates[0][1]
+
+    return None
+
+
+def time_call(fn, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # The extractor caches its results, the benchmark measures the scan itself
+    extract = react_extractor.extract_react_component.__wrapped__
+
+    print(f"{'input':<26}{'chars':>9}{'legacy ms':>12}{'single pass ms':>16}{'speedup':>9}  same result")
+    for name, text in load_corpus().items():
+        legacy_ms = time_call(legacy_find_react_code_in_response, text, args.repeat) * 1000
+        new_ms = time_call(extract, text, args.repeat) * 1000
+        new_result = extract(text)
+        same = legacy_find_react_code_in_response(text) == (new_result.code if new_result else None)
+        print(f"{name:<26}{len(text):>9}{legacy_ms:>12.2f}{new_ms:>16.2f}{legacy_ms / max(new_ms, 1e-6):>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: memory held by the InMemorySessionService after simulated course creations.
+Every agent call of a course creation (info, planner, and per chapter explainer retries, image lookup, tester and
+code reviews) creates a session and appends a prompt and a response event, like the adk runner does.
+The legacy mode keeps the sessions (the old behaviour), the ephemeral mode deletes them after each call
+(agents/agent.py). No LLM is called.
+
+Run from the repository root:
+    python -m backend.test.benchmarks.session_memory --courses 100
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from ...src.agents.agent import ephemeral_session
+from ...src.core.session_sweeper import count_sessions, sweep_session_service
+
+APP_NAME = "Nexora"
+CHAPTERS = 8
+# Agent calls per chapter: 2 explainer attempts, image, initial tester, 3 code reviews
+CALLS_PER_CHAPTER = 7
+PROMPT = "Explain the chapter with an interactive React component. " * 40
+RESPONSE = "() => { return (<div><p>Chapter content</p></div>); } " * 80
+
+
+@asynccontextmanager
+async def legacy_session(session_service, app_name: str, user_id: str, state: dict):
+    """The old behaviour: the session is created and never deleted"""
+    yield await session_service.create_session(app_name=app_name, user_id=user_id, state=state)
+
+
+async def agent_call(session_service, session_factory, user_id: str, state: dict) -> None:
+    async with session_factory(session_service, APP_NAME, user_id, state) as session:
+        for author, text in (("user", PROMPT), ("model", RESPONSE)):
+            event = Event(author=author, content=types.Content(role=author, parts=[types.Part(text=text)]))
+            await session_service.append_event(session, event)
+
+
+async def create_courses(session_factory, courses: int) -> InMemorySessionService:
+    session_service = InMemorySessionService()
+    for course in range(courses):
+        user_id = f"user_{course % 10}"
+        state = {
+            "query": "Learn graph algorithms",
+            "chapters": [{"caption": f"Chapter {i}", "content": ["point"] * 5, "note": "", "time": 30}
+                         for i in range(CHAPTERS)],
+        }
+        # info and planner, then the chapters in parallel
+        await agent_call(session_service, session_factory, user_id, {})
+        await agent_call(session_service, session_factory, user_id, state)
+        await asyncio.gather(*[
+            agent_call(session_service, session_factory, user_id, state)
+            for _ in range(CHAPTERS * CALLS_PER_CHAPTER)
+        ])
+    return session_service
+
+
+async def measure(name: str, session_factory, courses: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    session_service = await create_courses(session_factory, courses)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} sessions left {count_sessions(session_service):6d}   "
+          f"retained {current / 1e6:8.2f} MB   peak {peak / 1e6:8.2f} MB   time {elapsed:6.2f} s")
+    return session_service
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=100)
+    args = parser.parse_args()
+
+    calls = args.courses * (2 + CHAPTERS * CALLS_PER_CHAPTER)
+    print(f"{args.courses} simulated course creations, {calls} agent calls")
+    legacy = await measure("legacy", legacy_session, args.courses)
+    await measure("ephemeral", ephemeral_session, args.courses)
+
+    # The sweeper on the legacy service, with a size limit and no age limit
+    start = time.perf_counter()
+    deleted = await sweep_session_service(legacy, max_age_seconds=3600, max_sessions=1000)
+    print(f"sweeper    deleted {deleted} legacy sessions in {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{count_sessions(legacy)} left")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+import asyncio
+import time
+import unittest
+
+from ..src.core.adaptive_limiter import AdaptiveLimiter, LatencyHistogram, is_overload_error
+
+
+class TestAdaptiveLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_grows_while_calls_succeed(self):
+        limiter = AdaptiveLimiter(initial=2, max_limit=6)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+                limiter.on_success()
+
+        await asyncio.gather(*[call() for _ in range(60)])
+        self.assertEqual(limiter.stats()["limit"], 6)
+        self.assertGreater(peak, 2)
+        self.assertLessEqual(peak, 6)
+
+    async def test_backs_off_once_per_burst(self):
+        limiter = AdaptiveLimiter(initial=8, max_limit=8)
+        starts = []
+        for _ in range(4):
+            async with limiter.slot() as started_at:
+                starts.append(started_at)
+        limiter.on_overload(starts[0])
+        # The other calls of the same burst started before the decrease and are ignored
+        for started_at in starts[1:]:
+            limiter.on_overload(started_at)
+        self.assertEqual(limiter.stats()["limit"], 4)
+        limiter.on_overload(time.monotonic())
+        self.assertEqual(limiter.stats()["limit"], 2)
+        self.assertEqual(limiter.stats()["overloads"], 5)
+
+    def test_overload_errors_and_histogram(self):
+        self.assertTrue(is_overload_error(Exception("429 RESOURCE_EXHAUSTED")))
+        self.assertTrue(is_overload_error(Exception("503 UNAVAILABLE: model is overloaded")))
+        self.assertFalse(is_overload_error(ValueError("No JSON array found in response")))
+
+        histogram = LatencyHistogram()
+        for seconds in (0.5, 3, 4, 150):
+            histogram.observe(seconds)
+        stats = histogram.to_dict()
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual(stats["buckets"]["<=1s"], 1)
+        self.assertEqual(stats["buckets"]["<=5s"], 2)
+        self.assertEqual(stats["buckets"][">120s"], 1)
+        self.assertEqual(stats["max"], 150)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import unittest
+
+from ..src.core.agent_scheduler import AgentCallScheduler, PRIORITY_BATCH, PRIORITY_INTERACTIVE, TokenBucket
+
+
+class TestAgentCallScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = AgentCallScheduler(max_concurrency=1, model_rate_limits={"slow": 1},
+                                            default_rate_per_minute=60000)
+        self.order = []
+
+    async def call(self, user_id, priority=PRIORITY_BATCH, model="fast"):
+        async with self.scheduler.slot(model, user_id, priority):
+            self.order.append(user_id)
+
+    async def queue_behind_held_slot(self, *calls):
+        """Start the calls while another call holds the only slot, then free it and wait for them"""
+        await self.scheduler._acquire("fast", "holder", PRIORITY_BATCH)
+        tasks = [asyncio.create_task(call) for call in calls]
+        await asyncio.sleep(0)
+        self.assertEqual(self.scheduler.stats()["queue_depth"], len(calls))
+        self.scheduler._release("fast")
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+    async def test_users_are_served_round_robin(self):
+        await self.queue_behind_held_slot(*[self.call(user_id) for user_id in "aaabbc"])
+        self.assertEqual(self.order, list("abcaba"))
+
+    async def test_interactive_calls_are_served_before_batch_calls(self):
+        await self.queue_behind_held_slot(self.call("a"), self.call("b"), self.call("chat", PRIORITY_INTERACTIVE))
+        self.assertEqual(self.order, ["chat", "a", "b"])
+
+    async def test_throttled_model_does_not_block_other_models(self):
+        self.scheduler.max_concurrency = 2
+        self.scheduler._bucket("slow").tokens = 0.0
+        slow = asyncio.create_task(self.call("a", model="slow"))
+        await asyncio.wait_for(self.call("b", model="fast"), timeout=1)
+        self.assertEqual(self.order, ["b"])
+        self.assertEqual(self.scheduler.stats()["queue_depth_by_model"], {"slow": 1})
+
+        # A cancelled waiter leaves the queue
+        slow.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await slow
+        self.assertEqual(self.scheduler.stats()["queue_depth"], 0)
+
+    async def test_slot_granted_to_a_cancelled_call_is_handed_back(self):
+        await self.scheduler._acquire("fast", "holder", PRIORITY_BATCH)
+        cancelled = asyncio.create_task(self.call("cancelled"))
+        served = asyncio.create_task(self.call("served"))
+        await asyncio.sleep(0)
+
+        # The slot goes to the first waiter, which is cancelled before it could start
+        self.scheduler._release("fast")
+        cancelled.cancel()
+        await asyncio.wait_for(asyncio.gather(cancelled, served, return_exceptions=True), timeout=1)
+        self.assertEqual(self.order, ["served"])
+        stats = self.scheduler.stats()
+        self.assertEqual((stats["in_flight"], stats["queue_depth"], stats["granted"]), (0, 0, 3))
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(600, burst=2)
+        self.assertTrue(bucket.try_take())
+        self.assertTrue(bucket.try_take())
+        self.assertFalse(bucket.try_take())
+        self.assertAlmostEqual(bucket.seconds_until_available(), 0.1, delta=0.02)
+
+        time.sleep(0.11)
+        self.assertTrue(bucket.try_take())
+        bucket.pause(60)
+        bucket.tokens = bucket.capacity
+        self.assertFalse(bucket.try_take())
+        self.assertGreater(bucket.seconds_until_available(), 59)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from ..src.services.blob_store import (
+    BlobTooLargeError, LocalBlobStore, S3BlobStore, check_persistent_storage, collect_garbage
+)
+
+
+class ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in for the boto3 S3 client methods used by S3BlobStore"""
+
+    def __init__(self, page_size=2):
+        self.objects = {}  # key -> (data, last modified)
+        self.page_size = page_size
+        self.puts = 0
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError("404")
+        return {"ContentLength": len(self.objects[Key][0]), "LastModified": self.objects[Key][1]}
+
+    def put_object(self, Bucket, Key, Body):
+        self.puts += 1
+        self.objects[Key] = (Body.read(), datetime.now(timezone.utc))
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective):
+        self.objects[Key] = (self.objects[CopySource["Key"]][0], datetime.now(timezone.utc))
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[Key][0]
+        if Range:
+            start, end = Range.split("=")[1].split("-")
+            data = data[int(start):int(end) + 1]
+        return {"Body": io.BytesIO(data)}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + self.page_size]
+        truncated = start + self.page_size < len(keys)
+        return {
+            "Contents": [{"Key": key, "LastModified": self.objects[key][1]} for key in page],
+            "IsTruncated": truncated,
+            "NextContinuationToken": str(start + self.page_size) if truncated else None,
+        }
+
+
+class TestLocalBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = LocalBlobStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_addressed_and_deduplicated(self):
+        data = b"%PDF-1.4 lecture notes" * 100000
+        blob = self.store.put_stream(io.BytesIO(data))
+        sha256 = hashlib.sha256(data).hexdigest()
+        self.assertEqual((blob.sha256, blob.size), (sha256, len(data)))
+        self.assertEqual(self.store.local_path(sha256), os.path.join(self.tmp.name, sha256[:2], sha256[2:4], sha256))
+        self.assertEqual(self.store.read(sha256), data)
+
+        self.assertEqual(self.store.put_bytes(data), blob)
+        self.assertEqual([sha for sha, _ in self.store.list_blobs()], [sha256])
+        self.assertEqual(os.listdir(self.store.tmp_dir), [])
+
+    def test_range_and_size_limit(self):
+        data = bytes(range(256)) * 10000
+        blob = self.store.put_bytes(data)
+        self.assertEqual(b"".join(self.store.iter_range(blob.sha256, 1000, 1999)), data[1000:2000])
+        self.assertEqual(b"".join(self.store.iter_range(blob.sha256, 0, len(data) - 1)), data)
+
+        with self.assertRaises(BlobTooLargeError):
+            self.store.put_stream(io.BytesIO(data), max_size=len(data) - 1)
+        self.assertEqual(len(list(self.store.list_blobs())), 1)
+        self.assertEqual(os.listdir(self.store.tmp_dir), [])
+
+    def test_garbage_collection_keeps_referenced_and_recent_blobs(self):
+        kept = self.store.put_bytes(b"referenced")
+        orphan = self.store.put_bytes(b"orphan")
+        recent = self.store.put_bytes(b"uploading")
+        old = time.time() - 7200
+        for sha256 in (kept.sha256, orphan.sha256):
+            os.utime(self.store.path(sha256), (old, old))
+
+        self.assertEqual(collect_garbage(self.store, {kept.sha256}, grace_seconds=3600), 1)
+        self.assertEqual({sha for sha, _ in self.store.list_blobs()}, {kept.sha256, recent.sha256})
+
+        # A new upload of the same content makes an old blob recent again
+        os.utime(self.store.path(recent.sha256), (old, old))
+        self.store.put_bytes(b"uploading")
+        self.assertEqual(collect_garbage(self.store, {kept.sha256}, grace_seconds=3600), 0)
+
+    def test_garbage_collection_rechecks_blobs_uploaded_after_the_listing(self):
+        blob = self.store.put_bytes(b"uploaded again")
+        old = time.time() - 7200
+        os.utime(self.store.path(blob.sha256), (old, old))
+        listing = list(self.store.list_blobs())
+        # The same content is uploaded between the listing and the delete
+        self.store.put_bytes(b"uploaded again")
+        self.store.list_blobs = lambda: iter(listing)
+        self.assertEqual(collect_garbage(self.store, set(), grace_seconds=3600), 0)
+        self.assertIsNotNone(self.store.local_path(blob.sha256))
+
+    def test_local_store_in_a_container_needs_a_mounted_volume(self):
+        exists = os.path.exists
+        in_container = mock.patch("os.path.exists", lambda path: path == "/.dockerenv" or exists(path))
+        with in_container, mock.patch("os.path.ismount", lambda path: path == "/"):
+            with self.assertRaises(RuntimeError):
+                check_persistent_storage(self.store)
+        with in_container, mock.patch("os.path.ismount", lambda path: path in ("/", self.store.root)):
+            check_persistent_storage(self.store)
+
+
+class TestS3BlobStore(unittest.TestCase):
+    def test_s3_backend_with_stand_in_client(self):
+        client = FakeS3Client()
+        store = S3BlobStore("uploads", prefix="blobs", client=client)
+        blobs = [store.put_stream(io.BytesIO(f"document {i}".encode() * 1000)) for i in range(3)]
+        store.put_bytes(b"document 0" * 1000)
+        self.assertEqual(client.puts, 3)
+        self.assertTrue(all(key.startswith("blobs/") for key in client.objects))
+
+        self.assertIsNone(store.local_path(blobs[0].sha256))
+        self.assertEqual(b"".join(store.iter_range(blobs[1].sha256, 9, 19)), (b"document 1" * 1000)[9:20])
+        self.assertEqual(store.read(blobs[2].sha256), b"document 2" * 1000)
+
+        self.assertEqual({sha for sha, _ in store.list_blobs()}, {blob.sha256 for blob in blobs})
+        self.assertEqual(collect_garbage(store, {blobs[0].sha256}, grace_seconds=-1), 2)
+        self.assertEqual([sha for sha, _ in store.list_blobs()], [blobs[0].sha256])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from ..src.services.chapter_cache import ChapterAccess, ChapterCache
+
+
+class FakeChapters:
+    def __init__(self):
+        self.chapters = {1: (10, "alice", False, "v1"), 2: (10, "alice", False, "v1"), 3: (20, "bob", True, "v1")}
+        self.access_loads = 0
+        self.content_loads = 0
+        self.during_load = None
+
+    def load_access(self, chapter_id):
+        self.access_loads += 1
+        if self.during_load:
+            self.during_load()
+        if chapter_id not in self.chapters:
+            return None
+        course_id, owner_id, is_public, version = self.chapters[chapter_id]
+        return ChapterAccess(chapter_id, course_id, owner_id, is_public, f"hash-{chapter_id}-{version}")
+
+    def load_content(self, chapter_id):
+        self.content_loads += 1
+        version = self.chapters[chapter_id][3]
+        return f"content {chapter_id} {version}", f"hash-{chapter_id}-{version}"
+
+
+class TestChapterCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.db = FakeChapters()
+        self.cache = ChapterCache(ttl=60, load_access=self.db.load_access, load_content=self.db.load_content,
+                                  clock=lambda: self.now)
+
+    def test_read_through_and_ttl(self):
+        access = self.cache.get_access(1)
+        self.assertTrue(access.can_access("alice"))
+        self.assertFalse(access.can_access("bob"))
+        self.assertEqual(self.cache.get_content(access), "content 1 v1")
+        self.cache.get_access(1)
+        self.cache.get_content(access)
+        self.assertEqual((self.db.access_loads, self.db.content_loads), (1, 1))
+        self.assertIsNone(self.cache.get_access(99))
+
+        self.now = 61
+        self.cache.get_access(1)
+        self.assertEqual(self.db.access_loads, 3)
+
+    def test_invalidation(self):
+        self.cache.get_access(1)
+        self.cache.get_access(3)
+        self.db.chapters[1] = (10, "alice", False, "v2")
+        self.cache.invalidate_chapter(1)
+        access = self.cache.get_access(1)
+        self.assertEqual(self.cache.get_content(access), "content 1 v2")
+
+        # A course update drops all of its chapters, the other courses stay cached
+        self.db.chapters[1] = (10, "alice", True, "v2")
+        self.cache.invalidate_course(10)
+        self.assertTrue(self.cache.get_access(1).can_access("bob"))
+        loads = self.db.access_loads
+        self.cache.get_access(3)
+        self.assertEqual(self.db.access_loads, loads)
+
+    def test_load_overlapping_an_invalidation_is_not_stored(self):
+        def update_while_loading():
+            self.db.during_load = None
+            self.db.chapters[1] = (10, "alice", True, "v2")
+            self.cache.invalidate_chapter(1)
+
+        self.db.during_load = update_while_loading
+        self.cache.get_access(1)
+        self.assertTrue(self.cache.get_access(1).is_public)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from ..src.agents.chat_agent.chapter_sections import ChapterSectionIndex, extract_sections, outline
+
+CHAPTER = """() => {
+  const [step, setStep] = React.useState(0);
+  const facts = [
+    { title: 'Photosynthesis', description: 'Plants turn light energy into chemical energy stored in glucose.' },
+  ];
+  return (
+    <div className="min-h-screen w-full bg-white text-gray-800">
+      <h1 className="text-3xl font-bold">Plant Biology</h1>
+      <p className="mt-2">Plants are the base of almost every food chain.</p>
+      <h2>Photosynthesis</h2>
+      <p>Chlorophyll absorbs light, water is split and oxygen is released. Let's look at the steps.</p>
+      <h2>Cellular <span className="italic">Respiration</span></h2>
+      <p>Mitochondria break glucose down into ATP &amp; carbon dioxide.</p>
+      <button onClick={() => setStep(step + 1)}>Next step</button>
+    </div>
+  );
+}"""
+
+
+def bag_of_words(texts):
+    vocabulary = ["light", "glucose", "mitochondria", "oxygen", "food"]
+    return np.array([[text.lower().count(word) for word in vocabulary] for text in texts], dtype=np.float32)
+
+
+class TestChapterSections(unittest.TestCase):
+    def test_extracts_text_along_headings(self):
+        sections = extract_sections(CHAPTER)
+        self.assertEqual(outline(sections), "- Plant Biology\n- Photosynthesis\n- Cellular Respiration")
+        texts = {section.title: section.text for section in sections}
+        self.assertIn("Plants turn light energy into chemical energy", texts[""])
+        self.assertEqual(texts["Plant Biology"], "Plants are the base of almost every food chain.")
+        self.assertIn("Let's look at the steps.", texts["Photosynthesis"])
+        self.assertEqual(texts["Cellular Respiration"], "Mitochondria break glucose down into ATP & carbon dioxide. Next step")
+        self.assertFalse(any("min-h-screen" in section.text for section in sections))
+
+    def test_search_returns_top_sections_in_chapter_order(self):
+        index = ChapterSectionIndex(encode=bag_of_words, full_chapter_chars=0)
+        loads = []
+        chapter = index.get("hash", lambda: loads.append(1) or CHAPTER)
+        index.get("hash", lambda: loads.append(1) or CHAPTER)
+        self.assertEqual(len(loads), 1)
+
+        found = index.search(chapter, "What do mitochondria do with glucose?", top_k=1)
+        self.assertEqual([section.title for section in found], ["Cellular Respiration"])
+        found = index.search(chapter, "Where does the oxygen come from, and the food?", top_k=2)
+        self.assertEqual([section.title for section in found], ["Plant Biology", "Photosynthesis"])
+
+        # Without embeddings the sections are ranked by word overlap, short chapters are passed whole
+        lexical = ChapterSectionIndex(encode=None, full_chapter_chars=0)
+        chapter = lexical.get("hash", lambda: CHAPTER)
+        self.assertEqual([s.title for s in lexical.search(chapter, "cellular respiration", top_k=1)],
+                         ["Cellular Respiration"])
+        short = ChapterSectionIndex(encode=bag_of_words)
+        self.assertEqual(len(short.search(short.get("hash", lambda: CHAPTER), "light", top_k=1)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+
+from ..src.agents.chat_agent.context_window import SUMMARY_STATE_KEY, ChatContextManager, split_turns
+
+
+def message(author: str, text: str) -> Event:
+    role = "user" if author == "user" else "model"
+    return Event(author=author, invocation_id=text, content=types.Content(role=role, parts=[types.Part(text=text)]))
+
+
+class TestChatCompaction(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_url = f"sqlite+aiosqlite:///{os.path.join(self.tmp.name, 'sessions.db')}"
+        self.service = DatabaseSessionService(db_url=self.db_url)
+        session = await self.service.create_session(app_name="app", user_id="u", session_id="7",
+                                                    state={"outline": "- Graphs"})
+        for turn in range(6):
+            await self.service.append_event(session, message("user", f"question {turn}"))
+            await self.service.append_event(session, message("chat_agent", f"answer {turn}"))
+        self.summaries = []
+        self.summarizers = 1
+        self.all_summarizing = asyncio.Event()
+
+    async def asyncTearDown(self):
+        await self.service.close()
+        self.tmp.cleanup()
+
+    async def summarize(self, previous: str, transcript: str) -> str:
+        self.summaries.append(transcript)
+        if len(self.summaries) == self.summarizers:
+            self.all_summarizing.set()
+        await self.all_summarizing.wait()
+        return f"{previous} [{transcript.count('Student:')} questions]".strip()
+
+    def manager(self, service=None) -> ChatContextManager:
+        return ChatContextManager(service or self.service, "app", keep_turns=2, max_turns=4, summarize=self.summarize)
+
+    async def session(self):
+        return await self.service.get_session(app_name="app", user_id="u", session_id="7")
+
+    async def test_older_turns_are_folded_into_the_summary(self):
+        # A turn that loaded the session before the compaction (e.g. on another worker)
+        running_turn = await self.session()
+
+        self.assertTrue(await self.manager().compact("u", "7"))
+        session = await self.session()
+        self.assertEqual([event.invocation_id for event in session.events],
+                         ["question 4", "answer 4", "question 5", "answer 5"])
+        self.assertEqual(session.state[SUMMARY_STATE_KEY], "[4 questions]")
+        self.assertEqual(session.state["outline"], "- Graphs")
+
+        # The running turn still appends to the session, its state changes keep the summary
+        event = message("user", "question 6")
+        event.actions.state_delta = {"temp:sections": "x", "outline": "- Trees"}
+        await self.service.append_event(running_turn, event)
+        session = await self.session()
+        self.assertEqual(len(split_turns(session.events)), 3)
+        self.assertEqual((session.state[SUMMARY_STATE_KEY], session.state["outline"]), ("[4 questions]", "- Trees"))
+        self.assertFalse(await self.manager().compact("u", "7"))
+
+    async def test_concurrent_compactions_fold_the_turns_once(self):
+        # Two workers, each with its own session service and lock
+        other_service = DatabaseSessionService(db_url=self.db_url)
+        # Both read the session and summarize the same turns before either one writes
+        self.summarizers = 2
+        try:
+            results = await asyncio.gather(self.manager().compact("u", "7"),
+                                           self.manager(other_service).compact("u", "7"))
+        finally:
+            await other_service.close()
+        self.assertEqual(sorted(results), [False, True])
+        session = await self.session()
+        self.assertEqual(len(session.events), 4)
+        self.assertEqual(session.state[SUMMARY_STATE_KEY], "[4 questions]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from ..src.db.crud import courses_crud
+from ..src.db.database import Base
+# All models, the relationships of the courses table need them
+from ..src.db.models import db_chat, db_course, db_file, db_note, db_usage, db_user  # noqa: F401
+from ..src.db.models.db_course import CourseStatus
+
+
+class TestClaimFailedCourse(unittest.TestCase):
+    """Retrying a failed course moves it back to creating exactly once"""
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[db_user.User.__table__, db_course.Course.__table__])
+        Session = sessionmaker(bind=engine)
+        self.db = Session()
+        self.other_db = Session()
+        self.addCleanup(self.db.close)
+        self.addCleanup(self.other_db.close)
+        course = courses_crud.create_new_course(self.db, "user", 2, "query", status=CourseStatus.FAILED)
+        courses_crud.update_course(self.db, course.id, error_msg="boom")
+        self.course_id = course.id
+
+    def test_only_one_retry_claims_the_course(self):
+        # Both requests saw the course as failed before either of them claimed it
+        self.assertEqual(courses_crud.get_course_by_id(self.other_db, self.course_id).status,
+                         CourseStatus.FAILED.value)
+        self.assertTrue(courses_crud.claim_failed_course(self.db, self.course_id))
+        self.assertFalse(courses_crud.claim_failed_course(self.other_db, self.course_id))
+
+        course = courses_crud.get_course_by_id(self.db, self.course_id)
+        self.db.refresh(course)
+        self.assertEqual(course.status, CourseStatus.CREATING.value)
+        self.assertIsNone(course.error_msg)
+
+    def test_course_that_is_not_failed_is_not_claimed(self):
+        courses_crud.update_course(self.db, self.course_id, status=CourseStatus.FINISHED)
+        self.assertFalse(courses_crud.claim_failed_course(self.db, self.course_id))
+        self.assertEqual(courses_crud.get_course_by_id(self.db, self.course_id).status,
+                         CourseStatus.FINISHED.value)
+
+
+if __name__ == "__main__":
+    unittest.main()
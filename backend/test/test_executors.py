@@ -0,0 +1,36 @@
+import os
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+from ..src.core import executors
+
+
+def fail(message):
+    raise RuntimeError(message)
+
+
+def crash():
+    os._exit(1)
+
+
+class TestParsePool(unittest.IsolatedAsyncioTestCase):
+    def tearDown(self):
+        executors.shutdown_executors()
+
+    async def test_errors_of_the_function_do_not_restart_the_pool(self):
+        pool = executors.get_parse_pool()
+        with self.assertRaisesRegex(RuntimeError, "bad pdf"):
+            await executors.run_in_parse_pool(fail, "bad pdf")
+        self.assertIs(executors.get_parse_pool(), pool)
+
+    async def test_broken_pool_is_restarted_and_the_call_retried(self):
+        pool = executors.get_parse_pool()
+        # The killed worker breaks the pool, the retry in a new pool crashes as well
+        with self.assertRaises(BrokenProcessPool):
+            await executors.run_in_parse_pool(crash)
+        self.assertIsNot(executors.get_parse_pool(), pool)
+        self.assertEqual(await executors.run_in_parse_pool(len, "ok"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
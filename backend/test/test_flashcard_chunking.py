@@ -0,0 +1,52 @@
+import unittest
+
+from ..src.agents.flashcard_agent.chunking import (
+    budget_questions, chunk_pages, near_duplicate_indices, strip_boilerplate
+)
+
+
+def _slide(number: int, body: str) -> str:
+    return f"Nexora Lecture Notes\n{body}\nUniversity of Example - Page {number} of 30"
+
+
+class TestFlashcardChunking(unittest.TestCase):
+    def test_strips_repeated_headers_and_footers(self):
+        topics = ["cell membrane", "nucleus", "ribosome", "mitochondrion", "golgi apparatus", "lysosome",
+                  "vacuole", "chloroplast", "cytoskeleton", "centriole"]
+        pages = [_slide(i + 1, f"The {topic} has its own function.\nSee figure {i}.") for i, topic in enumerate(topics)]
+        stripped = strip_boilerplate(pages)
+        # Numbers are ignored, "See figure 3." is the same line on every page
+        self.assertEqual(stripped[3], "The mitochondrion has its own function.")
+        # Too few pages to tell boilerplate from content
+        self.assertEqual(strip_boilerplate(pages[:2]), pages[:2])
+
+    def test_chunks_follow_pages_and_sections(self):
+        pages = ["a" * 1500] * 6 + ["b" * 20000]
+        toc = [[1, "Intro", 1], [1, "Methods", 4]]
+        chunks = chunk_pages(pages, toc, max_chars=8000)
+        self.assertEqual([(c.start_page, c.end_page) for c in chunks[:2]], [(1, 3), (4, 6)])
+        # The oversized page is split on its own
+        self.assertTrue(all(c.start_page == c.end_page == 7 for c in chunks[2:]))
+        self.assertTrue(all(len(c.text) <= 8000 for c in chunks))
+
+    def test_budget_follows_information_density(self):
+        dense = " ".join(f"concept{i}" for i in range(300))
+        sparse = "word word word word " * 100
+        chunks = chunk_pages([dense, sparse], max_chars=3000)
+        budget = budget_questions(chunks, 10)
+        self.assertEqual(sum(budget), 10)
+        self.assertGreater(budget[0], budget[1])
+
+    def test_near_duplicate_questions(self):
+        questions = [
+            "What is the main function of the mitochondria in a eukaryotic cell?",
+            "Which organelle synthesizes proteins from messenger RNA templates?",
+            "What is the main function of the mitochondria in an eukaryotic cell?",
+            "What is the main function of mitochondria in a eukaryotic cell?",
+            "What is the main function of the ribosome in a eukaryotic cell?",
+        ]
+        self.assertEqual(near_duplicate_indices(questions), {2, 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from ..src.agents.flashcard_agent.schema import FlashcardConfig, FlashcardType, TaskStatus
+from ..src.db.crud import flashcard_tasks_crud
+from ..src.db.database import Base
+# All models, the relationships of the users table (referenced by the tasks) need them
+from ..src.db.models import db_chat, db_course, db_file, db_note, db_usage, db_user  # noqa: F401
+from ..src.db.models.db_flashcard_task import FlashcardDocument, FlashcardTask
+from ..src.services import flashcard_service
+
+CONFIG = FlashcardConfig(type=FlashcardType.TESTING)
+
+
+class FlashcardTaskTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tasks in an in-memory SQLite database, shared by the workers of a test"""
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[db_user.User.__table__, FlashcardDocument.__table__,
+                                                 FlashcardTask.__table__])
+        self.Session = sessionmaker(bind=engine)
+        patcher = mock.patch.object(flashcard_service, "get_db_context", self.db_context)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.db_context() as db:
+            flashcard_tasks_crud.create_task(db, "task", "document", CONFIG.model_dump(mode="json"))
+
+    @contextmanager
+    def db_context(self):
+        db = self.Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def task(self) -> FlashcardTask:
+        with self.db_context() as db:
+            return flashcard_tasks_crud.get_task(db, "task")
+
+    def expire_lease(self):
+        with self.db_context() as db:
+            flashcard_tasks_crud.update_task(db, "task", lease_expires_at=datetime.now(timezone.utc) - timedelta(1))
+
+    def worker(self) -> flashcard_service.FlashcardService:
+        with mock.patch.object(flashcard_service, "FlashcardAgent"):
+            service = flashcard_service.FlashcardService("test", session_service=None)
+        service.task_manager.lease_seconds = 0.06
+        service.document_manager.get_document_path = lambda document_id: None
+        return service
+
+
+class TestTaskLeases(FlashcardTaskTestCase):
+    def test_only_one_worker_claims_a_task(self):
+        with self.db_context() as db:
+            self.assertTrue(flashcard_tasks_crud.claim_task(db, "task", "a", 60))
+            self.assertFalse(flashcard_tasks_crud.claim_task(db, "task", "b", 60))
+            self.assertTrue(flashcard_tasks_crud.renew_lease(db, "task", "a", 60))
+            self.assertEqual(flashcard_tasks_crud.get_orphaned_task_ids(db, 60), [])
+
+        # A stalled worker loses the task to the next claim
+        self.expire_lease()
+        with self.db_context() as db:
+            self.assertEqual(flashcard_tasks_crud.get_orphaned_task_ids(db, 60), ["task"])
+            self.assertTrue(flashcard_tasks_crud.claim_task(db, "task", "b", 60))
+            self.assertFalse(flashcard_tasks_crud.renew_lease(db, "task", "a", 60))
+        self.assertEqual((self.task().worker_id, self.task().attempts), ("b", 2))
+
+    async def test_cancel_through_another_worker_stops_the_running_worker(self):
+        running, other = self.worker(), self.worker()
+        generation_started = asyncio.Event()
+
+        async def generate(*args):
+            generation_started.set()
+            await asyncio.sleep(10)
+
+        running._generate = generate
+        self.assertTrue(running._start_claimed_task("task", "document", CONFIG))
+        await generation_started.wait()
+
+        self.assertTrue(other.cancel_task("task"))
+        # The running worker notices the cancel at its next lease renewal
+        await asyncio.wait_for(running.task_manager.running_tasks["task"], timeout=1)
+        self.assertEqual(running.task_manager.running_tasks, {})
+        self.assertEqual(self.task().status, TaskStatus.CANCELLED.value)
+        with self.db_context() as db:
+            self.assertFalse(flashcard_tasks_crud.claim_task(db, "task", "c", 60))
+            self.assertEqual(flashcard_tasks_crud.get_orphaned_task_ids(db, 0), [])
+
+    async def test_orphaned_task_fails_after_max_attempts(self):
+        with self.db_context() as db:
+            flashcard_tasks_crud.claim_task(db, "task", "crashed", 60)
+        self.expire_lease()
+
+        other = self.worker()
+        with mock.patch.object(flashcard_service.settings, "FLASHCARD_TASK_MAX_ATTEMPTS", 2):
+            self.assertEqual(await other.reclaim_orphaned_tasks(), {"restarted": 1, "failed": 0})
+            # The restarted attempt fails: the document is gone
+            await asyncio.wait_for(other.task_manager.running_tasks["task"], timeout=1)
+            self.assertEqual(self.task().status, TaskStatus.FAILED.value)
+
+            with self.db_context() as db:
+                flashcard_tasks_crud.update_task(db, "task", status=TaskStatus.GENERATING.value)
+            self.expire_lease()
+            self.assertEqual(await other.reclaim_orphaned_tasks(), {"restarted": 0, "failed": 1})
+        task = self.task()
+        self.assertEqual((task.status, task.attempts, task.worker_id), (TaskStatus.FAILED.value, 2, None))
+        self.assertIn("2 attempts", task.error_message)
+
+    async def test_shutdown_releases_the_running_tasks(self):
+        running = self.worker()
+        running._generate = lambda *args: asyncio.sleep(10)
+        self.assertTrue(running._start_claimed_task("task", "document", CONFIG))
+        await asyncio.sleep(0)
+
+        await running.shutdown()
+        task = self.task()
+        self.assertEqual((task.worker_id, task.lease_expires_at, task.status), (None, None, TaskStatus.PENDING.value))
+        self.assertEqual(running.task_manager.running_tasks, {})
+
+
+class TestStaleDocuments(FlashcardTaskTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = datetime.now(timezone.utc) - timedelta(days=2)
+        self.cutoff = datetime.now(timezone.utc) - timedelta(days=1)
+        with self.db_context() as db:
+            flashcard_tasks_crud.create_document(db, "document", "slides.pdf", "/nonexistent/slides.pdf", 1)
+            flashcard_tasks_crud.update_task(db, "task", created_at=self.old)
+            db.query(FlashcardDocument).update({FlashcardDocument.created_at: self.old})
+            db.commit()
+
+    def stale_document_ids(self):
+        with self.db_context() as db:
+            return [doc.id for doc in flashcard_tasks_crud.get_stale_documents(db, self.cutoff)]
+
+    def test_document_of_a_retryable_task_is_kept(self):
+        # Failed after the cutoff, the task is not expired yet and can still be retried
+        with self.db_context() as db:
+            flashcard_tasks_crud.update_task(db, "task", status=TaskStatus.FAILED.value,
+                                             completed_at=datetime.now(timezone.utc))
+        self.assertEqual(self.stale_document_ids(), [])
+
+    def test_document_of_an_expired_task_is_stale(self):
+        with self.db_context() as db:
+            flashcard_tasks_crud.update_task(db, "task", status=TaskStatus.FAILED.value, completed_at=self.old)
+            self.assertEqual([task.id for task in flashcard_tasks_crud.get_finished_tasks(db, self.cutoff)],
+                             ["task"])
+        self.assertEqual(self.stale_document_ids(), ["document"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import hashlib
+import unittest
+
+from ..src.services.generation_cache import GenerationCache
+
+
+class TestGenerationCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = GenerationCache(ttl=60, max_entries=3, clock=lambda: self.now)
+
+    def test_key_is_normalized_and_independent_of_file_order(self):
+        key = GenerationCache.make_key("Learn  Python basics", 5, "English", "Beginner",
+                                       file_contents=[b"notes", b"slides"], file_hashes=["c" * 64])
+        same = [
+            GenerationCache.make_key(" learn python BASICS ", 5, "english ", "beginner",
+                                     file_contents=[b"slides", b"notes"], file_hashes=["c" * 64]),
+            # A loaded file and a blob store hash of the same content are the same file
+            GenerationCache.make_key("Learn Python basics", 5, "English", "Beginner",
+                                     file_contents=[b"slides"],
+                                     file_hashes=["c" * 64, hashlib.sha256(b"notes").hexdigest()]),
+        ]
+        different = [
+            GenerationCache.make_key("Learn Python basics", 6, "English", "Beginner",
+                                     file_contents=[b"notes", b"slides"], file_hashes=["c" * 64]),
+            GenerationCache.make_key("Learn Python basics", 5, "English", "Beginner",
+                                     file_contents=[b"notes"], file_hashes=["c" * 64]),
+        ]
+        self.assertEqual(same, [key, key])
+        self.assertNotIn(key, different)
+
+    def test_ttl_and_copies(self):
+        self.cache.put("key", "info", {"title": "Python", "chapters": ["a"]})
+        value = self.cache.get("key", "info")
+        value["chapters"].append("b")
+        self.assertEqual(self.cache.get("key", "info"), {"title": "Python", "chapters": ["a"]})
+        self.assertIsNone(self.cache.get("key", "planner"))
+
+        self.now = 61
+        self.assertIsNone(self.cache.get("key", "info"))
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 2, "hit_rate": 0.5, "entries": 0})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for key in ("a", "b", "c"):
+            self.cache.put(key, "info", {"key": key})
+        self.cache.get("a", "info")
+        self.cache.put("d", "info", {"key": "d"})
+        self.assertIsNone(self.cache.get("b", "info"))
+        self.assertEqual([self.cache.get(key, "info")["key"] for key in ("a", "c", "d")], ["a", "c", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+
+from ..src.services.progress_service import CourseProgressBus
+
+
+async def collect(stream, limit=20):
+    events = []
+    async for event in stream:
+        events.append(event)
+        if len(events) >= limit:
+            break
+    return events
+
+
+class TestCourseProgressBus(unittest.IsolatedAsyncioTestCase):
+    async def test_resumes_after_last_event_id(self):
+        bus = CourseProgressBus(heartbeat_seconds=0.05)
+        first = await bus.publish(1, "course_started")
+        await bus.publish(1, "chapter_ready", {"index": 1})
+        await bus.publish(1, "course_finished", {"status": "finished"})
+
+        events = await collect(bus.subscribe(1, first["id"]))
+        self.assertEqual([event["type"] for event in events], ["chapter_ready", "course_finished"])
+
+        # An id of another epoch (e.g. before a restart) replays the whole history
+        events = await collect(bus.subscribe(1, "0-2"))
+        self.assertEqual(len(events), 3)
+
+    async def test_live_events_end_with_terminal_event(self):
+        bus = CourseProgressBus(heartbeat_seconds=0.05)
+        await bus.publish(1, "course_started")
+        stream = asyncio.create_task(collect(bus.subscribe(1)))
+        await asyncio.sleep(0.01)
+        await bus.publish(1, "chapter_ready", {"index": 1})
+        await asyncio.sleep(0.08)
+        await bus.publish(1, "course_failed", {"status": "failed"})
+
+        events = await asyncio.wait_for(stream, timeout=1)
+        self.assertEqual([event and event["type"] for event in events],
+                         ["course_started", "chapter_ready", None, "course_failed"])
+
+    async def test_course_created_by_another_worker_ends_by_status_poll(self):
+        bus = CourseProgressBus(heartbeat_seconds=0.02)
+        polls = 0
+
+        async def poll_final():
+            nonlocal polls
+            polls += 1
+            return bus.final_event(7, "course_finished", {"status": "finished"}) if polls == 3 else None
+
+        events = await asyncio.wait_for(collect(bus.subscribe(7, poll_final=poll_final)), timeout=1)
+        self.assertEqual([event and event["type"] for event in events], [None, None, "course_finished"])
+        # Subscribing does not create a channel
+        self.assertFalse(bus.has_history(7))
+
+    async def test_subscriber_before_first_event_gets_it(self):
+        bus = CourseProgressBus(heartbeat_seconds=5)
+        stream = asyncio.create_task(collect(bus.subscribe(3)))
+        await asyncio.sleep(0.01)
+        await bus.publish(3, "course_started")
+        await bus.publish(3, "course_finished")
+
+        events = await asyncio.wait_for(stream, timeout=1)
+        self.assertEqual([event["type"] for event in events], ["course_started", "course_finished"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import time
+import unittest
+
+from google.adk.sessions import InMemorySessionService
+
+from ..src.core import session_sweeper
+
+
+class TestSessionSweeper(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = InMemorySessionService()
+        now = time.time()
+        # session id -> seconds since its last update
+        self.ages = {"old": 7200, "idle": 4000, "recent": 60, "newer": 30, "newest": 0}
+        for index, (session_id, age) in enumerate(self.ages.items()):
+            await self.service.create_session(app_name="app", user_id=f"user{index % 2}", session_id=session_id)
+            self.service.sessions["app"][f"user{index % 2}"][session_id].last_update_time = now - age
+
+    def session_ids(self):
+        return {session_id for users in self.service.sessions.values()
+                for by_id in users.values() for session_id in by_id}
+
+    async def test_idle_sessions_are_deleted(self):
+        deleted = await session_sweeper.sweep_session_service(self.service, max_age_seconds=3600, max_sessions=100)
+        self.assertEqual(deleted, 2)
+        self.assertEqual(self.session_ids(), {"recent", "newer", "newest"})
+
+    async def test_least_recently_updated_sessions_go_over_the_maximum_count(self):
+        deleted = await session_sweeper.sweep_session_service(self.service, max_age_seconds=3600, max_sessions=1)
+        self.assertEqual(deleted, 4)
+        self.assertEqual(self.session_ids(), {"newest"})
+        # The emptied user maps are dropped
+        self.assertEqual(list(self.service.sessions["app"]), ["user0"])
+
+    async def test_registered_services_are_swept(self):
+        session_sweeper.register_session_service(self.service)
+        session_sweeper.register_session_service(object())
+        self.assertEqual(await session_sweeper.sweep_sessions(max_age_seconds=10, max_sessions=100),
+                         {"deleted": 4, "remaining": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
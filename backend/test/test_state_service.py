@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+from ..src.services.state_service import CourseState, SQLiteStateBackend, StateService
+
+
+class TestSQLiteStateBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "states.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_versions_are_monotonic_across_keys_and_deletes(self):
+        backend = SQLiteStateBackend(self.db_path)
+        versions = [backend.put("1:1", {"query": "a"}), backend.put("1:2", {"query": "b"}),
+                    backend.put("1:1", {"query": "c"})]
+        backend.delete("1:1")
+        versions.append(backend.put("1:1", {"query": "d"}))
+        self.assertEqual(versions, sorted(set(versions)))
+        self.assertEqual(backend.get("1:1"), (versions[-1], {"query": "d"}))
+
+        # A second connection (another worker) continues the same sequence
+        self.assertGreater(SQLiteStateBackend(self.db_path).put("1:3", {}), versions[-1])
+
+    def test_recreated_state_is_not_served_from_a_stale_view(self):
+        writer = StateService(SQLiteStateBackend(self.db_path))
+        reader = StateService(SQLiteStateBackend(self.db_path))
+        writer.create_state("1", 5, CourseState(query="first"))
+        self.assertEqual(reader.get_state("1", 5)["query"], "first")
+
+        writer.delete_state("1", 5)
+        writer.create_state("1", 5, CourseState(query="second"))
+        self.assertEqual(reader.get_state("1", 5)["query"], "second")
+
+
+if __name__ == "__main__":
+    unittest.main()
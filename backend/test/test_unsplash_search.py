@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from ..src.agents.tools import unsplash_search
+from ..src.agents.tools.unsplash_search import SearchCache, UnsplashSearchClient
+from ..src.agents.image_agent.keyword_search import extract_keywords, find_image_url, get_image_search_stats
+
+
+class _FakeUnsplashHandler(BaseHTTPRequestHandler):
+    """Stand-in for api.unsplash.com/search/photos, counts the requests it answers"""
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        _FakeUnsplashHandler.requests.append((url.path, query, self.headers.get("Authorization")))
+        body = json.dumps({"results": [{
+            "id": f"{query['query'][0]}-{query.get('page', ['1'])[0]}",
+            "description": None,
+            "urls": {"regular": "http://example.com/photo.jpg"},
+            "width": 640,
+            "height": 480,
+        }]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestUnsplashSearchClient(unittest.IsolatedAsyncioTestCase):
+    """Search cache and pooled client against a local stand-in HTTP server"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeUnsplashHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.api_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    async def asyncSetUp(self):
+        _FakeUnsplashHandler.requests = []
+        self.old_key = os.environ.get("UNSPLASH_ACCESS_KEY")
+        os.environ["UNSPLASH_ACCESS_KEY"] = "test-key"
+        self.now = 1000.0
+        self.client = UnsplashSearchClient(
+            api_url=self.api_url,
+            cache=SearchCache(ttl=60, max_entries=2, clock=lambda: self.now),
+        )
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        if self.old_key is None:
+            os.environ.pop("UNSPLASH_ACCESS_KEY", None)
+        else:
+            os.environ["UNSPLASH_ACCESS_KEY"] = self.old_key
+
+    async def test_repeated_search_is_served_from_cache(self):
+        first = await self.client.search({"query": "Branch and Bound", "page": 1})
+        second = await self.client.search({"query": "  branch AND bound ", "page": 1})
+        self.assertEqual(first, second)
+        self.assertEqual(len(_FakeUnsplashHandler.requests), 1)
+        path, _, auth = _FakeUnsplashHandler.requests[0]
+        self.assertEqual(path, "/search/photos")
+        self.assertEqual(auth, "Client-ID test-key")
+        self.assertEqual(self.client.cache.stats()["hits"], 1)
+
+    async def test_filters_and_page_are_part_of_the_key(self):
+        await self.client.search({"query": "graph", "page": 1})
+        await self.client.search({"query": "graph", "page": 2})
+        await self.client.search({"query": "graph", "page": 1, "color": "blue"})
+        self.assertEqual(len(_FakeUnsplashHandler.requests), 3)
+
+    async def test_expired_entries_are_fetched_again(self):
+        await self.client.search({"query": "tree"})
+        self.now += 61
+        await self.client.search({"query": "tree"})
+        self.assertEqual(len(_FakeUnsplashHandler.requests), 2)
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        for query in ["a", "b", "a", "c", "a", "b"]:
+            await self.client.search({"query": query})
+        # "b" was evicted by "c", "a" stayed because it was used last
+        self.assertEqual([q["query"][0] for _, q, _ in _FakeUnsplashHandler.requests], ["a", "b", "c", "b"])
+
+    async def test_disk_store_is_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "searches.sqlite3")
+            # One cache per process, e.g. the backend's fast path and the MCP server
+            backend = UnsplashSearchClient(api_url=self.api_url, cache=SearchCache(ttl=60, db_path=db_path))
+            server = UnsplashSearchClient(api_url=self.api_url, cache=SearchCache(ttl=60, db_path=db_path))
+            try:
+                first = await backend.search({"query": "binary tree"})
+                self.assertEqual(await server.search({"query": "Binary  Tree"}), first)
+                self.assertEqual(len(_FakeUnsplashHandler.requests), 1)
+                self.assertEqual(server.cache.stats()["hits"], 1)
+
+                # Entries older than the TTL of the reading process are not used
+                expired = SearchCache(ttl=1e-6, db_path=db_path)
+                self.assertIsNone(expired.get(SearchCache.make_key({"query": "binary tree"})))
+            finally:
+                await backend.aclose()
+                await server.aclose()
+
+    async def test_connection_is_reused(self):
+        await self.client.search({"query": "x"})
+        client = self.client._get_client()
+        await self.client.search({"query": "y"})
+        self.assertIs(self.client._get_client(), client)
+
+
+class TestImageFastPath(unittest.IsolatedAsyncioTestCase):
+    """Keyword extraction and the search without the ImageAgent"""
+
+    def test_keywords_prefer_caption_and_skip_stopwords(self):
+        keywords = extract_keywords("Introduction to Branch and Bound", "Pruning the search tree. Pruning bounds.")
+        self.assertEqual(keywords, ["branch", "bound", "pruning"])
+
+    def test_no_keywords(self):
+        self.assertEqual(extract_keywords("1. Overview", ""), [])
+
+    async def test_find_image_url_uses_shared_client(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeUnsplashHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        old_client = unsplash_search._search_client
+        os.environ.setdefault("UNSPLASH_ACCESS_KEY", "test-key")
+        unsplash_search._search_client = UnsplashSearchClient(api_url=f"http://127.0.0.1:{server.server_address[1]}")
+        try:
+            saved = get_image_search_stats().fast_path_hits
+            self.assertEqual(await find_image_url("Graph Theory"), "http://example.com/photo.jpg")
+            self.assertEqual(get_image_search_stats().fast_path_hits, saved + 1)
+            self.assertIsNone(await find_image_url("1. Overview"))
+        finally:
+            await unsplash_search._search_client.aclose()
+            unsplash_search._search_client = old_client
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()